@@ -0,0 +1,158 @@
+"""
+bench_consultas.py
+
+Latencia por consulta de inpres_sismos/consultas.py frente a los enfoques
+actuales de recorrido completo:
+- pandas: cargar sismos.csv y filtrar el DataFrame con máscaras booleanas;
+- SQL a mano sin índices: la misma condición sobre "sismos NOT INDEXED".
+
+Para consultas.py se mide la primera página (100 eventos) sin caché y con la
+caché LRU ya cargada.
+
+Ejecutar desde la raíz del repositorio (requiere data/sismos.db generada con
+db_scripts/actualizar_database.py):
+    python benchmarks/bench_consultas.py [--db data/sismos.db] [--csv data/sismos.csv] [--repeticiones 20]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "inpres_sismos"))
+
+from inpres_sismos.consultas import ConsultasSismos, FiltroSismos, distancia_km  # noqa: E402
+
+HACE_5_ANOS = (date.today() - timedelta(days=5 * 365)).isoformat()
+HACE_1_ANO = (date.today() - timedelta(days=365)).isoformat()
+
+# (nombre, filtro)
+CONSULTAS = [
+    ("bbox Cuyo, M>=4, últimos 5 años",
+     FiltroSismos(bbox=(-70.0, -33.0, -67.0, -30.0), magnitud_min=4, desde=HACE_5_ANOS)),
+    ("bbox chico (0.5°), M>=3",
+     FiltroSismos(bbox=(-68.8, -31.8, -68.3, -31.3), magnitud_min=3)),
+    ("radio 50 km de San Juan",
+     FiltroSismos(centro=(-31.54, -68.53), radio_km=50)),
+    ("M>=5",
+     FiltroSismos(magnitud_min=5)),
+    ("Salta, último año",
+     FiltroSismos(provincia="Salta", desde=HACE_1_ANO)),
+    ("sentidos, prof. <= 30 km",
+     FiltroSismos(sentido=True, profundidad_max=30)),
+    ("sin filtro (últimos eventos)",
+     FiltroSismos()),
+]
+
+
+def mascara_pandas(df: pd.DataFrame, filtro: FiltroSismos) -> np.ndarray:
+    """El mismo filtro aplicado sobre el DataFrame completo del CSV."""
+    mask = np.ones(len(df), dtype=bool)
+    if filtro.bbox is not None:
+        oeste, sur, este, norte = filtro.bbox
+        mask &= df["longitud"].between(oeste, este).to_numpy() & df["latitud"].between(sur, norte).to_numpy()
+    if filtro.centro is not None:
+        lat, lon = np.radians(filtro.centro)
+        p = np.radians(df["latitud"].to_numpy(dtype=float))
+        dl = np.radians(df["longitud"].to_numpy(dtype=float)) - lon
+        a = np.sin((p - lat) / 2) ** 2 + np.cos(p) * np.cos(lat) * np.sin(dl / 2) ** 2
+        mask &= 2 * 6371.0 * np.arcsin(np.sqrt(np.clip(a, 0, 1))) <= filtro.radio_km
+    if filtro.desde is not None:
+        mask &= (df["fecha_iso"] >= filtro.desde).to_numpy()
+    if filtro.magnitud_min is not None:
+        mask &= (df["magnitud"] >= filtro.magnitud_min).to_numpy()
+    if filtro.profundidad_max is not None:
+        mask &= (df["profundidad_km"] <= filtro.profundidad_max).to_numpy()
+    if filtro.provincia is not None:
+        mask &= (df["provincia"].str.upper() == filtro.provincia.upper()).to_numpy()
+    if filtro.sentido is not None:
+        mask &= (df["sentido_bool"] == filtro.sentido).to_numpy()
+    return mask
+
+
+def sql_sin_indices(conn: sqlite3.Connection, filtro: FiltroSismos) -> list:
+    """SQL escrito a mano sobre la tabla completa, sin usar índices."""
+    condiciones, params = [], []
+    if filtro.bbox is not None:
+        condiciones.append("longitud BETWEEN ? AND ? AND latitud BETWEEN ? AND ?")
+        params += [filtro.bbox[0], filtro.bbox[2], filtro.bbox[1], filtro.bbox[3]]
+    if filtro.centro is not None:
+        condiciones.append("distancia_km(latitud, longitud, ?, ?) <= ?")
+        params += [filtro.centro[0], filtro.centro[1], filtro.radio_km]
+    if filtro.desde is not None:
+        condiciones.append("fecha >= ?")
+        params.append(filtro.desde)
+    if filtro.magnitud_min is not None:
+        condiciones.append("magnitud >= ?")
+        params.append(filtro.magnitud_min)
+    if filtro.profundidad_max is not None:
+        condiciones.append("CAST(profundidad AS REAL) <= ?")
+        params.append(filtro.profundidad_max)
+    if filtro.provincia is not None:
+        condiciones.append("provincia_normalizada = ?")
+        params.append(filtro.provincia)
+    if filtro.sentido is not None:
+        condiciones.append("sentido = ?")
+        params.append(int(filtro.sentido))
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    sql = f"SELECT * FROM sismos NOT INDEXED {where} ORDER BY fecha DESC, hora DESC, id DESC LIMIT 100"
+    return conn.execute(sql, params).fetchall()
+
+
+def medir(fn, repeticiones: int) -> float:
+    """Mediana en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        start = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - start) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de consultas sobre sismos.db")
+    parser.add_argument("--db", default=os.path.join(REPO_ROOT, "data", "sismos.db"))
+    parser.add_argument("--csv", default=os.path.join(REPO_ROOT, "data", "sismos.csv"))
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = pd.read_csv(args.csv)
+    df["fecha_iso"] = pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce").dt.strftime("%Y-%m-%d")
+    df["profundidad_km"] = pd.to_numeric(df["profundidad"].astype(str).str.extract(r"([\d.]+)")[0], errors="coerce")
+    df["sentido_bool"] = df["sentido"].astype(str).str.strip().str.lower().isin(["si", "sí", "yes", "1", "true"])
+    carga_csv = (time.perf_counter() - start) * 1000
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    conn.create_function("distancia_km", 4, distancia_km, deterministic=True)
+    sin_cache = ConsultasSismos(args.db, cache_size=0)
+    con_cache = ConsultasSismos(args.db)
+
+    print("=" * 96)
+    print(f"BENCHMARK DE CONSULTAS ({len(df)} eventos, mediana de {args.repeticiones} repeticiones, ms)")
+    print(f"Carga de sismos.csv en pandas (una vez): {carga_csv:.1f} ms")
+    print("=" * 96)
+    print(f"{'consulta':<34} {'eventos':>8} {'pandas':>9} {'SQL s/índ.':>11} {'consultas':>10} {'caché':>8} {'mejora':>8}")
+    for nombre, filtro in CONSULTAS:
+        total = int(mascara_pandas(df, filtro).sum())
+        t_pandas = medir(lambda: df[mascara_pandas(df, filtro)].head(100), args.repeticiones)
+        t_sql = medir(lambda: sql_sin_indices(conn, filtro), args.repeticiones)
+        t_consulta = medir(lambda: sin_cache.buscar(filtro, limite=100), args.repeticiones)
+        con_cache.buscar(filtro, limite=100)
+        t_cache = medir(lambda: con_cache.buscar(filtro, limite=100), args.repeticiones)
+        print(f"{nombre:<34} {total:>8} {t_pandas:>9.2f} {t_sql:>11.2f} {t_consulta:>10.2f} {t_cache:>8.3f} "
+              f"{min(t_pandas, t_sql) / t_consulta:>7.1f}x")
+
+    sin_cache.cerrar()
+    con_cache.cerrar()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
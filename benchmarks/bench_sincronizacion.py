@@ -0,0 +1,94 @@
+"""
+bench_sincronizacion.py
+
+Filas por segundo de inpres_sismos/sincronizacion.py y de la migración
+inicial (inpres_sismos/migracion.py) contra el servidor
+PostgREST local de los tests (test/postgrest_local.py), frente al esquema
+anterior de actualizar_supabase.py: un POST por lote, uno detrás de otro,
+abriendo una conexión nueva por petición.
+
+Se mide una carga completa (tabla vacía) y una sincronización diaria
+(tabla ya cargada, solo filas posteriores al watermark).
+
+Ejecutar desde la raíz del repositorio:
+    python benchmarks/bench_sincronizacion.py [--csv data/sismos.csv] [--filas 20000] [--latencia 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import requests
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "inpres_sismos"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "test"))
+
+from inpres_sismos import sincronizacion  # noqa: E402
+from inpres_sismos.migracion import migrar  # noqa: E402
+from inpres_sismos.sincronizacion import ClientePostgrest, sincronizar  # noqa: E402
+from postgrest_local import ServidorPostgrest  # noqa: E402
+
+
+def secuencial(df: pd.DataFrame, url: str, lote: int) -> float:
+    """Lotes de tamaño fijo enviados de a uno, sin reutilizar conexiones."""
+    filas = sincronizacion.serializar(sincronizacion.preparar_registros(df))
+    inicio = time.perf_counter()
+    for i in range(0, len(filas), lote):
+        resp = requests.post(
+            f"{url}/rest/v1/sismos",
+            params={"on_conflict": sincronizacion.ON_CONFLICT},
+            data=b"[" + b",".join(filas[i:i + lote]) + b"]",
+            headers={"apikey": "clave", "Authorization": "Bearer clave", "Content-Type": "application/json",
+                     "Prefer": "resolution=merge-duplicates,return=minimal"},
+        )
+        resp.raise_for_status()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sincronización con Supabase")
+    parser.add_argument("--csv", default=sincronizacion.CSV_PATH)
+    parser.add_argument("--filas", type=int, default=20000, help="Filas más recientes del CSV a usar")
+    parser.add_argument("--latencia", type=float, default=0.05,
+                        help="Demora simulada por POST en el servidor, del orden de la ida y vuelta a Supabase (segundos)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv).head(args.filas)
+    print(f"{len(df)} filas de {args.csv}, latencia simulada {args.latencia * 1000:.0f} ms por POST\n")
+
+    def demora(filas):
+        time.sleep(args.latencia)
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with ServidorPostgrest() as servidor:
+            servidor.rechazar = demora
+            segundos = secuencial(df, servidor.url, 500)
+            print(f"{'secuencial, 500 por lote':<32} {len(df) / segundos:>10.0f} filas/s  ({segundos:.2f}s)")
+
+        for hilos in (1, 4, 8):
+            with ServidorPostgrest() as servidor, ClientePostgrest(servidor.url, "clave") as cliente:
+                servidor.rechazar = demora
+                estado = os.path.join(tmp, f"estado_{hilos}.json")
+                r = sincronizar(df, cliente, estado_path=estado, hilos=hilos)
+                print(f"{f'sincronizar, {hilos} hilos':<32} {r.filas_por_segundo:>10.0f} filas/s  "
+                      f"({r.segundos:.2f}s, {r.lotes} lotes)")
+
+                # Sincronización diaria: la tabla ya está cargada
+                diaria = sincronizar(df, cliente, estado_path=estado, hilos=hilos)
+                print(f"{'  siguiente ejecución':<32} {diaria.filas:>10} filas    ({diaria.segundos:.2f}s)")
+
+        for ventana in (4, 8):
+            with ServidorPostgrest() as servidor, ClientePostgrest(servidor.url, "clave") as cliente:
+                servidor.rechazar = demora
+                r = migrar(df, cliente, checkpoint_path=os.path.join(tmp, f"migracion_{ventana}.jsonl"),
+                           ventana=ventana)
+                print(f"{f'migrar, ventana {ventana}':<32} {r.filas_por_segundo:>10.0f} filas/s  "
+                      f"({r.segundos:.2f}s, {r.lotes} lotes de {min(r.tamanos)}-{max(r.tamanos)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+bench_spatial_index.py
+
+Latencia por consulta de exporters/spatial_index.py frente a la fuerza bruta
+(haversine con numpy sobre todo el catálogo), más el costo de construir el
+índice y de cargarlo desde el .npz.
+
+Ejecutar desde la raíz del repositorio:
+    python benchmarks/bench_spatial_index.py [--csv data/sismos.csv] [--repeticiones 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from exporters import csv_exporter  # noqa: E402
+from exporters.spatial_index import EARTH_RADIUS_KM, SpatialIndex, load_or_build  # noqa: E402
+
+# (nombre, lat, lon, radio_km)
+CENTROS = [
+    ("San Juan, 50 km", -31.54, -68.53, 50),
+    ("Salta, 20 km", -24.78, -65.41, 20),
+    ("Mendoza, 200 km", -32.89, -68.83, 200),
+    ("Zapala, 10 km", -38.9, -70.07, 10),
+]
+
+
+def haversine(lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> np.ndarray:
+    p1, p2 = np.radians(lat), np.radians(lats)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def medir(fn, repeticiones: int) -> float:
+    """Mediana en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice espacial vs fuerza bruta")
+    parser.add_argument("--csv", default=None, help="CSV de sismos (por defecto el de exporters/config.py)")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    df = csv_exporter.load_sismos(args.csv) if args.csv else csv_exporter.load_sismos()
+    lats = df["latitud"].to_numpy(dtype="float64", na_value=np.nan)
+    lons = df["longitud"].to_numpy(dtype="float64", na_value=np.nan)
+
+    inicio = time.perf_counter()
+    index = SpatialIndex.from_dataframe(df)
+    construir = time.perf_counter() - inicio
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "indice.npz")
+        load_or_build(df, path)
+        inicio = time.perf_counter()
+        load_or_build(df, path)
+        cargar = time.perf_counter() - inicio
+    print(f"{len(df)} eventos ({len(index)} indexados)")
+    print(f"  construir índice: {construir * 1000:.0f} ms, cargar .npz: {cargar * 1000:.0f} ms\n")
+
+    print(f"{'consulta':<28}{'eventos':>9}{'fuerza bruta':>15}{'índice':>10}{'speedup':>10}")
+    for nombre, lat, lon, radio in CENTROS:
+        def bruta():
+            d = haversine(lats, lons, lat, lon)
+            inside = np.flatnonzero(d <= radio)
+            return inside[np.argsort(d[inside])]
+
+        n = len(bruta())
+        t_bruta = medir(bruta, args.repeticiones)
+        t_indice = medir(lambda: index.radius(lat, lon, radio), args.repeticiones)
+        print(f"{'radio ' + nombre:<28}{n:>9}{t_bruta:>13.2f}ms{t_indice:>8.2f}ms{t_bruta / t_indice:>9.1f}x")
+
+    for k in (10, 100):
+        lat, lon = CENTROS[0][1], CENTROS[0][2]
+
+        def bruta_knn():
+            d = haversine(lats, lons, lat, lon)
+            return np.argsort(d)[:k]
+
+        t_bruta = medir(bruta_knn, args.repeticiones)
+        t_indice = medir(lambda: index.nearest(lat, lon, k), args.repeticiones)
+        print(f"{f'{k} vecinos, San Juan':<28}{k:>9}{t_bruta:>13.2f}ms{t_indice:>8.2f}ms{t_bruta / t_indice:>9.1f}x")
+
+    oeste, sur, este, norte = -69.0, -32.0, -68.0, -31.0
+
+    def bruta_bbox():
+        return np.flatnonzero((lons >= oeste) & (lons <= este) & (lats >= sur) & (lats <= norte))
+
+    n = len(bruta_bbox())
+    t_bruta = medir(bruta_bbox, args.repeticiones)
+    t_indice = medir(lambda: index.bbox(oeste, sur, este, norte), args.repeticiones)
+    print(f"{'bbox 1° Cuyo':<28}{n:>9}{t_bruta:>13.2f}ms{t_indice:>8.2f}ms{t_bruta / t_indice:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+binary_exporter.py
+
+Responsabilidad única: exportar el catálogo en un formato binario columnar
+(data/exports/sismos.bin) que el frontend carga directamente en typed arrays
+(Float32Array, Uint32Array, Uint8Array, BigUint64Array) sin parsear texto.
+
+Estructura del archivo (little-endian):
+
+    bytes 0-7    firma b"SISMOBIN"
+    bytes 8-11   uint32 con el largo del header JSON
+    bytes 12-... header JSON (UTF-8), completado con espacios hasta que los
+                 datos empiezan en un múltiplo de 8 (12 + largo del header)
+    columnas     una detrás de otra, cada una alineada a 8 bytes
+
+El header describe cada columna (nombre, tipo, offset desde el inicio de los
+datos y largo en bytes), los diccionarios de las columnas codificadas y los
+valores que representan datos faltantes:
+
+    longitud, latitud, profundidad, magnitud   float32  (NaN si falta)
+    epoch                                      uint32   segundos desde 1970 de fecha + hora
+                                                        tal como figuran en el catálogo (0 si falta)
+    pais, tipo_ubicacion, provincia            uint8    código en el diccionario (255 si falta)
+    cluster_id                                 int32    secuencia sísmica de cluster_detector (-1 si ninguna)
+    id                                         uint64   id_u64 del evento; en hexadecimal con 16 dígitos
+                                                        es el ID de 16 caracteres
+
+Contiene los mismos eventos y en el mismo orden que sismos.geojson.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import json
+import os
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from exporters.config import BINARY_OUT, EXPORTS_DIR
+
+MAGIC = b"SISMOBIN"
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+MISSING_CODE = 255
+
+# (nombre en el archivo, columna del DataFrame)
+FLOAT_COLUMNS = [
+    ("longitud", "longitud"),
+    ("latitud", "latitud"),
+    ("profundidad", "profundidad"),
+    ("magnitud", "magnitud"),
+]
+CODED_COLUMNS = [
+    ("pais", "pais"),
+    ("tipo_ubicacion", "tipo_ubicacion"),
+    ("provincia", "provincia_normalizada"),
+]
+
+
+def export(df: pd.DataFrame) -> None:
+    """
+    Genera data/exports/sismos.bin a partir del DataFrame recibido.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    df_geo = df.dropna(subset=["latitud", "longitud"])
+    columns, dictionaries = build_columns(df_geo)
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    size = write_binary(BINARY_OUT, len(df_geo), columns, dictionaries)
+    print(f"  [OK] Binario columnar exportado: {len(df_geo)} eventos, {size / 1e6:.1f} MB -> {BINARY_OUT}")
+
+
+def build_columns(df_geo: pd.DataFrame) -> Tuple[List[Tuple[str, np.ndarray]], Dict[str, List[str]]]:
+    """
+    Arma las columnas del archivo como arrays numpy con el dtype final.
+
+    Returns:
+        ([(nombre, array)], {nombre: diccionario}) en el orden en que se escriben.
+    """
+    columns = []
+    for name, column in FLOAT_COLUMNS:
+        columns.append((name, df_geo[column].to_numpy(dtype="<f4", na_value=np.nan)))
+    columns.append(("epoch", _epoch_seconds(df_geo)))
+
+    dictionaries = {}
+    for name, column in CODED_COLUMNS:
+        codes, uniques = pd.factorize(df_geo[column], sort=True)
+        if len(uniques) >= MISSING_CODE:
+            raise ValueError(f"La columna {column} tiene {len(uniques)} valores: no entra en uint8")
+        columns.append((name, np.where(codes < 0, MISSING_CODE, codes).astype(np.uint8)))
+        dictionaries[name] = [str(v) for v in uniques.tolist()]
+
+    if "cluster_id" in df_geo.columns:
+        clusters = df_geo["cluster_id"].to_numpy(dtype="int64", na_value=-1)
+    else:
+        clusters = np.full(len(df_geo), -1)
+    columns.append(("cluster_id", clusters.astype("<i4")))
+
+    # Little-endian como el resto: un BigUint64Array sobre la columna devuelve id_u64
+    columns.append(("id", df_geo["id_u64"].to_numpy(dtype=np.uint64).astype("<u8")))
+    return columns, dictionaries
+
+
+def write_binary(path: str, n: int, columns: List[Tuple[str, np.ndarray]],
+                 dictionaries: Dict[str, List[str]]) -> int:
+    """
+    Escribe el archivo binario. Cada columna se escribe directamente desde el
+    buffer de su array (sin pasar por bytes intermedios).
+
+    Returns:
+        Tamaño del archivo en bytes.
+    """
+    descriptors = []
+    offset = 0
+    for name, values in columns:
+        descriptors.append({
+            "nombre": name,
+            "tipo": _type_name(values),
+            "offset": offset,
+            "bytes": int(values.nbytes),
+        })
+        offset += _aligned(values.nbytes)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "registros": n,
+        "columnas": descriptors,
+        "diccionarios": dictionaries,
+        "faltantes": {"float32": "NaN", "uint32": 0, "uint8": MISSING_CODE, "int32": -1},
+    }
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_length = _aligned(len(MAGIC) + 4 + len(encoded)) - len(MAGIC) - 4
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", header_length))
+        f.write(encoded.ljust(header_length, b" "))
+        for _, values in columns:
+            f.write(memoryview(np.ascontiguousarray(values)).cast("B"))
+            f.write(b"\0" * (_aligned(values.nbytes) - values.nbytes))
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def read_binary(path: str) -> Dict[str, object]:
+    """
+    Lee un archivo generado por este módulo (mapeado en memoria, sin copias).
+    Útil para tests y para inspeccionar el formato desde Python.
+
+    Returns:
+        {"header": dict, <nombre de columna>: np.ndarray}
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} no es un archivo {MAGIC.decode()}")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+
+    raw = np.memmap(path, dtype=np.uint8, mode="r", offset=len(MAGIC) + 4 + header_length)
+    result = {"header": header}
+    for column in header["columnas"]:
+        dtype = {
+            "float32": "<f4", "uint32": "<u4", "uint8": "u1", "int32": "<i4", "uint64": "<u8",
+            # Versión 1: IDs como 8 bytes big-endian
+            "bytes8": ">u8",
+        }[column["tipo"]]
+        chunk = raw[column["offset"]:column["offset"] + column["bytes"]]
+        result[column["nombre"]] = chunk.view(dtype)
+    return result
+
+
+def _epoch_seconds(df_geo: pd.DataFrame) -> np.ndarray:
+    """Segundos desde 1970-01-01 de fecha + hora (0 si falta o no se puede parsear)."""
+    moments = pd.to_datetime(
+        df_geo["fecha"].astype("string") + " " + df_geo["hora"].astype("string"),
+        format="%d/%m/%Y %H:%M:%S", errors="coerce",
+    )
+    seconds = moments.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    valid = moments.notna().to_numpy() & (seconds > 0) & (seconds <= np.iinfo(np.uint32).max)
+    return np.where(valid, seconds, 0).astype("<u4")
+
+
+def _type_name(values: np.ndarray) -> str:
+    return {"f": "float", "u": "uint", "i": "int"}[values.dtype.kind] + str(values.dtype.itemsize * 8)
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
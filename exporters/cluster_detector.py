@@ -0,0 +1,124 @@
+"""
+cluster_detector.py
+
+Agrupa los eventos del catálogo en secuencias sísmicas (réplicas y enjambres)
+por densidad en espacio y tiempo, al estilo ST-DBSCAN:
+
+- dos eventos son vecinos si están a no más de CLUSTER_RADIUS_KM y
+  CLUSTER_WINDOW_HOURS entre sí;
+- un evento es núcleo si su vecindario (incluido él mismo) tiene al menos
+  CLUSTER_MIN_EVENTS eventos;
+- los núcleos vecinos forman un mismo cluster y cada evento no núcleo con algún
+  núcleo vecino se suma al cluster del más cercano; el resto no pertenece a ninguno.
+
+Los pares de vecinos salen del auto-join espacio-temporal de spatial_index
+(pairs_within), O(n log n + pares), y las componentes conexas se calculan con
+propagación de etiquetas vectorizada: cada arista engancha la raíz mayor a la
+menor y luego se saltan punteros hasta que cada evento apunta a su raíz.
+
+Los clusters se numeran en orden cronológico de su primer evento. La
+numeración no es estable entre corridas: un evento nuevo puede unir dos
+clusters, o convertir eventos antiguos en un cluster nuevo que empieza antes
+que otros ya existentes, y en ambos casos se corren los números siguientes.
+Para seguir una secuencia entre exportaciones conviene usar el id de su sismo
+principal.
+
+Lo invoca run_exports una sola vez por corrida (no csv_exporter.load_sismos),
+así que cargar el catálogo no depende del clustering ni de su caché.
+
+No modifica el CSV fuente, SQLite ni Supabase.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exporters.config import (
+    CLUSTER_MIN_EVENTS,
+    CLUSTER_RADIUS_KM,
+    CLUSTER_WINDOW_HOURS,
+    SPATIAL_INDEX_CACHE,
+)
+from exporters.spatial_index import SpatialIndex, load_or_build
+
+NO_CLUSTER = -1
+
+
+def detect_clusters(index: SpatialIndex, n: int, radius_km: float = CLUSTER_RADIUS_KM,
+                    window_hours: float = CLUSTER_WINDOW_HOURS,
+                    min_events: int = CLUSTER_MIN_EVENTS) -> np.ndarray:
+    """
+    Cluster de cada fila del DataFrame indexado.
+
+    Args:
+        index: índice construido sobre el DataFrame.
+        n: cantidad de filas del DataFrame.
+
+    Returns:
+        Array int64 de largo n con el número de cluster (NO_CLUSTER si no pertenece a ninguno).
+    """
+    a, b, dist = index.pairs_within(radius_km, window_hours * 3600)
+    neighbors = np.bincount(a, minlength=n) + np.bincount(b, minlength=n) + 1
+    core = neighbors >= min_events
+
+    both = core[a] & core[b]
+    roots = _components(n, a[both], b[both])
+    labels = np.where(core, roots, NO_CLUSTER)
+
+    # Bordes: eventos no núcleo, al cluster del núcleo vecino más cercano
+    one = core[a] != core[b]
+    border = np.where(core[a], b, a)[one]
+    anchor = np.where(core[a], a, b)[one]
+    if len(border):
+        order = np.lexsort((dist[one], border))
+        first = order[np.concatenate([[True], border[order][1:] != border[order][:-1]])]
+        labels[border[first]] = roots[anchor[first]]
+
+    # Numeración cronológica (los eventos agrupados siempre tienen fecha)
+    members = np.flatnonzero(labels != NO_CLUSTER)
+    if not len(members):
+        return labels
+    epoch = np.zeros(n, dtype=np.int64)
+    epoch[index.positions] = index.epoch
+    order = np.lexsort((members, epoch[members], labels[members]))
+    grouped = labels[members][order]
+    starts = np.flatnonzero(np.concatenate([[True], grouped[1:] != grouped[:-1]]))
+    first_events = members[order][starts]
+    chronological = np.lexsort((first_events, epoch[first_events]))
+    rank = np.empty(len(starts), dtype=np.int64)
+    rank[chronological] = np.arange(len(starts))
+    labels[members[order]] = np.repeat(rank, np.diff(np.append(starts, len(members))))
+    return labels
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Raíz (el menor índice) de la componente conexa de cada nodo del grafo de aristas (a, b)."""
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        differ = la != lb
+        if not differ.any():
+            return labels
+        # Engancha la raíz mayor de cada arista a la menor
+        np.minimum.at(labels, np.maximum(la[differ], lb[differ]), np.minimum(la[differ], lb[differ]))
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+
+
+def enrich_clusters(df: pd.DataFrame, index_path: Optional[str] = SPATIAL_INDEX_CACHE) -> pd.DataFrame:
+    """
+    Agrega la columna cluster_id (Int32, nula para los eventos que no forman
+    parte de ninguna secuencia).
+
+    Args:
+        index_path: .npz del índice espacial a reutilizar (None para no usar el disco).
+    """
+    index = load_or_build(df, index_path)
+    labels = detect_clusters(index, len(df))
+    df["cluster_id"] = pd.Series(
+        pd.arrays.IntegerArray(labels.astype(np.int32), labels == NO_CLUSTER), index=df.index,
+    )
+    return df
@@ -0,0 +1,132 @@
+"""
+clusters_exporter.py
+
+Responsabilidad única: exportar las secuencias sísmicas detectadas por
+cluster_detector (réplicas y enjambres) a data/exports/clusters.json.
+
+Por cada cluster: sismo principal (el de mayor magnitud), IDs de todos sus
+eventos en orden cronológico, bounding box e intervalo de tiempo. El número de
+cluster es el mismo de la columna cluster_id que reciben los demás exportadores.
+
+Un cluster se marca como "replicas" si su sismo principal supera en al menos
+MAINSHOCK_GAP a todos los demás eventos, y como "enjambre" si no hay un evento
+dominante.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from exporters import compression
+from exporters.cluster_detector import NO_CLUSTER, enrich_clusters
+from exporters.config import (
+    CLUSTER_MIN_EVENTS,
+    CLUSTER_RADIUS_KM,
+    CLUSTER_WINDOW_HOURS,
+    CLUSTERS_OUT,
+    EXPORTS_DIR,
+)
+
+# Diferencia mínima de magnitud entre el sismo principal y el siguiente para hablar de réplicas
+MAINSHOCK_GAP = 0.5
+
+
+def export(df: pd.DataFrame) -> None:
+    """
+    Genera data/exports/clusters.json a partir del DataFrame recibido.
+
+    Usa la columna cluster_id que agrega run_exports; si no está, detecta los
+    clusters sin pasar por el caché del índice espacial.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    if "cluster_id" not in df.columns:
+        df = enrich_clusters(df.copy(), index_path=None)
+    result = build_clusters(df)
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    with compression.open_text(CLUSTERS_OUT) as f:
+        json.dump(result, f, ensure_ascii=False)
+
+    print(f"  [OK] Clusters exportados: {result['total_clusters']} secuencias, "
+          f"{result['eventos_en_clusters']} eventos -> {CLUSTERS_OUT}")
+
+
+def build_clusters(df: pd.DataFrame) -> dict:
+    """
+    Arma el contenido de clusters.json a partir de la columna cluster_id.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    labels = df["cluster_id"].to_numpy(dtype="int64", na_value=NO_CLUSTER)
+    members = np.flatnonzero(labels != NO_CLUSTER)
+    stamps = pd.to_datetime(
+        df["fecha"].iloc[members] + " " + df["hora"].iloc[members], format="%d/%m/%Y %H:%M:%S", errors="coerce",
+    )
+    epoch = stamps.to_numpy(dtype="datetime64[s]")
+
+    # Eventos agrupados por cluster y, dentro de cada uno, en orden cronológico
+    order = np.lexsort((members, epoch.view(np.int64), labels[members]))
+    members, epoch = members[order], epoch[order]
+    grouped = labels[members]
+    starts = np.flatnonzero(np.concatenate([[True], grouped[1:] != grouped[:-1]])) if len(members) else []
+    ends = np.append(starts[1:], len(members)) if len(members) else []
+
+    ids = df["id"].to_numpy(dtype=object)
+    lat = df["latitud"].to_numpy(dtype="float64", na_value=np.nan)
+    lon = df["longitud"].to_numpy(dtype="float64", na_value=np.nan)
+    mag = df["magnitud"].to_numpy(dtype="float64", na_value=np.nan)
+    prof = df["profundidad"].to_numpy(dtype="float64", na_value=np.nan)
+    provincias = df["provincia_normalizada"].to_numpy(dtype=object)
+
+    clusters = []
+    for start, end in zip(starts, ends):
+        rows = members[start:end]
+        ranked = np.where(np.isnan(mag[rows]), -np.inf, mag[rows])
+        # El primero en orden cronológico si hay empate de magnitud
+        main = rows[int(np.argmax(ranked))]
+        runner_up = np.partition(ranked, -2)[-2] if len(rows) > 1 else -np.inf
+        clusters.append({
+            "cluster_id": int(grouped[start]),
+            "tipo": "replicas" if ranked.max() - runner_up >= MAINSHOCK_GAP else "enjambre",
+            "eventos": len(rows),
+            "sismo_principal": {
+                "id": str(ids[main]),
+                "fecha": df["fecha"].iloc[main],
+                "hora": df["hora"].iloc[main],
+                "magnitud": _nullable(mag[main]),
+                "profundidad": _nullable(prof[main]),
+                "latitud": _nullable(lat[main]),
+                "longitud": _nullable(lon[main]),
+                "provincia": provincias[main] if pd.notna(provincias[main]) else None,
+            },
+            "inicio": str(epoch[start]),
+            "fin": str(epoch[end - 1]),
+            "duracion_horas": round(float((epoch[end - 1] - epoch[start]) / np.timedelta64(1, "h")), 2),
+            "bounding_box": {
+                "west": float(lon[rows].min()),
+                "east": float(lon[rows].max()),
+                "south": float(lat[rows].min()),
+                "north": float(lat[rows].max()),
+            },
+            "ids": [str(v) for v in ids[rows]],
+        })
+
+    return {
+        "parametros": {
+            "radio_km": CLUSTER_RADIUS_KM,
+            "ventana_horas": CLUSTER_WINDOW_HOURS,
+            "eventos_minimos": CLUSTER_MIN_EVENTS,
+        },
+        "total_clusters": len(clusters),
+        "eventos_en_clusters": int(len(members)),
+        "clusters": clusters,
+    }
+
+
+def _nullable(value: float):
+    return None if np.isnan(value) else float(value)
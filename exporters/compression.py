@@ -0,0 +1,170 @@
+"""
+compression.py
+
+Escritura de archivos de exportación con sidecars precomprimidos (.gz y .br)
+generados en la misma pasada que escribe el archivo original.
+
+Los hostings estáticos y CDNs no siempre comprimen al vuelo; con los sidecars
+el cliente puede pedir directamente sismos.geojson.gz / .br. Cada bloque que
+se escribe en el archivo se entrega también a los compresores, así que no hace
+falta volver a leer el archivo al terminar.
+
+brotli es opcional: si el módulo no está instalado, el sidecar .br se omite
+con un aviso.
+
+Solo escribe en data/exports/. No modifica sismos.csv, SQLite ni Supabase.
+"""
+import contextlib
+import io
+import os
+import time
+import zlib
+from typing import Iterator, List, Optional, Sequence, TextIO
+
+from exporters.config import BROTLI_QUALITY, COMPRESSED_SIDECARS, GZIP_LEVEL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Buffer de escritura (los compresores reciben bloques de 1 MB)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Resultados de compresión de este proceso, pendientes de reportar (ver pop_reports)
+_reports: List[dict] = []
+
+
+@contextlib.contextmanager
+def open_text(path: str, sidecars: Optional[Sequence[str]] = None) -> Iterator[TextIO]:
+    """
+    Abre path para escritura de texto UTF-8 y genera en la misma pasada los
+    sidecars comprimidos indicados ("gz", "br").
+
+    El archivo y los sidecars se escriben en temporales y se reemplazan juntos
+    al cerrar, así nunca quedan publicados contenidos de distintas versiones.
+
+    Args:
+        path: archivo de salida.
+        sidecars: extensiones a generar; por defecto COMPRESSED_SIDECARS.
+    """
+    if sidecars is None:
+        sidecars = COMPRESSED_SIDECARS
+    compressors = [_make_compressor(ext) for ext in sidecars]
+    compressors = [c for c in compressors if c is not None]
+
+    targets = [path] + [f"{path}.{c.extension}" for c in compressors]
+    files = [open(f"{target}.tmp", "wb") for target in targets]
+    raw = _TeeWriter(files[0], list(zip(compressors, files[1:])))
+    text = io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER_SIZE), encoding="utf-8")
+    try:
+        yield text
+        text.flush()
+        raw.finish()
+        text.close()
+    except BaseException:
+        with contextlib.suppress(Exception):
+            text.close()
+        for f in files:
+            f.close()
+        for target in targets:
+            with contextlib.suppress(OSError):
+                os.remove(f"{target}.tmp")
+        raise
+
+    for f in files:
+        f.close()
+    for target in targets:
+        os.replace(f"{target}.tmp", target)
+    # Sidecars de una configuración anterior quedarían desactualizados
+    for ext in ("gz", "br"):
+        if ext not in [c.extension for c in compressors]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(f"{path}.{ext}")
+
+    _reports.append({
+        "archivo": os.path.basename(path),
+        "bytes": raw.raw_bytes,
+        "sidecars": {c.extension: (c.compressed_bytes, c.seconds) for c in compressors},
+    })
+
+
+def pop_reports() -> List[dict]:
+    """Devuelve y descarta los resultados de compresión acumulados en este proceso."""
+    reports = list(_reports)
+    _reports.clear()
+    return reports
+
+
+def format_report(report: dict) -> List[str]:
+    """Líneas legibles con el tamaño, la relación de compresión y el tiempo de cada sidecar."""
+    lines = []
+    for ext, (compressed, seconds) in report["sidecars"].items():
+        ratio = report["bytes"] / compressed if compressed else 0.0
+        lines.append(
+            f"{report['archivo']}.{ext}: {report['bytes'] / 1e6:.2f} MB -> {compressed / 1e6:.2f} MB "
+            f"({ratio:.1f}x) en {seconds:.2f} s"
+        )
+    return lines
+
+
+class _TeeWriter(io.RawIOBase):
+    """Destino binario que escribe en el archivo y alimenta a los compresores."""
+
+    def __init__(self, f, sidecars):
+        self._f = f
+        self._sidecars = sidecars
+        self.raw_bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._f.write(data)
+        for compressor, f in self._sidecars:
+            f.write(compressor.compress(data))
+        self.raw_bytes += len(data)
+        return len(data)
+
+    def finish(self) -> None:
+        for compressor, f in self._sidecars:
+            f.write(compressor.flush())
+
+
+class _Compressor:
+    """Compresor incremental que mide bytes producidos y tiempo de CPU."""
+
+    def __init__(self, extension: str, compress, flush):
+        self.extension = extension
+        self._compress = compress
+        self._flush = flush
+        self.compressed_bytes = 0
+        self.seconds = 0.0
+
+    def compress(self, data) -> bytes:
+        start = time.perf_counter()
+        out = self._compress(bytes(data))
+        self.seconds += time.perf_counter() - start
+        self.compressed_bytes += len(out)
+        return out
+
+    def flush(self) -> bytes:
+        start = time.perf_counter()
+        out = self._flush()
+        self.seconds += time.perf_counter() - start
+        self.compressed_bytes += len(out)
+        return out
+
+
+def _make_compressor(extension: str) -> Optional[_Compressor]:
+    if extension == "gz":
+        # wbits=31: formato gzip con header fijo (mtime 0), salida reproducible
+        gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return _Compressor("gz", gz.compress, gz.flush)
+    if extension == "br":
+        if brotli is None:
+            print("  [WARN] brotli no está instalado: se omite el sidecar .br")
+            return None
+        br = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+        return _Compressor("br", br.process, br.finish)
+    raise ValueError(f"Sidecar de compresión desconocido: {extension}")
@@ -10,6 +10,7 @@ REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # Archivos de entrada (producidos por el pipeline)
 DATA_DIR = os.path.join(REPO_ROOT, "data")
 SISMOS_CSV = os.path.join(DATA_DIR, "sismos.csv")
+PROVINCIAS_GEOJSON = os.path.join(DATA_DIR, "provincia", "ProvinciasArgentina.geojson")
 
 # Directorio de salida de exportaciones
 EXPORTS_DIR = os.path.join(DATA_DIR, "exports")
@@ -20,7 +21,64 @@ METADATA_OUT = os.path.join(EXPORTS_DIR, "metadata.json")
 RECENT_OUT = os.path.join(EXPORTS_DIR, "sismos_recientes.json")
 SAMPLE_OUT = os.path.join(EXPORTS_DIR, "sample.geojson")
 STATS_OUT = os.path.join(EXPORTS_DIR, "stats.json")
+TILES_OUT = os.path.join(EXPORTS_DIR, "sismos.pmtiles")
+BINARY_OUT = os.path.join(EXPORTS_DIR, "sismos.bin")
+CLUSTERS_OUT = os.path.join(EXPORTS_DIR, "clusters.json")
+GUTENBERG_RICHTER_OUT = os.path.join(EXPORTS_DIR, "gutenberg_richter.json")
+
+# GeoJSON particionado en celdas de una grilla lat/lon
+SHARDS_DIR = os.path.join(EXPORTS_DIR, "celdas")
+SHARDS_MANIFEST_OUT = os.path.join(SHARDS_DIR, "manifest.json")
+
+# GeoJSON particionado por año / mes
+PERIODS_DIR = os.path.join(EXPORTS_DIR, "periodos")
+PERIODS_INDEX_OUT = os.path.join(PERIODS_DIR, "index.json")
+
+# Caché local de la etapa de exportación (no se publica)
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+LOCATION_CACHE = os.path.join(CACHE_DIR, "ubicaciones.json")
+ENRICHED_CACHE_DIR = os.path.join(CACHE_DIR, "sismos")
+EXPORT_STATE_DIR = os.path.join(CACHE_DIR, "exportacion")
+SPATIAL_INDEX_CACHE = os.path.join(CACHE_DIR, "indice_espacial.npz")
 
 # Cantidad de registros para la exportación "recientes"
 RECENT_LIMIT = 500
 SAMPLE_TARGET_SIZE = 200
+
+# Tamaño (en grados) de las celdas de la grilla de shards_exporter
+SHARD_CELL_DEGREES = 2.0
+
+# Alto (en grados de latitud) de las franjas del índice de bordes de province_locator
+PROVINCE_SLAB_DEGREES = 0.1
+
+# Tamaño (en grados) de las celdas de la grilla de spatial_index
+SPATIAL_INDEX_CELL_DEGREES = 0.25
+
+# Secuencias sísmicas de cluster_detector: distancia y separación temporal máximas
+# entre vecinos y eventos mínimos en el vecindario de un núcleo
+CLUSTER_RADIUS_KM = 15.0
+CLUSTER_WINDOW_HOURS = 72
+CLUSTER_MIN_EVENTS = 5
+
+# Estadística magnitud-frecuencia de gutenberg_richter_exporter: ancho de los bins de
+# magnitud, corrección sumada a la Mc por máxima curvatura, eventos mínimos sobre Mc
+# para estimar b y largo (en años) de las ventanas móviles
+GR_MAGNITUDE_BIN = 0.1
+GR_MC_CORRECTION = 0.2
+GR_MIN_EVENTS = 50
+GR_WINDOW_YEARS = 5
+
+# Generar también las particiones mensuales de periods_exporter
+PERIODS_MONTHLY = True
+
+# Sidecars precomprimidos de sismos.geojson, sismos_recientes.json y sample.geojson
+# ("gz" y/o "br"; vacío para desactivarlos). .br requiere el paquete brotli.
+COMPRESSED_SIDECARS = ("gz", "br")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Pirámide de teselas vectoriales (PMTiles)
+TILES_MIN_ZOOM = 0
+TILES_MAX_ZOOM = 10
+# Tamaño de celda (en unidades de tesela, extent 4096) para el raleo por magnitud
+TILES_THIN_CELL = 128
@@ -5,12 +5,30 @@ Responsabilidad única: leer sismos.csv, calcular el ID determinístico único p
 y aplicar la capa de normalización de ubicación. Devuelve un DataFrame enriquecido
 listo para ser consumido por los demás exportadores.
 
-No escribe ningún archivo. No modifica sismos.csv, SQLite ni Supabase.
+Solo escribe su propio caché local (data/cache/). No modifica sismos.csv, SQLite ni Supabase.
 """
 import hashlib
+import io
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-from exporters.config import SISMOS_CSV
-from exporters.location_normalizer import normalize_location
+from exporters.config import SISMOS_CSV, LOCATION_CACHE, ENRICHED_CACHE_DIR
+from exporters.location_normalizer import normalize_location, normalize_many
+from exporters.province_locator import enrich_geographic_province
+
+# Columnas derivadas de normalize_location: (columna del DataFrame, clave del dict)
+LOCATION_FIELDS = [
+    ("ubicacion_normalizada", "ubicacion_normalizada"),
+    ("provincia_normalizada", "provincia"),
+    ("provincias", "provincias"),
+    ("pais", "pais"),
+    ("tipo_ubicacion", "tipo_ubicacion"),
+    ("es_argentina", "es_argentina"),
+    ("es_limite", "es_limite"),
+]
 
 
 def make_deterministic_id(row: pd.Series) -> str:
@@ -29,7 +47,67 @@ def make_deterministic_id(row: pd.Series) -> str:
     return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()[:16]
 
 
-def load_sismos() -> pd.DataFrame:
+def make_deterministic_ids(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """
+    Versión por lotes de make_deterministic_id: produce exactamente los mismos IDs
+    para todas las filas del DataFrame en una sola pasada.
+
+    Las claves se arman columna por columna con operaciones vectorizadas de numpy
+    y cada clave se hashea una única vez. De cada digest se toman los primeros
+    8 bytes, que son a la vez el ID hexadecimal de 16 caracteres y su
+    representación entera sin signo de 64 bits.
+
+    Returns:
+        (ids, ids_u64): lista de IDs hexadecimales y array uint64 paralelo.
+    """
+    key = _text_key_part(df, "fecha")
+    for part in (
+        _text_key_part(df, "hora"),
+        _numeric_key_part(df, "latitud", "%.4f"),
+        _numeric_key_part(df, "longitud", "%.4f"),
+        _numeric_key_part(df, "profundidad", "%.1f"),
+        _numeric_key_part(df, "magnitud", "%.1f"),
+    ):
+        key = np.char.add(np.char.add(key, "|"), part)
+
+    sha256 = hashlib.sha256
+    digests = b"".join(sha256(k.encode("utf-8")).digest()[:8] for k in key.tolist())
+
+    hex_digests = digests.hex()
+    ids = [hex_digests[i:i + 16] for i in range(0, len(hex_digests), 16)]
+    ids_u64 = np.frombuffer(digests, dtype=">u8").astype(np.uint64)
+    return ids, ids_u64
+
+
+def id_to_u64(feature_id: str) -> int:
+    """Convierte un ID hexadecimal de 16 caracteres a su valor entero de 64 bits."""
+    return int(feature_id, 16)
+
+
+def u64_to_ids(ids_u64: np.ndarray) -> List[str]:
+    """Reconstruye los IDs hexadecimales a partir de su representación uint64."""
+    hex_digests = np.asarray(ids_u64, dtype=">u8").tobytes().hex()
+    return [hex_digests[i:i + 16] for i in range(0, len(hex_digests), 16)]
+
+
+def _text_key_part(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Equivalente vectorizado de str(row.get(column, "")).strip()."""
+    if column not in df.columns:
+        return np.full(len(df), "", dtype=str)
+    return np.char.strip(df[column].to_numpy(dtype=object).astype(str))
+
+
+def _numeric_key_part(df: pd.DataFrame, column: str, fmt: str) -> np.ndarray:
+    """Equivalente vectorizado de f"{float(valor):<fmt>}" con "" para valores nulos."""
+    if column not in df.columns:
+        return np.full(len(df), "", dtype=str)
+    values = df[column].to_numpy(dtype="float64", na_value=np.nan)
+    missing = np.isnan(values)
+    formatted = np.char.mod(fmt, np.where(missing, 0.0, values))
+    return np.where(missing, "", formatted)
+
+
+def load_sismos(csv_path: Optional[str] = None, use_cache: bool = True) -> pd.DataFrame:
     """
     Lee sismos.csv y devuelve un DataFrame con tipos normalizados, IDs determinísticos
     y campos de ubicación enriquecidos.
@@ -38,12 +116,73 @@ def load_sismos() -> pd.DataFrame:
     - profundidad: extrae valor numérico (quita ' Km' si está presente)
     - magnitud, latitud, longitud, profundidad: numérico
     - id: SHA-256 de 16 caracteres
+    - id_u64: mismo ID como entero uint64 (para joins, deduplicación y diferencias
+      entre corridas sin comparar strings)
     - campos de ubicación enriquecidos (provincia_normalizada, pais, es_argentina, etc.)
+    - provincia_geografica / provincia_discrepante: provincia según las coordenadas
+      (ver province_locator) y si difiere de la derivada de la cadena
+
+    Con use_cache=True el catálogo ya parseado y con IDs se guarda en un caché
+    columnar (data/cache/sismos/) indexado por la huella SHA-256 del CSV y la
+    versión del código de enriquecimiento:
+    - si el CSV no cambió, se carga desde el caché sin parsear ni hashear;
+    - si solo se agregaron filas al principio (como hace actualizar_sismos.py),
+      se procesan únicamente esas filas y se unen al caché.
+    El resultado queda indicado en df.attrs["cache"] ("hit", "prefix" o "miss").
 
     No modifica el CSV de origen.
     """
-    df = pd.read_csv(SISMOS_CSV)
+    csv_path = csv_path or SISMOS_CSV
+    with open(csv_path, "rb") as f:
+        content = f.read()
+
+    if use_cache:
+        df, status = _load_with_cache(content, ENRICHED_CACHE_DIR)
+    else:
+        df, status = _prepare(pd.read_csv(io.BytesIO(content))), "disabled"
+
+    # Enriquecer ubicación usando location_normalizer y los polígonos de provincias
+    df = enrich_location(df, cache_path=LOCATION_CACHE if use_cache else None)
+    df = enrich_geographic_province(df)
+    df.attrs["cache"] = status
+    return df
+
+
+def load_cached() -> Optional[pd.DataFrame]:
+    """
+    Devuelve el catálogo enriquecido directamente desde el caché columnar, sin leer
+    ni verificar sismos.csv (None si no hay un caché válido).
+
+    Pensado para procesos secundarios que comparten el catálogo ya cargado por
+    load_sismos(): las columnas numéricas se abren con mmap, por lo que todos los
+    procesos leen las mismas páginas del archivo en lugar de recibir copias.
+    """
+    manifest = _read_cache_manifest(ENRICHED_CACHE_DIR)
+    if manifest is None:
+        return None
+    df = enrich_location(_read_cache(ENRICHED_CACHE_DIR, manifest), cache_path=LOCATION_CACHE)
+    df = enrich_geographic_province(df)
+    df.attrs["cache"] = "shared"
+    return df
+
+
+def cache_matches(df: pd.DataFrame) -> bool:
+    """
+    True si el caché columnar contiene exactamente el catálogo de df (mismos IDs
+    en el mismo orden), es decir, si load_cached() devolvería el mismo catálogo.
+    """
+    manifest = _read_cache_manifest(ENRICHED_CACHE_DIR)
+    if manifest is None or manifest.get("rows") != len(df):
+        return False
+    try:
+        ids = np.load(os.path.join(ENRICHED_CACHE_DIR, "id_u64.npy"), mmap_mode="r")
+    except (OSError, ValueError):
+        return False
+    return np.array_equal(ids, df["id_u64"].to_numpy())
 
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza tipos y genera los IDs de un DataFrame recién leído del CSV."""
     # Profundidad: puede venir como "10 Km" o "10"
     if df["profundidad"].dtype == object:
         df["profundidad"] = (
@@ -56,19 +195,154 @@ def load_sismos() -> pd.DataFrame:
         ["magnitud", "latitud", "longitud", "profundidad"]
     ].apply(pd.to_numeric, errors="coerce")
 
-    # Generar ID determinístico de 16 caracteres
-    df["id"] = df.apply(make_deterministic_id, axis=1)
+    # Generar ID determinístico de 16 caracteres (y su forma uint64) por lotes
+    df["id"], df["id_u64"] = make_deterministic_ids(df)
+    return df
+
+
+def enrichment_version() -> str:
+    """
+    Versión del código que produce las columnas cacheadas: cambia si se modifica
+    este módulo o la versión de pandas (que define cómo se parsea el CSV).
+    """
+    with open(__file__, "rb") as f:
+        source = f.read()
+    return hashlib.sha256(source + pd.__version__.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_with_cache(content: bytes, cache_dir: str) -> Tuple[pd.DataFrame, str]:
+    """Carga el catálogo desde el caché columnar, procesando solo lo que cambió."""
+    header, _, body = content.partition(b"\n")
+    fingerprint = hashlib.sha256(content).hexdigest()
+    manifest = _read_cache_manifest(cache_dir)
+
+    if manifest is not None and manifest["fingerprint"] == fingerprint:
+        return _read_cache(cache_dir, manifest), "hit"
+
+    df, status = None, "miss"
+    if manifest is not None and manifest["header"] == header.decode("utf-8"):
+        cached_len = manifest["body_bytes"]
+        new_len = len(body) - cached_len
+        # Las filas nuevas tienen que terminar en un salto de línea: si no, se editó la primera fila cacheada
+        if (
+            new_len > 0
+            and body[:new_len].endswith(b"\n")
+            and hashlib.sha256(body[new_len:]).hexdigest() == manifest["body_sha256"]
+        ):
+            cached = _read_cache(cache_dir, manifest)
+            prefix = _prepare(pd.read_csv(io.BytesIO(header + b"\n" + body[:new_len])))
+            for column, spec in manifest["columns"].items():
+                if column in prefix.columns and str(prefix[column].dtype) != spec["dtype"]:
+                    prefix[column] = prefix[column].astype(spec["dtype"])
+            df = pd.concat([prefix[cached.columns], cached], ignore_index=True)
+            status = "prefix"
+
+    if df is None:
+        df = _prepare(pd.read_csv(io.BytesIO(content)))
+
+    try:
+        _write_cache(cache_dir, df, header, body, fingerprint)
+    except OSError as e:
+        print(f"  [WARN] No se pudo escribir el caché de sismos: {e}")
+    return df, status
+
 
-    # Enriquecer ubicación usando location_normalizer
-    loc_meta = df["provincia"].apply(normalize_location)
+def _read_cache_manifest(cache_dir: str) -> Optional[Dict[str, Any]]:
+    """Devuelve el manifiesto del caché si existe y corresponde a la versión actual."""
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != enrichment_version():
+        return None
+    return manifest
+
+
+def _read_cache(cache_dir: str, manifest: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Reconstruye el DataFrame desde los arrays .npy del caché.
+
+    Las columnas numéricas se abren con mmap (sin copiarlas a memoria); las de
+    texto se guardan codificadas como diccionario (códigos + valores únicos).
+    """
+    data = {}
+    for column, spec in manifest["columns"].items():
+        values = np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode="r")
+        if "uniques" in spec:
+            uniques = np.empty(len(spec["uniques"]) + 1, dtype=object)
+            uniques[:-1] = spec["uniques"]
+            uniques[-1] = np.nan
+            data[column] = pd.Series(uniques[values], dtype=spec["dtype"])
+        else:
+            data[column] = pd.Series(values, dtype=spec["dtype"], copy=False)
+
+    df = pd.DataFrame(data)
+    df["id"] = pd.Series(u64_to_ids(df["id_u64"].to_numpy()), dtype=manifest["id_dtype"])
+    return df[manifest["order"]]
+
+
+def _write_cache(cache_dir: str, df: pd.DataFrame, header: bytes, body: bytes, fingerprint: str) -> None:
+    """Guarda el DataFrame (sin la columna id, derivable de id_u64) en el caché."""
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    # Sin manifiesto el caché se considera inválido mientras se reescriben los arrays
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    columns = {}
+    for column in df.columns:
+        if column == "id":
+            continue
+        series = df[column]
+        spec = {"dtype": str(series.dtype)}
+        if series.dtype.kind in "biuf":
+            values = series.to_numpy()
+        else:
+            codes, uniques = pd.factorize(series)
+            values = codes.astype(np.int32)
+            spec["uniques"] = uniques.tolist()
+        np.save(os.path.join(cache_dir, f"{column}.npy"), values)
+        columns[column] = spec
+
+    manifest = {
+        "version": enrichment_version(),
+        "fingerprint": fingerprint,
+        "header": header.decode("utf-8"),
+        "body_bytes": len(body),
+        "body_sha256": hashlib.sha256(body).hexdigest(),
+        "rows": len(df),
+        "order": list(df.columns),
+        "id_dtype": str(df["id"].dtype),
+        "columns": columns,
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def enrich_location(df: pd.DataFrame, cache_path: Optional[str] = LOCATION_CACHE) -> pd.DataFrame:
+    """
+    Agrega las columnas de ubicación normalizada a partir de la columna raw 'provincia'.
+
+    La columna se factoriza: cada cadena distinta se normaliza una sola vez
+    (reutilizando el caché persistente de location_normalizer) y los resultados
+    se propagan a todas las filas por código, en una única pasada por campo.
+    """
+    codes, uniques = pd.factorize(df["provincia"])
+    metas = normalize_many(list(uniques), cache_path=cache_path)
+    # Los nulos quedan con código -1, que indexa el último elemento: el caso vacío
+    metas.append(normalize_location(None))
 
     df["ubicacion_original"] = df["provincia"]
-    df["ubicacion_normalizada"] = loc_meta.apply(lambda d: d["ubicacion_normalizada"])
-    df["provincia_normalizada"] = loc_meta.apply(lambda d: d["provincia"])
-    df["provincias"] = loc_meta.apply(lambda d: d["provincias"])
-    df["pais"] = loc_meta.apply(lambda d: d["pais"])
-    df["tipo_ubicacion"] = loc_meta.apply(lambda d: d["tipo_ubicacion"])
-    df["es_argentina"] = loc_meta.apply(lambda d: d["es_argentina"])
-    df["es_limite"] = loc_meta.apply(lambda d: d["es_limite"])
+    for column, key in LOCATION_FIELDS:
+        values = np.empty(len(metas), dtype=object)
+        values[:] = [meta[key] for meta in metas]
+        broadcast = values[codes]
+        if key in ("es_argentina", "es_limite"):
+            broadcast = broadcast.astype(bool)
+        df[column] = pd.Series(broadcast, index=df.index)
 
     return df
@@ -0,0 +1,162 @@
+"""
+export_state.py
+
+Responsabilidad única: persistir el estado de la última exportación exitosa para
+que run_exports pueda trabajar en modo incremental.
+
+El estado guarda los IDs (uint64, en el orden del CSV) de los eventos ya
+exportados, su cluster_id, los agregados necesarios para actualizar
+metadata.json y la huella SHA-256 de los archivos publicados. Con eso se detectan las filas nuevas sin
+comparar strings y se verifica que los archivos no hayan cambiado por fuera
+del pipeline antes de actualizarlos.
+
+También guarda la versión del código que define el contenido de esos archivos
+(reglas de normalización, enriquecimiento del catálogo y exportadores que se
+actualizan en el lugar). Si alguna cambió, las filas ya publicadas quedarían
+con el formato anterior, así que el estado se descarta y se hace una
+exportación completa.
+
+Solo escribe en data/cache/. No modifica sismos.csv, SQLite ni Supabase.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from exporters import (
+    csv_exporter,
+    geojson_exporter,
+    location_normalizer,
+    metadata_exporter,
+    stats_exporter,
+    tiles_exporter,
+)
+from exporters.config import EXPORT_STATE_DIR, GEOJSON_OUT, METADATA_OUT, STATS_OUT, TILES_OUT
+
+STATE_VERSION = 2
+
+# Exportadores cuyos archivos el modo incremental actualiza en lugar de regenerar
+INCREMENTAL_MODULES = [geojson_exporter, metadata_exporter, stats_exporter, tiles_exporter]
+
+
+def tracked_files() -> list:
+    """Archivos que el modo incremental modifica en lugar de regenerar."""
+    return [GEOJSON_OUT, METADATA_OUT, STATS_OUT, TILES_OUT]
+
+
+def code_versions() -> Dict[str, str]:
+    """Versión de cada parte del código que define el contenido de los archivos publicados."""
+    versions = {
+        "normalizacion": location_normalizer.rules_version(),
+        "enriquecimiento": csv_exporter.enrichment_version(),
+    }
+    for module in INCREMENTAL_MODULES:
+        versions[module.__name__.rsplit(".", 1)[-1]] = file_fingerprint(module.__file__)[:16]
+    return versions
+
+
+def load_state() -> Optional[Dict[str, Any]]:
+    """
+    Devuelve el estado de la última exportación, o None si no existe, es de otra
+    versión, fue generado con otra versión del código o alguno de los archivos
+    publicados no coincide con su huella.
+    """
+    state_path = os.path.join(EXPORT_STATE_DIR, "estado.json")
+    ids_path = os.path.join(EXPORT_STATE_DIR, "ids.npy")
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        ids = np.load(ids_path)
+    except (OSError, ValueError):
+        return None
+
+    if state.get("version") != STATE_VERSION or len(ids) != state.get("registros"):
+        return None
+    if state.get("versiones_codigo") != code_versions():
+        return None
+
+    for path in tracked_files():
+        if file_fingerprint(path) != state["archivos"].get(os.path.basename(path)):
+            return None
+
+    state["ids"] = ids
+    try:
+        state["cluster_ids"] = np.load(os.path.join(EXPORT_STATE_DIR, "clusters.npy"))
+    except (OSError, ValueError):
+        state["cluster_ids"] = None
+    return state
+
+
+def changed_rows(df: pd.DataFrame, n_new: int, state: Dict[str, Any]) -> np.ndarray:
+    """
+    Máscara de las filas que hay que volver a publicar: las n_new nuevas y las
+    anteriores cuyo cluster_id cambió (los eventos nuevos pueden unir, crear o
+    renumerar secuencias). Sin cluster_id previo o actual, todas las filas.
+    """
+    previous = state.get("cluster_ids")
+    if previous is None or "cluster_id" not in df.columns or len(previous) != len(df) - n_new:
+        return np.ones(len(df), dtype=bool)
+    current = df["cluster_id"].to_numpy(dtype="int64", na_value=-1)
+    changed = np.ones(len(df), dtype=bool)
+    changed[n_new:] = current[n_new:] != previous
+    return changed
+
+
+def count_new_rows(df: pd.DataFrame, state: Dict[str, Any]) -> Optional[int]:
+    """
+    Cantidad de filas nuevas al principio del DataFrame respecto del estado.
+
+    Devuelve None si el catálogo no es exactamente "filas nuevas + catálogo ya
+    exportado" (filas borradas, modificadas o reordenadas), en cuyo caso hace
+    falta una exportación completa.
+    """
+    previous = state["ids"]
+    n_new = len(df) - len(previous)
+    if n_new < 0:
+        return None
+
+    current = df["id_u64"].to_numpy()
+    if not np.array_equal(current[n_new:], previous):
+        return None
+    # Un ID nuevo que ya existía indicaría un duplicado, no un evento nuevo
+    if n_new and np.isin(current[:n_new], previous).any():
+        return None
+    return n_new
+
+
+def save_state(df: pd.DataFrame, metadata_aggregates: Dict[str, Any]) -> None:
+    """Persiste el estado correspondiente a los archivos recién exportados."""
+    os.makedirs(EXPORT_STATE_DIR, exist_ok=True)
+    state = {
+        "version": STATE_VERSION,
+        "registros": len(df),
+        "versiones_codigo": code_versions(),
+        "metadata_agregados": metadata_aggregates,
+        "archivos": {os.path.basename(path): file_fingerprint(path) for path in tracked_files()},
+        "actualizado_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+    np.save(os.path.join(EXPORT_STATE_DIR, "ids.npy"), df["id_u64"].to_numpy())
+    clusters_path = os.path.join(EXPORT_STATE_DIR, "clusters.npy")
+    if "cluster_id" in df.columns:
+        np.save(clusters_path, df["cluster_id"].to_numpy(dtype="int64", na_value=-1))
+    elif os.path.exists(clusters_path):
+        os.remove(clusters_path)
+    tmp_path = os.path.join(EXPORT_STATE_DIR, "estado.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(EXPORT_STATE_DIR, "estado.json"))
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """SHA-256 del archivo, o None si no existe."""
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
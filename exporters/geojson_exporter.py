@@ -11,69 +11,224 @@ Consumible directamente por MapLibre GL JS y Leaflet.
 
 No modifica sismos.csv, SQLite ni Supabase.
 """
+import hashlib
 import json
 import os
+import shutil
+from typing import Any, BinaryIO, Iterator, List, TextIO
+
+import numpy as np
 import pandas as pd
+from exporters import compression, csv_exporter, location_normalizer
 from exporters.config import GEOJSON_OUT, EXPORTS_DIR
 
+# Cantidad de filas que se serializan por bloque antes de escribirlas al archivo
+CHUNK_SIZE = 5000
+
+# Buffer del archivo de salida (las escrituras se agrupan en bloques de 1 MB)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Mismo formato que json.dump(..., ensure_ascii=False) sobre el FeatureCollection completo
+_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_COLLECTION_HEAD = '{"type": "FeatureCollection", "features": ['
+_COLLECTION_TAIL = "]}"
+
 
 def export(df: pd.DataFrame) -> None:
     """
     Genera data/exports/sismos.geojson a partir del DataFrame recibido.
 
+    Los features se escriben en streaming, bloque a bloque, sin armar la
+    colección completa en memoria. Los sidecars .gz / .br se generan en la
+    misma pasada (ver compression.open_text).
+
     Args:
         df: DataFrame producido por csv_exporter.load_sismos()
     """
     # Filtrar filas sin coordenadas (no se pueden representar en GeoJSON)
-    df_geo = df.dropna(subset=["latitud", "longitud"]).copy()
+    df_geo = df.dropna(subset=["latitud", "longitud"])
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    with compression.open_text(GEOJSON_OUT) as f:
+        total = write_feature_collection(df_geo, f)
+
+    print(f"  [OK] GeoJSON exportado: {total} features -> {GEOJSON_OUT}")
+
+
+def update(df_new: pd.DataFrame) -> int:
+    """
+    Inserta los eventos nuevos al principio de data/exports/sismos.geojson.
+
+    Solo se serializan los features nuevos; el resto del archivo existente se
+    copia byte a byte a continuación, sin parsearlo. El resultado (incluidos
+    los sidecars comprimidos) es idéntico al que produciría export() sobre el
+    catálogo completo.
+
+    Args:
+        df_new: filas nuevas (las primeras del DataFrame de csv_exporter.load_sismos()).
+
+    Returns:
+        Cantidad de features nuevos insertados.
+    """
+    df_geo = df_new.dropna(subset=["latitud", "longitud"])
+
+    with open(GEOJSON_OUT, "rb") as src:
+        with compression.open_text(GEOJSON_OUT) as dst:
+            prepend_features(df_geo, src, dst)
+
+    print(f"  [OK] GeoJSON actualizado: +{len(df_geo)} features -> {GEOJSON_OUT}")
+    return len(df_geo)
+
+
+def prepend_features(df_geo: pd.DataFrame, src: BinaryIO, dst: TextIO) -> None:
+    """
+    Escribe en dst el FeatureCollection src con los features de df_geo
+    insertados al principio. El contenido de src se copia byte a byte, sin
+    parsearlo.
+
+    Args:
+        df_geo: filas nuevas, sin coordenadas nulas.
+        src: FeatureCollection existente, abierto en modo binario.
+        dst: archivo de texto abierto para escritura.
+    """
+    head = src.read(len(_COLLECTION_HEAD.encode("utf-8")))
+    if head != _COLLECTION_HEAD.encode("utf-8"):
+        raise ValueError(f"Formato inesperado en {getattr(src, 'name', 'el GeoJSON')}")
+    rest = src.read(len(_COLLECTION_TAIL.encode("utf-8")))
+
+    dst.write(_COLLECTION_HEAD)
+    for start in range(0, len(df_geo), CHUNK_SIZE):
+        if start:
+            dst.write(", ")
+        dst.write(", ".join(encode_features(df_geo.iloc[start:start + CHUNK_SIZE])))
+    # Separador solo si había features previos y se agregaron nuevos
+    if len(df_geo) and rest != _COLLECTION_TAIL.encode("utf-8"):
+        dst.write(", ")
+    dst.flush()
+    dst.buffer.write(rest)
+    shutil.copyfileobj(src, dst.buffer, WRITE_BUFFER_SIZE)
+
+
+def write_feature_collection(df_geo: pd.DataFrame, f: TextIO) -> int:
+    """
+    Escribe un FeatureCollection en el archivo abierto f, byte a byte idéntico a
+    json.dump(..., ensure_ascii=False) sobre la colección armada en memoria.
+
+    Args:
+        df_geo: DataFrame enriquecido, sin filas con coordenadas nulas.
+        f: archivo de texto abierto para escritura.
+
+    Returns:
+        Cantidad de features escritos.
+    """
+    f.write(_COLLECTION_HEAD)
+    for start in range(0, len(df_geo), CHUNK_SIZE):
+        if start:
+            f.write(", ")
+        f.write(", ".join(encode_features(df_geo.iloc[start:start + CHUNK_SIZE])))
+    f.write(_COLLECTION_TAIL)
+    return len(df_geo)
+
+
+def encode_features(df_geo: pd.DataFrame) -> List[str]:
+    """Serializa cada fila del DataFrame como un Feature GeoJSON (texto JSON)."""
+    return [_ENCODER.encode(feature) for feature in iter_features(df_geo)]
+
 
-    features = []
-    for _, row in df_geo.iterrows():
-        feature_id = str(row["id"])
-        
-        feature = {
+def iter_features(df_geo: pd.DataFrame) -> Iterator[dict]:
+    """
+    Genera los Features GeoJSON a partir de las columnas del DataFrame.
+
+    Cada columna se convierte una sola vez a lista de tipos nativos de Python,
+    evitando construir una Series por fila.
+    """
+    n = len(df_geo)
+    ids = [str(v) for v in df_geo["id"].tolist()]
+    latitudes = df_geo["latitud"].tolist()
+    longitudes = df_geo["longitud"].tolist()
+
+    columns = zip(
+        ids,
+        longitudes,
+        latitudes,
+        _column(df_geo, "fecha", n),
+        _column(df_geo, "hora", n),
+        _nullable_numbers(df_geo["profundidad"]),
+        _nullable_numbers(df_geo["magnitud"]),
+        _column(df_geo, "sentido", n),
+        _column(df_geo, "ubicacion_original", n),
+        _column(df_geo, "ubicacion_normalizada", n),
+        _column(df_geo, "provincia_normalizada", n),
+        _column(df_geo, "provincias", n, []),
+        _column(df_geo, "pais", n),
+        _column(df_geo, "tipo_ubicacion", n),
+        [bool(v) for v in _column(df_geo, "es_argentina", n, False)],
+        [bool(v) for v in _column(df_geo, "es_limite", n, False)],
+    )
+
+    for (feature_id, lon, lat, fecha, hora, profundidad, magnitud, sentido, ubicacion_original,
+         ubicacion_normalizada, provincia, provincias, pais, tipo_ubicacion, es_argentina,
+         es_limite) in columns:
+        yield {
             "type": "Feature",
             "id": feature_id,
             "geometry": {
                 "type": "Point",
                 # GeoJSON usa [longitud, latitud] según el estándar RFC 7946
-                "coordinates": [row["longitud"], row["latitud"]],
+                "coordinates": [lon, lat],
             },
             "properties": {
                 "id": feature_id,
-                "fecha": row.get("fecha", None),
-                "hora": row.get("hora", None),
-                "latitud": row["latitud"] if pd.notna(row["latitud"]) else None,
-                "longitud": row["longitud"] if pd.notna(row["longitud"]) else None,
-                "profundidad": row["profundidad"] if pd.notna(row["profundidad"]) else None,
-                "magnitud": row["magnitud"] if pd.notna(row["magnitud"]) else None,
-                "sentido": row.get("sentido", None),
-                "ubicacion_original": row.get("ubicacion_original", None),
-                "ubicacion_normalizada": row.get("ubicacion_normalizada", None),
-                "provincia": row.get("provincia_normalizada", None),
-                "provincias": row.get("provincias", []),
-                "pais": row.get("pais", None),
-                "tipo_ubicacion": row.get("tipo_ubicacion", None),
-                "es_argentina": bool(row.get("es_argentina", False)),
-                "es_limite": bool(row.get("es_limite", False)),
+                "fecha": fecha,
+                "hora": hora,
+                "latitud": lat,
+                "longitud": lon,
+                "profundidad": profundidad,
+                "magnitud": magnitud,
+                "sentido": sentido,
+                "ubicacion_original": ubicacion_original,
+                "ubicacion_normalizada": ubicacion_normalizada,
+                "provincia": provincia,
+                "provincias": provincias,
+                "pais": pais,
+                "tipo_ubicacion": tipo_ubicacion,
+                "es_argentina": es_argentina,
+                "es_limite": es_limite,
             },
         }
-        features.append(feature)
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features,
-    }
 
-    os.makedirs(EXPORTS_DIR, exist_ok=True)
-    with open(GEOJSON_OUT, "w", encoding="utf-8") as f:
-        json.dump(geojson, f, ensure_ascii=False, default=_serialize)
+def content_version() -> str:
+    """Versión del código que define el contenido de cada feature."""
+    with open(__file__, "rb") as f:
+        source = f.read()
+    return "|".join([
+        csv_exporter.enrichment_version(),
+        location_normalizer.rules_version(),
+        hashlib.sha256(source).hexdigest()[:16],
+    ])
+
+
+def features_fingerprint(version: str, ids: np.ndarray, ubicaciones: List[str], sentidos: List[str]) -> str:
+    """
+    Huella de un grupo de features, sin serializarlos: los IDs ya codifican fecha,
+    hora, coordenadas, profundidad y magnitud, y el resto de las propiedades sale
+    de la ubicación original y del campo "sentido".
+    """
+    sha = hashlib.sha256(version.encode("utf-8"))
+    sha.update(ids.tobytes())
+    sha.update("\x1f".join(ubicaciones).encode("utf-8"))
+    sha.update("\x1f".join(sentidos).encode("utf-8"))
+    return sha.hexdigest()[:16]
+
 
-    print(f"  [OK] GeoJSON exportado: {len(features)} features -> {GEOJSON_OUT}")
+def _column(df: pd.DataFrame, name: str, n: int, default: Any = None) -> list:
+    """Valores de la columna como lista nativa, o el valor por defecto si no existe."""
+    if name not in df.columns:
+        return [default] * n
+    return df[name].tolist()
 
 
-def _serialize(obj):
-    """Convierte tipos no serializables por json.dump (ej: numpy floats/bools)."""
-    if hasattr(obj, "item"):
-        return obj.item()
-    raise TypeError(f"Tipo no serializable: {type(obj)}")
+def _nullable_numbers(series: pd.Series) -> list:
+    """Valores numéricos como floats nativos, con None en lugar de NaN."""
+    return [None if v != v else v for v in series.tolist()]
@@ -0,0 +1,208 @@
+"""
+gutenberg_richter_exporter.py
+
+Responsabilidad única: generar gutenberg_richter.json con las curvas
+magnitud-frecuencia del catálogo, el valor b de Gutenberg-Richter y la
+magnitud de completitud (Mc), para todo el catálogo y por provincia
+normalizada; en cada caso para el total, por año y por ventanas móviles de
+GR_WINDOW_YEARS años.
+
+Cálculo en una sola pasada vectorizada:
+- un único np.bincount sobre (provincia, año, bin de magnitud) arma el
+  histograma de todos los grupos; el total general es la suma de las
+  provincias y las ventanas móviles salen de la suma acumulada por año;
+- Mc por máxima curvatura (el bin más frecuente) más GR_MC_CORRECTION;
+- b por máxima verosimilitud (Aki-Utsu, con la corrección de medio bin) sobre
+  los eventos con magnitud >= Mc, con su error según Shi y Bolt (1982), y
+  a = log10 N(>= Mc) + b * Mc. Con menos de GR_MIN_EVENTS eventos sobre Mc,
+  b y a quedan en null.
+
+Formato pensado para gráficos: el eje de magnitudes es común a todas las curvas
+(magnitud_minima + i * ancho_bin) y "acumulado" es N(>= M) bin a bin, sin los
+ceros finales.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from exporters import compression
+from exporters.config import (
+    EXPORTS_DIR,
+    GR_MAGNITUDE_BIN,
+    GR_MC_CORRECTION,
+    GR_MIN_EVENTS,
+    GR_WINDOW_YEARS,
+    GUTENBERG_RICHTER_OUT,
+)
+
+LOG10_E = np.log10(np.e)
+
+
+def export(df: pd.DataFrame) -> None:
+    """
+    Genera data/exports/gutenberg_richter.json a partir del DataFrame recibido.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    result = compute_gutenberg_richter(df)
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    with compression.open_text(GUTENBERG_RICHTER_OUT) as f:
+        json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
+
+    total = result["general"]["total"] if result["general"] else {}
+    print(f"  [OK] Gutenberg-Richter exportado: {len(result['provincias'])} provincias, "
+          f"b = {total.get('b')}, Mc = {total.get('mc')} -> {GUTENBERG_RICHTER_OUT}")
+
+
+def compute_gutenberg_richter(df: pd.DataFrame) -> dict:
+    """
+    Calcula el contenido de gutenberg_richter.json.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    magnitudes = df["magnitud"].to_numpy(dtype="float64", na_value=np.nan)
+    years = pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce").dt.year
+    years = years.to_numpy(dtype="float64", na_value=np.nan)
+    valid = np.isfinite(magnitudes) & np.isfinite(years)
+
+    bins = np.rint(magnitudes[valid] / GR_MAGNITUDE_BIN).astype(np.int64)
+    years = years[valid].astype(np.int64)
+    codes, provinces = pd.factorize(df["provincia_normalizada"].to_numpy(dtype=object)[valid], sort=True)
+    if not len(bins):
+        return _document(0.0, [], None, {})
+
+    first_bin, first_year = int(bins.min()), int(years.min())
+    n_bins = int(bins.max()) - first_bin + 1
+    n_years = int(years.max()) - first_year + 1
+    n_groups = len(provinces) + 1
+
+    # Grupo 0: eventos sin provincia; luego se reemplaza por el total general
+    group = codes + 1
+    hist = np.bincount(
+        (group * n_years + (years - first_year)) * n_bins + (bins - first_bin),
+        minlength=n_groups * n_years * n_bins,
+    ).reshape(n_groups, n_years, n_bins)
+    hist[0] = hist.sum(axis=0)
+
+    # Ventanas móviles: diferencia de sumas acumuladas por año (ninguna si hay menos años)
+    window = GR_WINDOW_YEARS
+    cumulative = np.concatenate([np.zeros((n_groups, 1, n_bins), dtype=np.int64), hist.cumsum(axis=1)], axis=1)
+    windows = cumulative[:, window:] - cumulative[:, :-window]
+
+    # Total, años y ventanas de todos los grupos, ajustados juntos
+    stacked = np.concatenate([hist.sum(axis=1, keepdims=True), hist, windows], axis=1)
+    fits = fit_gutenberg_richter(stacked.reshape(-1, n_bins), first_bin)
+    fits = {name: values.reshape(n_groups, -1, *values.shape[1:]) for name, values in fits.items()}
+
+    year_labels = [str(first_year + i) for i in range(n_years)]
+    window_labels = [f"{first_year + i}-{first_year + i + window - 1}" for i in range(windows.shape[1])]
+    series = [_series(fits, g, year_labels, window_labels) for g in range(n_groups)]
+    return _document(
+        first_bin * GR_MAGNITUDE_BIN, [first_year, first_year + n_years - 1], series[0],
+        dict(zip((str(p) for p in provinces), series[1:])),
+    )
+
+
+def fit_gutenberg_richter(hist: np.ndarray, first_bin: int) -> Dict[str, np.ndarray]:
+    """
+    Mc, b, error de b y a de cada fila de un histograma de magnitudes.
+
+    Args:
+        hist: conteos (grupos x bins); el bin j corresponde a la magnitud
+              (first_bin + j) * GR_MAGNITUDE_BIN.
+
+    Returns:
+        Arrays por grupo: eventos, mc, eventos_sobre_mc, b, b_error, a y acumulado
+        (N >= M por bin). mc, b, b_error y a son NaN donde no se pueden estimar.
+    """
+    n_bins = hist.shape[1]
+    centers = (first_bin + np.arange(n_bins)) * GR_MAGNITUDE_BIN
+    events = hist.sum(axis=1)
+
+    # Máxima curvatura: bin más frecuente de la distribución no acumulada
+    mc_bin = hist.argmax(axis=1) + int(round(GR_MC_CORRECTION / GR_MAGNITUDE_BIN))
+    above = np.where(np.arange(n_bins)[None, :] >= mc_bin[:, None], hist, 0)
+    n_mc = above.sum(axis=1)
+    s1 = above @ centers
+    s2 = above @ (centers ** 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mc = np.where((events > 0) & (mc_bin < n_bins), (first_bin + mc_bin) * GR_MAGNITUDE_BIN, np.nan)
+        mean = s1 / n_mc
+        b = LOG10_E / (mean - (mc - GR_MAGNITUDE_BIN / 2))
+        variance = (s2 - n_mc * mean ** 2) / (n_mc * (n_mc - 1))
+        b_error = 2.3 * b ** 2 * np.sqrt(np.maximum(variance, 0))
+        a = np.log10(n_mc) + b * mc
+
+    enough = n_mc >= max(GR_MIN_EVENTS, 2)
+    return {
+        "eventos": events,
+        "mc": mc,
+        "eventos_sobre_mc": n_mc,
+        "b": np.where(enough, b, np.nan),
+        "b_error": np.where(enough, b_error, np.nan),
+        "a": np.where(enough, a, np.nan),
+        "acumulado": hist[:, ::-1].cumsum(axis=1)[:, ::-1],
+    }
+
+
+def _series(fits: Dict[str, np.ndarray], group: int, year_labels: List[str], window_labels: List[str]) -> dict:
+    """Total, años y ventanas de un grupo (se omiten los años y ventanas sin eventos)."""
+    n_years = len(year_labels)
+    columns = (
+        [("total", None, 0)]
+        + [("por_anio", label, 1 + i) for i, label in enumerate(year_labels)]
+        + [("ventanas_moviles", label, 1 + n_years + i) for i, label in enumerate(window_labels)]
+    )
+    result = {"total": None, "por_anio": {}, "ventanas_moviles": {}}
+    for section, label, column in columns:
+        if fits["eventos"][group, column] == 0 and section != "total":
+            continue
+        entry = _entry(fits, group, column)
+        if label is None:
+            result[section] = entry
+        else:
+            result[section][label] = entry
+    return result
+
+
+def _entry(fits: Dict[str, np.ndarray], group: int, column: int) -> dict:
+    acumulado = fits["acumulado"][group, column]
+    length = int(np.count_nonzero(acumulado))
+    return {
+        "eventos": int(fits["eventos"][group, column]),
+        "mc": _rounded(fits["mc"][group, column], 1),
+        "eventos_sobre_mc": int(fits["eventos_sobre_mc"][group, column]),
+        "b": _rounded(fits["b"][group, column], 3),
+        "b_error": _rounded(fits["b_error"][group, column], 3),
+        "a": _rounded(fits["a"][group, column], 3),
+        "acumulado": acumulado[:length].tolist(),
+    }
+
+
+def _document(min_magnitude: float, years: List[int], general: Optional[dict], provinces: dict) -> dict:
+    return {
+        "parametros": {
+            "ancho_bin": GR_MAGNITUDE_BIN,
+            "correccion_mc": GR_MC_CORRECTION,
+            "eventos_minimos": GR_MIN_EVENTS,
+            "ventana_movil_anios": GR_WINDOW_YEARS,
+            "metodo_mc": "maxima_curvatura",
+            "metodo_b": "maxima_verosimilitud_aki_utsu",
+        },
+        "magnitud_minima": round(min_magnitude, 1),
+        "anios": years,
+        "general": general,
+        "provincias": provinces,
+    }
+
+
+def _rounded(value: float, digits: int):
+    return None if np.isnan(value) else round(float(value), digits)
@@ -8,8 +8,11 @@ Transforma cadenas raw de ubicación (con errores de tipeo, variantes de límite
 encoding roto, etc.) en información estructurada y limpia para el frontend.
 """
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence
 
 
 def normalize_location(raw_location: Optional[str]) -> Dict[str, Any]:
@@ -324,3 +327,59 @@ def normalize_location(raw_location: Optional[str]) -> Dict[str, Any]:
         "es_argentina": False,
         "es_limite": False,
     }
+
+
+def rules_version() -> str:
+    """
+    Hash del código fuente de este módulo. Cambia cada vez que se modifican las
+    reglas de normalización, invalidando los resultados cacheados en disco.
+    """
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def normalize_many(raw_locations: Sequence[str], cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Normaliza una secuencia de cadenas únicas reutilizando un caché persistente.
+
+    El caché es un JSON indexado por la cadena raw y válido solo para la versión
+    de reglas con la que se generó (ver rules_version). Solo se normalizan las
+    cadenas nunca vistas; si hubo alguna nueva, el caché se reescribe.
+
+    Args:
+        raw_locations: cadenas raw de ubicación (sin repetidos).
+        cache_path: ruta del JSON de caché. None desactiva la persistencia.
+
+    Returns:
+        Lista de diccionarios de normalize_location, en el mismo orden de entrada.
+    """
+    version = rules_version()
+    cached: Dict[str, Dict[str, Any]] = {}
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("rules_version") == version:
+                cached = data.get("ubicaciones", {})
+        except (OSError, ValueError):
+            cached = {}
+
+    results = []
+    new_entries = 0
+    for raw in raw_locations:
+        meta = cached.get(raw)
+        if meta is None:
+            meta = normalize_location(raw)
+            cached[raw] = meta
+            new_entries += 1
+        results.append(meta)
+
+    if cache_path and new_entries:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"rules_version": version, "ubicaciones": cached}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+    return results
@@ -19,6 +19,18 @@ def export(df: pd.DataFrame) -> None:
     """
     Genera data/exports/metadata.json a partir del DataFrame recibido.
 
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    metadata = compute_metadata(df)
+    _write(metadata)
+    print(f"  [OK] Metadata exportada: {metadata['total_registros']} registros -> {METADATA_OUT}")
+
+
+def compute_metadata(df: pd.DataFrame) -> dict:
+    """
+    Calcula el contenido de metadata.json sobre el DataFrame recibido.
+
     Args:
         df: DataFrame producido por csv_exporter.load_sismos()
     """
@@ -78,9 +90,97 @@ def export(df: pd.DataFrame) -> None:
         "fuente": "INPRES — Instituto Nacional de Prevención Sísmica de Argentina",
         "repositorio": "https://github.com/LuisOVaras/inpres-sismos",
     }
+    return metadata
+
 
+def aggregates(df: pd.DataFrame) -> dict:
+    """
+    Sumas y conteos necesarios para actualizar los promedios de metadata.json
+    sin volver a recorrer el catálogo completo (ver update).
+    """
+    magnitudes = df["magnitud"].dropna()
+    profundidades = df["profundidad"].dropna()
+    return {
+        "magnitud_suma": float(magnitudes.sum()),
+        "magnitud_n": int(len(magnitudes)),
+        "profundidad_suma": float(profundidades.sum()),
+        "profundidad_n": int(len(profundidades)),
+    }
+
+
+def update(df_new: pd.DataFrame, previous_aggregates: dict) -> dict:
+    """
+    Actualiza data/exports/metadata.json incorporando solo los eventos nuevos.
+
+    Totales, rangos y bounding box se combinan aritméticamente con los valores
+    publicados; los promedios se recalculan a partir de las sumas acumuladas.
+
+    Args:
+        df_new: filas nuevas del DataFrame producido por csv_exporter.load_sismos()
+        previous_aggregates: resultado de aggregates() sobre el catálogo ya exportado.
+
+    Returns:
+        Agregados actualizados, a persistir para la próxima actualización.
+    """
+    with open(METADATA_OUT, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    new = compute_metadata(df_new)
+    new_agg = aggregates(df_new)
+    agg = {k: v + new_agg[k] for k, v in previous_aggregates.items()}
+
+    total = metadata["total_registros"] + new["total_registros"]
+    bbox_old, bbox_new = metadata["bounding_box"], new["bounding_box"]
+    provincias_raw = sorted(set(metadata["provincias_raw"]) | set(new["provincias_raw"]))
+    provincias_norm = sorted(set(metadata["provincias_normalizadas"]) | set(new["provincias_normalizadas"]))
+    paises = sorted(set(metadata["paises"]) | set(new["paises"]))
+
+    metadata.update({
+        "ultima_actualizacion_utc": new["ultima_actualizacion_utc"],
+        "total_registros": total,
+        "total_registros_exportados": total,
+        "fecha_mas_reciente": _max(metadata["fecha_mas_reciente"], new["fecha_mas_reciente"]),
+        "fecha_mas_antigua": _min(metadata["fecha_mas_antigua"], new["fecha_mas_antigua"]),
+        "magnitud_maxima": _max(metadata["magnitud_maxima"], new["magnitud_maxima"]),
+        "magnitud_minima": _min(metadata["magnitud_minima"], new["magnitud_minima"]),
+        "magnitud_promedio": round(agg["magnitud_suma"] / agg["magnitud_n"], 2) if agg["magnitud_n"] else None,
+        "profundidad_minima": _min(metadata["profundidad_minima"], new["profundidad_minima"]),
+        "profundidad_maxima": _max(metadata["profundidad_maxima"], new["profundidad_maxima"]),
+        "profundidad_promedio": (
+            round(agg["profundidad_suma"] / agg["profundidad_n"], 1) if agg["profundidad_n"] else None
+        ),
+        "bounding_box": {
+            "west": _min(bbox_old["west"], bbox_new["west"]),
+            "east": _max(bbox_old["east"], bbox_new["east"]),
+            "south": _min(bbox_old["south"], bbox_new["south"]),
+            "north": _max(bbox_old["north"], bbox_new["north"]),
+        },
+        "cantidad_provincias_normalizadas": len(provincias_norm),
+        "provincias_normalizadas": provincias_norm,
+        "cantidad_paises": len(paises),
+        "paises": paises,
+        "provincias_raw": provincias_raw,
+        "provincias": provincias_raw,
+    })
+
+    _write(metadata)
+    print(f"  [OK] Metadata actualizada: {total} registros (+{len(df_new)}) -> {METADATA_OUT}")
+    return agg
+
+
+def _min(a, b):
+    """Mínimo ignorando valores nulos."""
+    values = [v for v in (a, b) if v is not None]
+    return min(values) if values else None
+
+
+def _max(a, b):
+    """Máximo ignorando valores nulos."""
+    values = [v for v in (a, b) if v is not None]
+    return max(values) if values else None
+
+
+def _write(metadata: dict) -> None:
     os.makedirs(EXPORTS_DIR, exist_ok=True)
     with open(METADATA_OUT, "w", encoding="utf-8") as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
-
-    print(f"  [OK] Metadata exportada: {total} registros -> {METADATA_OUT}")
@@ -0,0 +1,163 @@
+"""
+periods_exporter.py
+
+Responsabilidad única: exportar el catálogo particionado por período, con un
+GeoJSON por año (data/exports/periodos/anual/) y, opcionalmente, uno por mes
+(data/exports/periodos/mensual/), más un index.json con la cantidad de eventos,
+el tamaño en bytes y la huella de cada partición.
+
+Pensado para dashboards y controles deslizantes de tiempo que necesitan un año
+(o un mes) por vez sin descargar sismos.geojson completo.
+
+Solo se reescriben las particiones cuyo contenido cambió desde la última
+ejecución: la huella de cada partición se calcula a partir de los IDs de sus
+eventos (que ya codifican fecha, hora, coordenadas, profundidad y magnitud),
+la ubicación original y el campo "sentido", más la versión del código que
+genera los features. En la actualización diaria normalmente solo cambian el
+archivo del mes y el del año en curso.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import glob
+import json
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from exporters import geojson_exporter
+from exporters.config import PERIODS_DIR, PERIODS_INDEX_OUT, PERIODS_MONTHLY
+
+INDEX_VERSION = 1
+
+
+def export(df: pd.DataFrame) -> None:
+    """
+    Genera las particiones por año (y por mes) y su index.json a partir del DataFrame recibido.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    df_geo = df.dropna(subset=["latitud", "longitud"])
+    fechas = pd.to_datetime(df_geo["fecha"], format="%d/%m/%Y", errors="coerce")
+    dated = fechas.notna().to_numpy()
+    sin_fecha = int((~dated).sum())
+    df_geo = df_geo[dated]
+    years = fechas[dated].dt.year.to_numpy(dtype=np.int64)
+    months = fechas[dated].dt.month.to_numpy(dtype=np.int64)
+
+    previous = _read_index()
+    version = geojson_exporter.content_version()
+
+    index = {
+        "version": INDEX_VERSION,
+        "total_eventos": int(len(df_geo)),
+        "eventos_sin_fecha": sin_fecha,
+    }
+    index["anual"], written = _export_partitions(
+        df_geo, years, "anual", lambda k: f"{k}", version, previous.get("anual", []),
+    )
+    if PERIODS_MONTHLY:
+        index["mensual"], written_months = _export_partitions(
+            df_geo, years * 100 + months, "mensual", lambda k: f"{k // 100}-{k % 100:02d}",
+            version, previous.get("mensual", []),
+        )
+        written += written_months
+    else:
+        _remove_stale("mensual", [])
+
+    with open(PERIODS_INDEX_OUT, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+    total = len(index["anual"]) + len(index.get("mensual", []))
+    print(f"  [OK] Particiones por período: {written} de {total} archivos reescritos -> {PERIODS_DIR}")
+
+
+def _export_partitions(df_geo: pd.DataFrame, keys: np.ndarray, kind: str, label: Callable[[int], str],
+                       version: str, previous: List[dict]) -> Tuple[List[dict], int]:
+    """
+    Escribe un GeoJSON por cada valor de keys (en orden descendente: el período
+    más reciente primero), salteando los que no cambiaron.
+
+    El agrupamiento se hace con un único ordenamiento estable, de modo que cada
+    partición es un tramo contiguo y conserva el orden del catálogo.
+
+    Returns:
+        (entradas del índice, cantidad de archivos reescritos)
+    """
+    directory = os.path.join(PERIODS_DIR, kind)
+    os.makedirs(directory, exist_ok=True)
+    previous_by_file = {p["archivo"]: p for p in previous}
+
+    order = np.argsort(-keys, kind="stable")
+    df_sorted = df_geo.iloc[order]
+    keys = keys[order]
+    ids = df_sorted["id_u64"].to_numpy(dtype=np.uint64)
+    ubicaciones = [str(v) for v in df_sorted["ubicacion_original"].tolist()]
+    sentidos = [str(v) for v in df_sorted["sentido"].tolist()]
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+    ends = np.append(starts[1:], len(keys))
+
+    partitions = []
+    written = 0
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        name = f"{label(int(keys[start]))}.geojson"
+        path = os.path.join(directory, name)
+        fingerprint = geojson_exporter.features_fingerprint(
+            version, ids[start:end], ubicaciones[start:end], sentidos[start:end],
+        )
+
+        old = previous_by_file.get(name)
+        unchanged = (
+            old is not None
+            and old.get("huella") == fingerprint
+            and os.path.exists(path)
+            and os.path.getsize(path) == old.get("bytes")
+        )
+        if not unchanged:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", buffering=geojson_exporter.WRITE_BUFFER_SIZE) as f:
+                geojson_exporter.write_feature_collection(df_sorted.iloc[start:end], f)
+            os.replace(tmp_path, path)
+            written += 1
+
+        partitions.append({
+            "periodo": label(int(keys[start])),
+            "archivo": f"{kind}/{name}",
+            "eventos": end - start,
+            "bytes": os.path.getsize(path),
+            "huella": fingerprint,
+        })
+
+    _remove_stale(kind, [f"{label(int(keys[start]))}.geojson" for start in starts.tolist()])
+    return partitions, written
+
+
+def _read_index() -> Dict[str, list]:
+    """
+    Índice de la ejecución anterior. En el índice publicado las rutas son
+    relativas a PERIODS_DIR; acá se reducen al nombre del archivo.
+    """
+    try:
+        with open(PERIODS_INDEX_OUT, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != INDEX_VERSION:
+        return {}
+    return {
+        kind: [dict(p, archivo=os.path.basename(p["archivo"])) for p in index.get(kind, [])]
+        for kind in ("anual", "mensual")
+    }
+
+
+def _remove_stale(kind: str, current: List[str]) -> int:
+    """Elimina las particiones que ya no tienen eventos."""
+    keep = set(current)
+    removed = 0
+    for path in glob.glob(os.path.join(PERIODS_DIR, kind, "*.geojson")):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
@@ -0,0 +1,188 @@
+"""
+province_locator.py
+
+Asigna a cada epicentro la provincia argentina que lo contiene según los
+polígonos de data/provincia/ProvinciasArgentina.geojson, como complemento
+geométrico de la normalización de cadenas de location_normalizer.
+
+Índice espacial: los bordes de todos los polígonos se reparten en franjas de
+latitud de PROVINCE_SLAB_DEGREES grados (formato CSR: offsets + índices). Un
+rayo horizontal desde un punto solo puede cruzar bordes de su franja, así que
+el test de ray casting (regla par-impar) se evalúa para todos los pares
+(punto, borde candidato) de una sola vez con numpy y la paridad por polígono
+se obtiene con np.bincount.
+
+No modifica el CSV fuente, SQLite ni Supabase.
+"""
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from exporters.config import PROVINCIAS_GEOJSON, PROVINCE_SLAB_DEGREES
+
+# Nombres del GeoJSON que difieren de los de location_normalizer
+GEOJSON_NAME_MAP = {
+    "Tierra del Fuego": "Tierra del Fuego, Antártida e Islas del Atlántico Sur",
+}
+
+
+class ProvinceLocator:
+    """
+    Índice de bordes de polígonos por franjas de latitud.
+
+    Args:
+        names: nombre de cada polígono.
+        rings: por polígono, lista de anillos [(lon, lat), ...] (exterior y huecos).
+        slab_degrees: alto de cada franja de latitud.
+    """
+
+    def __init__(self, names: List[str], rings: List[List[List[Tuple[float, float]]]],
+                 slab_degrees: float = PROVINCE_SLAB_DEGREES):
+        self.names = list(names)
+        edges = []
+        for poly, poly_rings in enumerate(rings):
+            for ring in poly_rings:
+                pts = np.asarray(ring, dtype=np.float64)
+                if len(pts) < 3:
+                    continue
+                nxt = np.roll(pts, -1, axis=0)
+                seg = np.column_stack([pts, nxt, np.full(len(pts), poly)])
+                # Los bordes horizontales nunca cruzan el rayo
+                edges.append(seg[seg[:, 1] != seg[:, 3]])
+        edges = np.concatenate(edges) if edges else np.empty((0, 5))
+
+        self.x1, self.y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        self.poly = edges[:, 4].astype(np.int64)
+        # Pendiente inversa: x del cruce = x1 + (y - y1) * dxdy
+        self.dxdy = (x2 - self.x1) / (y2 - self.y1)
+        ylo, yhi = np.minimum(self.y1, y2), np.maximum(self.y1, y2)
+
+        self.slab_degrees = slab_degrees
+        self.y_min = float(ylo.min()) if len(edges) else 0.0
+        n_slabs = int(np.ceil((float(yhi.max()) - self.y_min) / slab_degrees)) + 1 if len(edges) else 1
+        self.y2 = y2
+        first = np.floor((ylo - self.y_min) / slab_degrees).astype(np.int64)
+        last = np.floor((yhi - self.y_min) / slab_degrees).astype(np.int64)
+
+        # CSR: bordes de cada franja
+        spans = last - first + 1
+        edge_ids = np.repeat(np.arange(len(edges)), spans)
+        slab_ids = np.repeat(first, spans) + (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans))
+        order = np.argsort(slab_ids, kind="stable")
+        self.slab_edges = edge_ids[order]
+        self.slab_offsets = np.concatenate([[0], np.cumsum(np.bincount(slab_ids, minlength=n_slabs))])
+        self.n_slabs = n_slabs
+
+    def locate(self, lons, lats) -> np.ndarray:
+        """Índice del polígono que contiene cada punto (-1 si ninguno o coordenadas nulas)."""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        result = np.full(len(lons), -1, dtype=np.int64)
+
+        slab = np.floor((lats - self.y_min) / self.slab_degrees)
+        valid = np.isfinite(lons) & np.isfinite(slab) & (slab >= 0) & (slab < self.n_slabs)
+        points = np.flatnonzero(valid)
+        if not len(points) or not len(self.slab_edges):
+            return result
+        slab = slab[points].astype(np.int64)
+
+        # Pares (punto, borde candidato de su franja)
+        starts = self.slab_offsets[slab]
+        counts = self.slab_offsets[slab + 1] - starts
+        pair_point = np.repeat(np.arange(len(points)), counts)
+        pair_pos = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        edge = self.slab_edges[pair_pos]
+
+        x, y = lons[points][pair_point], lats[points][pair_point]
+        crosses = ((self.y1[edge] > y) != (self.y2[edge] > y)) & (
+            x < self.x1[edge] + (y - self.y1[edge]) * self.dxdy[edge]
+        )
+
+        # Paridad de cruces por (punto, polígono)
+        n_polys = len(self.names)
+        parity = np.bincount(
+            pair_point[crosses] * n_polys + self.poly[edge[crosses]], minlength=len(points) * n_polys,
+        ).reshape(len(points), n_polys) & 1
+        inside = parity.any(axis=1)
+        result[points[inside]] = parity[inside].argmax(axis=1)
+        return result
+
+    def locate_names(self, lons, lats) -> np.ndarray:
+        """Nombre de la provincia de cada punto (None fuera de los polígonos)."""
+        names = np.empty(len(self.names) + 1, dtype=object)
+        names[:-1] = self.names
+        names[-1] = None
+        return names[self.locate(lons, lats)]
+
+
+_LOCATOR: Optional[ProvinceLocator] = None
+
+
+def load_locator(path: Optional[str] = None) -> ProvinceLocator:
+    """Construye el índice desde el GeoJSON de provincias (el de config se construye una sola vez)."""
+    global _LOCATOR
+    if path is None and _LOCATOR is not None:
+        return _LOCATOR
+
+    with open(path or PROVINCIAS_GEOJSON, "r", encoding="utf-8") as f:
+        geojson = json.load(f)
+
+    names, rings = [], []
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+        name = feature["properties"]["nombre"]
+        names.append(GEOJSON_NAME_MAP.get(name, name))
+        rings.append([ring for polygon in polygons for ring in polygon])
+
+    locator = ProvinceLocator(names, rings)
+    if path is None:
+        _LOCATOR = locator
+    return locator
+
+
+def enrich_geographic_province(df: pd.DataFrame, locator: Optional[ProvinceLocator] = None) -> pd.DataFrame:
+    """
+    Agrega las columnas:
+    - provincia_geografica: provincia que contiene el epicentro (None fuera de Argentina).
+    - provincia_discrepante: True si la provincia de la cadena y la geográfica no
+      coinciden (en límites interprovinciales, si la geográfica no es ninguna de
+      las mencionadas). Solo se evalúa cuando ambas existen.
+
+    Si el GeoJSON de provincias no se puede leer, ambas columnas quedan nulas y
+    se avisa con [WARN]: la carga del catálogo no depende de los polígonos.
+    """
+    if locator is None:
+        try:
+            locator = load_locator()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"  [WARN] No se pudo leer el GeoJSON de provincias, se omite la provincia geográfica: {e}")
+            df["provincia_geografica"] = pd.Series(None, index=df.index, dtype=object)
+            df["provincia_discrepante"] = pd.Series(pd.NA, index=df.index, dtype="boolean")
+            return df
+    geo = locator.locate_names(df["longitud"].to_numpy(dtype="float64", na_value=np.nan),
+                               df["latitud"].to_numpy(dtype="float64", na_value=np.nan))
+    df["provincia_geografica"] = pd.Series(geo, index=df.index)
+
+    norm = df["provincia_normalizada"].to_numpy(dtype=object)
+    present = pd.notna(geo) & pd.notna(norm)
+    mismatch = present & (geo != norm)
+
+    # Límites interprovinciales: alcanza con que coincida alguna de las provincias mencionadas
+    limits = np.flatnonzero(mismatch & df["es_limite"].to_numpy(dtype=bool))
+    if len(limits):
+        provincias = df["provincias"].to_numpy(dtype=object)
+        mismatch[limits] = [geo[i] not in (provincias[i] or ()) for i in limits]
+
+    df["provincia_discrepante"] = pd.Series(mismatch, index=df.index)
+    return df
+
+
+def mismatch_summary(df: pd.DataFrame) -> Dict[Tuple[str, str], int]:
+    """Cantidad de discrepancias por (provincia_normalizada, provincia_geografica), de mayor a menor."""
+    flagged = df.loc[df["provincia_discrepante"].fillna(False).astype(bool),
+                     ["provincia_normalizada", "provincia_geografica"]]
+    counts = flagged.value_counts()
+    return {(str(a), str(b)): int(n) for (a, b), n in counts.items()}
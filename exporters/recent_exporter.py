@@ -12,6 +12,7 @@ No modifica sismos.csv, SQLite ni Supabase.
 import json
 import os
 import pandas as pd
+from exporters import compression
 from exporters.config import RECENT_OUT, EXPORTS_DIR, RECENT_LIMIT
 
 
@@ -44,11 +45,12 @@ def export(df: pd.DataFrame) -> None:
             "tipo_ubicacion": row.get("tipo_ubicacion", None),
             "es_argentina": bool(row.get("es_argentina", False)),
             "es_limite": bool(row.get("es_limite", False)),
+            "cluster_id": int(row["cluster_id"]) if pd.notna(row.get("cluster_id")) else None,
         }
         records.append(rec)
 
     os.makedirs(EXPORTS_DIR, exist_ok=True)
-    with open(RECENT_OUT, "w", encoding="utf-8") as f:
+    with compression.open_text(RECENT_OUT) as f:
         json.dump(records, f, ensure_ascii=False, default=_serialize)
 
     print(f"  [OK] Recientes exportados: {len(records)} registros -> {RECENT_OUT}")
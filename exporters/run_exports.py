@@ -10,31 +10,119 @@ Exportadores incluidos:
 3. recent_exporter -> data/exports/sismos_recientes.json (Últimos 500 sismos)
 4. sample_exporter -> data/exports/sample.geojson (Muestra variada 100-300 registros)
 5. stats_exporter -> data/exports/stats.json (Estadísticas agregadas)
+6. tiles_exporter -> data/exports/sismos.pmtiles (Teselas vectoriales MVT)
+7. shards_exporter -> data/exports/celdas/ (GeoJSON por celda de grilla + manifest.json)
+8. periods_exporter -> data/exports/periodos/ (GeoJSON por año / mes + index.json)
+9. binary_exporter -> data/exports/sismos.bin (Columnas binarias para typed arrays)
+10. clusters_exporter -> data/exports/clusters.json (Secuencias de réplicas y enjambres)
+11. gutenberg_richter_exporter -> data/exports/gutenberg_richter.json (Magnitud-frecuencia, b y Mc)
 
 Uso:
     python exporters/run_exports.py
+    python exporters/run_exports.py --incremental
+    python exporters/run_exports.py --parallel
+
+En modo incremental solo se procesan los eventos agregados desde la última
+exportación exitosa (ver export_state): stats.json y metadata.json se actualizan
+aritméticamente y los features nuevos se insertan al principio de sismos.geojson
+(el resto se copia sin parsear, pero sus sidecars .gz / .br se vuelven a
+comprimir enteros: es el paso más costoso, unos 4 s sobre 80.000 eventos). De
+las teselas solo se regeneran las que contienen eventos nuevos o con cluster_id
+distinto, y de las celdas y las particiones por período solo se reescriben las
+que cambiaron (en las celdas, insertando los eventos nuevos delante del
+contenido existente). Recientes, sample, el binario columnar, los clusters y la
+estadística de Gutenberg-Richter se vuelven a generar (son baratos). Si no hay
+un estado previo válido, se realiza una exportación completa.
+
+En modo paralelo (exportación completa) cada exportador corre en su propio
+proceso. Los procesos no reciben copias serializadas del DataFrame: lo abren
+desde el caché columnar de csv_exporter, cuyas columnas numéricas se mapean
+en memoria y se comparten entre procesos.
+
+Las secuencias sísmicas (columna cluster_id, ver cluster_detector) se detectan
+una sola vez, después de cargar el catálogo y en un paso aislado: si fallan,
+los exportadores corren igual y publican cluster_id nulo.
 
 Invocado automáticamente por GitHub Actions al final del pipeline.
 Si alguna exportación falla, no interrumpe el pipeline principal.
 """
+import argparse
+import contextlib
+import io
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
 
 # Asegurar que el directorio raíz del repo esté en el path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from exporters.config import SISMOS_CSV
 from exporters import (
+    binary_exporter,
+    cluster_detector,
+    clusters_exporter,
+    compression,
     csv_exporter,
+    export_state,
     geojson_exporter,
+    gutenberg_richter_exporter,
     metadata_exporter,
+    periods_exporter,
+    province_locator,
     recent_exporter,
     sample_exporter,
+    shards_exporter,
     stats_exporter,
+    tiles_exporter,
 )
 
+# Pasos de la exportación completa: (número, mensaje, nombre, etiqueta para errores)
+FULL_STEPS = [
+    (2, "Exportando GeoJSON completo...", "geojson", "GeoJSON"),
+    (3, "Exportando metadata...", "metadata", "Metadata"),
+    (4, "Exportando sismos recientes...", "recent", "Recientes"),
+    (5, "Exportando sample.geojson...", "sample", "Sample"),
+    (6, "Exportando stats.json...", "stats", "Stats"),
+    (7, "Exportando teselas vectoriales (PMTiles)...", "tiles", "Tiles"),
+    (8, "Exportando GeoJSON por celdas...", "shards", "Celdas"),
+    (9, "Exportando particiones por año y mes...", "periods", "Periodos"),
+    (10, "Exportando binario columnar...", "binary", "Binario"),
+    (11, "Exportando secuencias sísmicas (clusters)...", "clusters", "Clusters"),
+    (12, "Exportando estadística de Gutenberg-Richter...", "gutenberg_richter", "Gutenberg-Richter"),
+]
+
+EXPORTERS = {
+    "geojson": geojson_exporter,
+    "metadata": metadata_exporter,
+    "recent": recent_exporter,
+    "sample": sample_exporter,
+    "stats": stats_exporter,
+    "tiles": tiles_exporter,
+    "shards": shards_exporter,
+    "periods": periods_exporter,
+    "binary": binary_exporter,
+    "clusters": clusters_exporter,
+    "gutenberg_richter": gutenberg_richter_exporter,
+}
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Genera los archivos de exportación a partir de sismos.csv")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Procesar solo los eventos nuevos desde la última exportación exitosa",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Ejecutar los exportadores de la exportación completa en procesos paralelos",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("GENERACIÓN DE ARCHIVOS DE EXPORTACIÓN")
     print("=" * 60)
@@ -48,49 +136,50 @@ def main():
     # Leer el CSV una sola vez — todos los exportadores comparten el mismo DataFrame
     print("\n[1] Cargando sismos.csv e ID deterministicos...")
     df = csv_exporter.load_sismos()
-    print(f"    {len(df)} registros cargados e IDs generados")
-
-    errors = []
+    print(f"    {len(df)} registros cargados e IDs generados (cache: {df.attrs.get('cache')})")
+    mismatches = province_locator.mismatch_summary(df)
+    if mismatches:
+        top = ", ".join(f"{a} -> {b} ({n})" for (a, b), n in list(mismatches.items())[:3])
+        print(f"    [INFO] {sum(mismatches.values())} epicentros fuera de la provincia indicada: {top}")
 
-    # 1. GeoJSON completo
-    print("\n[2] Exportando GeoJSON completo...")
-    try:
-        geojson_exporter.export(df)
-    except Exception as e:
-        print(f"  [ERROR] GeoJSON fallo: {e}")
-        errors.append("geojson")
+    n_new = None
+    if args.incremental:
+        state = export_state.load_state()
+        n_new = export_state.count_new_rows(df, state) if state else None
+        if n_new is None:
+            print("    [INFO] Sin estado previo válido: se realiza una exportación completa")
+        else:
+            print(f"    Modo incremental: {n_new} eventos nuevos desde la última exportación")
 
-    # 2. Metadata
-    print("\n[3] Exportando metadata...")
-    try:
-        metadata_exporter.export(df)
-    except Exception as e:
-        print(f"  [ERROR] Metadata fallo: {e}")
-        errors.append("metadata")
+    if n_new == 0:
+        print("\n[OK] Sin eventos nuevos: los archivos exportados ya están al día")
+        return
 
-    # 3. Recientes
-    print("\n[4] Exportando sismos recientes...")
-    try:
-        recent_exporter.export(df)
-    except Exception as e:
-        print(f"  [ERROR] Recientes fallo: {e}")
-        errors.append("recent")
+    errors = []
+    reports = []
+    detect_clusters(df, errors)
+    if n_new is None:
+        # Los procesos del pool leen el catálogo del caché: sin un caché válido se corre en secuencia
+        if args.parallel and csv_exporter.cache_matches(df):
+            reports = run_full_parallel(errors, df["cluster_id"].array if "cluster_id" in df.columns else None)
+        else:
+            if args.parallel:
+                print("    [WARN] Sin caché válido del catálogo: los exportadores corren en modo secuencial")
+            run_full(df, errors)
+        aggregates = metadata_exporter.aggregates(df)
+    else:
+        aggregates = run_incremental(df, n_new, state, errors)
 
-    # 4. Sample GeoJSON
-    print("\n[5] Exportando sample.geojson...")
-    try:
-        sample_exporter.export(df)
-    except Exception as e:
-        print(f"  [ERROR] Sample fallo: {e}")
-        errors.append("sample")
+    reports += compression.pop_reports()
+    if reports:
+        print("\n[Compresión] Sidecars precomprimidos:")
+        for report in reports:
+            for line in compression.format_report(report):
+                print(f"    {line}")
 
-    # 5. Stats JSON
-    print("\n[6] Exportando stats.json...")
-    try:
-        stats_exporter.export(df)
-    except Exception as e:
-        print(f"  [ERROR] Stats fallo: {e}")
-        errors.append("stats")
+    # El estado solo se actualiza si todos los archivos quedaron consistentes
+    if not errors:
+        export_state.save_state(df, aggregates)
 
     print("\n" + "=" * 60)
     if errors:
@@ -102,5 +191,143 @@ def main():
     print("=" * 60)
 
 
+def detect_clusters(df, errors):
+    """
+    Agrega la columna cluster_id al DataFrame compartido.
+
+    Un error no interrumpe la exportación: los demás exportadores corren sin la
+    columna y clusters_exporter vuelve a intentar la detección por su cuenta.
+    """
+    try:
+        cluster_detector.enrich_clusters(df)
+    except Exception as e:
+        print(f"    [WARN] No se pudieron detectar las secuencias sísmicas: {e}")
+        errors.append("cluster_id")
+        return
+    clusters = df["cluster_id"]
+    print(f"    {int(clusters.notna().sum())} eventos en {int(clusters.nunique())} secuencias sísmicas")
+
+
+def run_full(df, errors):
+    """Regenera todos los archivos a partir del DataFrame completo."""
+    for number, message, name, label in FULL_STEPS:
+        _run_step(number, message, name, label, lambda: EXPORTERS[name].export(df), errors)
+
+
+def run_full_parallel(errors, cluster_ids=None):
+    """
+    Regenera todos los archivos ejecutando cada exportador en un proceso propio.
+
+    Cada proceso carga el catálogo desde el caché columnar (ver csv_exporter.load_cached)
+    y su salida se muestra en el orden habitual al terminar. Un error en un
+    exportador no afecta a los demás y se reporta igual que en modo secuencial.
+
+    Args:
+        cluster_ids: columna cluster_id ya calculada (None si no se pudo calcular).
+
+    Returns:
+        Resultados de compresión de los sidecars generados en los procesos.
+    """
+    reports = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(FULL_STEPS)) as pool:
+        futures = [(step, pool.submit(_export_in_worker, step[2], cluster_ids)) for step in FULL_STEPS]
+
+        for (number, message, name, label), future in futures:
+            print(f"\n[{number}] {message}")
+            try:
+                output, error, elapsed, worker_reports = future.result()
+            except Exception as e:
+                output, error, elapsed, worker_reports = "", str(e), None, []
+            reports.extend(worker_reports)
+            print(output, end="")
+            if error is not None:
+                print(f"  [ERROR] {label} fallo: {error}")
+                errors.append(name)
+            elif elapsed is not None:
+                print(f"  ({elapsed:.2f} s en proceso paralelo)")
+
+    print(f"\n    Exportadores en paralelo: {time.perf_counter() - start:.2f} s en total")
+    return reports
+
+
+def _export_in_worker(name, cluster_ids=None):
+    """
+    Ejecuta un exportador dentro de un proceso del pool.
+
+    Args:
+        cluster_ids: columna cluster_id calculada por el proceso principal.
+
+    Returns:
+        (salida, error, segundos, resultados de compresión)
+    """
+    compression.pop_reports()
+    start = time.perf_counter()
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            df = csv_exporter.load_cached()
+            if df is None:
+                raise RuntimeError("No hay un caché válido del catálogo")
+            if cluster_ids is not None:
+                df["cluster_id"] = pd.Series(cluster_ids, index=df.index)
+            EXPORTERS[name].export(df)
+        except Exception as e:
+            error = str(e)
+    return output.getvalue(), error, time.perf_counter() - start, compression.pop_reports()
+
+
+def run_incremental(df, n_new, state, errors):
+    """
+    Actualiza los archivos publicados procesando solo las primeras n_new filas.
+
+    Returns:
+        Agregados de metadata actualizados (a persistir en el estado).
+    """
+    df_new = df.head(n_new)
+    changed = export_state.changed_rows(df, n_new, state)
+    result = {}
+
+    _run_step(2, "Actualizando GeoJSON...", "geojson", "GeoJSON", lambda: geojson_exporter.update(df_new), errors)
+    _run_step(
+        3, "Actualizando metadata...", "metadata", "Metadata",
+        lambda: result.update(metadata_exporter.update(df_new, state["metadata_agregados"])), errors,
+    )
+    _run_step(4, "Exportando sismos recientes...", "recent", "Recientes", lambda: recent_exporter.export(df), errors)
+    _run_step(5, "Exportando sample.geojson...", "sample", "Sample", lambda: sample_exporter.export(df), errors)
+    _run_step(6, "Actualizando stats.json...", "stats", "Stats", lambda: stats_exporter.update(df_new), errors)
+    _run_step(
+        7, "Actualizando teselas vectoriales (PMTiles)...", "tiles", "Tiles",
+        lambda: tiles_exporter.update(df, changed), errors,
+    )
+    _run_step(8, "Exportando GeoJSON por celdas...", "shards", "Celdas", lambda: shards_exporter.export(df, n_new), errors)
+    _run_step(
+        9, "Exportando particiones por año y mes...", "periods", "Periodos",
+        lambda: periods_exporter.export(df), errors,
+    )
+    _run_step(10, "Exportando binario columnar...", "binary", "Binario", lambda: binary_exporter.export(df), errors)
+    # Los eventos nuevos pueden sumarse a clusters anteriores: se recalcula todo
+    _run_step(
+        11, "Exportando secuencias sísmicas (clusters)...", "clusters", "Clusters",
+        lambda: clusters_exporter.export(df), errors,
+    )
+    _run_step(
+        12, "Exportando estadística de Gutenberg-Richter...", "gutenberg_richter", "Gutenberg-Richter",
+        lambda: gutenberg_richter_exporter.export(df), errors,
+    )
+    return result
+
+
+def _run_step(number, message, name, label, func, errors):
+    """Ejecuta un exportador aislando sus errores del resto del pipeline."""
+    print(f"\n[{number}] {message}")
+    try:
+        func()
+    except Exception as e:
+        print(f"  [ERROR] {label} fallo: {e}")
+        errors.append(name)
+
+
 if __name__ == "__main__":
     main()
@@ -12,6 +12,7 @@ No modifica sismos.csv, SQLite ni Supabase.
 import json
 import os
 import pandas as pd
+from exporters import compression
 from exporters.config import SAMPLE_OUT, EXPORTS_DIR, SAMPLE_TARGET_SIZE
 
 
@@ -101,7 +102,7 @@ def export(df: pd.DataFrame) -> None:
     }
 
     os.makedirs(EXPORTS_DIR, exist_ok=True)
-    with open(SAMPLE_OUT, "w", encoding="utf-8") as f:
+    with compression.open_text(SAMPLE_OUT) as f:
         json.dump(geojson, f, ensure_ascii=False, default=_serialize)
 
     print(f"  [OK] Sample GeoJSON exportado: {len(features)} features -> {SAMPLE_OUT}")
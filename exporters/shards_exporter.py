@@ -0,0 +1,186 @@
+"""
+shards_exporter.py
+
+Responsabilidad única: dividir el catálogo en celdas fijas de una grilla lat/lon
+y escribir un GeoJSON pequeño por cada celda no vacía en data/exports/celdas/,
+junto con un manifest.json que describe cada celda (bbox, cantidad de eventos,
+rango de magnitudes y tamaño en bytes).
+
+Así el frontend puede descargar solo las celdas que intersectan el viewport en
+lugar del sismos.geojson completo.
+
+La celda de cada evento se calcula de forma vectorizada y el agrupamiento se
+hace en una sola pasada: el DataFrame se ordena una vez por celda (orden
+estable, se conserva el orden del catálogo dentro de cada celda) y cada celda
+es un tramo contiguo del resultado.
+
+Como en periods_exporter, solo se reescriben las celdas cuyo contenido cambió
+(según la huella de sus features guardada en el manifest), y cada archivo se
+escribe en un temporal que reemplaza al anterior, así un corte a mitad de la
+exportación nunca deja celdas truncadas. En la exportación incremental las
+filas nuevas quedan al principio de su celda, de modo que si el resto de la
+celda coincide con la huella anterior se insertan delante del archivo
+existente (copiado byte a byte) en lugar de recodificar la celda entera.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import glob
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from exporters import geojson_exporter
+from exporters.config import SHARDS_DIR, SHARDS_MANIFEST_OUT, SHARD_CELL_DEGREES
+
+MANIFEST_VERSION = 1
+
+
+def export(df: pd.DataFrame, n_new: int = 0) -> None:
+    """
+    Genera data/exports/celdas/*.geojson y su manifest.json a partir del DataFrame recibido.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+        n_new: cantidad de filas al principio de df que no estaban en la
+               exportación anterior (0 en una exportación completa).
+    """
+    # Coordenadas nulas o fuera de rango (errores de carga en el catálogo) no caen en ninguna celda
+    valid = (df["latitud"].between(-90, 90) & df["longitud"].between(-180, 180)).to_numpy()
+    df_geo = df[valid]
+
+    rows, cols = assign_cells(df_geo["latitud"].to_numpy(dtype="float64"),
+                              df_geo["longitud"].to_numpy(dtype="float64"))
+    n_cols = int(round(360 / SHARD_CELL_DEGREES))
+    keys = rows * n_cols + cols
+
+    order = np.argsort(keys, kind="stable")
+    df_sorted = df_geo.iloc[order]
+    is_new = np.flatnonzero(valid)[order] < n_new
+    keys = keys[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1)) if len(keys) else np.array([], dtype=np.int64)
+    ends = np.append(starts[1:], len(keys))
+
+    magnitudes = df_sorted["magnitud"].to_numpy(dtype="float64", na_value=np.nan)
+    mag_min = np.fmin.reduceat(magnitudes, starts) if len(starts) else []
+    mag_max = np.fmax.reduceat(magnitudes, starts) if len(starts) else []
+    ids = df_sorted["id_u64"].to_numpy(dtype=np.uint64)
+    ubicaciones = [str(v) for v in df_sorted["ubicacion_original"].tolist()]
+    sentidos = [str(v) for v in df_sorted["sentido"].tolist()]
+
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    previous = _read_manifest()
+    version = geojson_exporter.content_version()
+    cells = []
+    written = 0
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        row, col = divmod(int(keys[start]), n_cols)
+        south = row * SHARD_CELL_DEGREES - 90
+        west = col * SHARD_CELL_DEGREES - 180
+        name = cell_filename(south, west)
+        path = os.path.join(SHARDS_DIR, name)
+        fingerprint = geojson_exporter.features_fingerprint(
+            version, ids[start:end], ubicaciones[start:end], sentidos[start:end],
+        )
+
+        old = previous.get(name)
+        if not _matches(old, fingerprint, path):
+            # Las filas nuevas van primero dentro de la celda (orden estable)
+            split = start + int(np.count_nonzero(is_new[start:end]))
+            reusable = split > start and _matches(old, geojson_exporter.features_fingerprint(
+                version, ids[split:end], ubicaciones[split:end], sentidos[split:end],
+            ), path)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", buffering=geojson_exporter.WRITE_BUFFER_SIZE) as f:
+                if reusable:
+                    with open(path, "rb") as src:
+                        geojson_exporter.prepend_features(df_sorted.iloc[start:split], src, f)
+                else:
+                    geojson_exporter.write_feature_collection(df_sorted.iloc[start:end], f)
+            os.replace(tmp_path, path)
+            written += 1
+
+        cells.append({
+            "archivo": name,
+            "bbox": [west, south, west + SHARD_CELL_DEGREES, south + SHARD_CELL_DEGREES],
+            "eventos": end - start,
+            "magnitud_minima": _nullable(mag_min[i]),
+            "magnitud_maxima": _nullable(mag_max[i]),
+            "bytes": os.path.getsize(path),
+            "huella": fingerprint,
+        })
+
+    removed = _remove_stale([cell["archivo"] for cell in cells])
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "tamano_celda_grados": SHARD_CELL_DEGREES,
+        "total_celdas": len(cells),
+        "total_eventos": int(len(df_sorted)),
+        "celdas": cells,
+    }
+    tmp_path = f"{SHARDS_MANIFEST_OUT}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, SHARDS_MANIFEST_OUT)
+
+    print(f"  [OK] Celdas exportadas: {written} de {len(cells)} archivos reescritos "
+          f"({removed} obsoletos eliminados), {len(df_sorted)} features -> {SHARDS_DIR}")
+
+
+def assign_cells(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fila y columna de la grilla para cada coordenada (vectorizado).
+    La fila 0 empieza en -90° y la columna 0 en -180°.
+    """
+    n_rows = int(round(180 / SHARD_CELL_DEGREES))
+    n_cols = int(round(360 / SHARD_CELL_DEGREES))
+    rows = np.floor((lat + 90) / SHARD_CELL_DEGREES).astype(np.int64)
+    cols = np.floor((lon + 180) / SHARD_CELL_DEGREES).astype(np.int64)
+    # Los bordes norte (90°) y este (180°) pertenecen a la última celda
+    return np.minimum(rows, n_rows - 1), np.minimum(cols, n_cols - 1)
+
+
+def cell_filename(south: float, west: float) -> str:
+    """Nombre del archivo de la celda a partir de su esquina suroeste."""
+    return f"celda_{south:g}_{west:g}.geojson"
+
+
+def _read_manifest() -> Dict[str, dict]:
+    """Celdas del manifest de la ejecución anterior, por nombre de archivo."""
+    try:
+        with open(SHARDS_MANIFEST_OUT, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return {cell["archivo"]: cell for cell in manifest.get("celdas", [])}
+
+
+def _matches(old: Optional[dict], fingerprint: str, path: str) -> bool:
+    """True si el archivo de la celda corresponde a la huella dada según el manifest anterior."""
+    return (
+        old is not None
+        and old.get("huella") == fingerprint
+        and os.path.exists(path)
+        and os.path.getsize(path) == old.get("bytes")
+    )
+
+
+def _remove_stale(current: List[str]) -> int:
+    """Elimina los GeoJSON de celdas que ya no tienen eventos."""
+    keep = set(current)
+    removed = 0
+    for path in glob.glob(os.path.join(SHARDS_DIR, "celda_*.geojson")):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _nullable(value) -> Optional[float]:
+    """Float nativo, o None si es NaN (celda sin magnitudes)."""
+    value = float(value)
+    return None if value != value else value
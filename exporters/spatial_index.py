@@ -0,0 +1,363 @@
+"""
+spatial_index.py
+
+Índice espacial en memoria sobre los epicentros del catálogo enriquecido
+(csv_exporter.load_sismos) para consultas por radio, k vecinos más cercanos
+y bounding box, con filtros opcionales de fecha y magnitud.
+
+Estructura: grilla lat/lon de SPATIAL_INDEX_CELL_DEGREES grados. Los eventos se
+ordenan por celda (fila por fila) y, dentro de cada celda, por fecha y hora;
+cell_offsets marca el inicio de cada celda (formato CSR), así que las celdas
+contiguas de una fila de la grilla son un solo tramo de los arrays. Cada
+consulta junta los tramos de las celdas que toca el área buscada y refina con
+la distancia de gran círculo exacta, calculada por la cuerda entre vectores
+unitarios (estable para distancias cortas). Los k vecinos se buscan con radios
+crecientes hasta encontrar k.
+
+pairs_within() es el auto-join espacio-temporal (todos los pares de eventos
+cercanos en espacio y tiempo) que usa cluster_detector.
+
+Las longitudes no se envuelven en ±180° (el catálogo no se acerca al antimeridiano).
+
+El índice se guarda en un .npz (data/cache/indice_espacial.npz) junto con la
+huella de los IDs del catálogo; load_or_build() lo reutiliza mientras el
+catálogo no cambie.
+"""
+import hashlib
+import json
+import math
+import os
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from exporters.config import SPATIAL_INDEX_CACHE, SPATIAL_INDEX_CELL_DEGREES
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+# Radio inicial de la búsqueda de k vecinos (se duplica hasta encontrar k)
+NEAREST_START_KM = 10.0
+
+INDEX_VERSION = 2
+_NO_TIME = np.iinfo(np.int64).min
+
+TimeLike = Union[str, pd.Timestamp, np.datetime64, None]
+
+
+class SpatialIndex:
+    """
+    Índice de grilla sobre los epicentros.
+
+    Las consultas devuelven posiciones de fila (iloc) del DataFrame con el que
+    se construyó el índice. Los eventos sin coordenadas válidas no se indexan.
+    """
+
+    def __init__(self, arrays: dict, cell_degrees: float, lat0: float, lon0: float,
+                 nrows: int, ncols: int):
+        self.positions = arrays["positions"]
+        self.lat = arrays["lat"]
+        self.lon = arrays["lon"]
+        self.xyz = arrays["xyz"]
+        self.epoch = arrays["epoch"]
+        self.magnitude = arrays["magnitude"]
+        self.ids_u64 = arrays["ids_u64"]
+        self.cell_offsets = arrays["cell_offsets"]
+        self.cell_degrees = cell_degrees
+        self.lat0, self.lon0 = lat0, lon0
+        self.nrows, self.ncols = nrows, ncols
+        self._id_order = np.argsort(self.ids_u64, kind="stable")
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, cell_degrees: float = SPATIAL_INDEX_CELL_DEGREES) -> "SpatialIndex":
+        """Construye el índice a partir del catálogo enriquecido (latitud, longitud, fecha, hora, magnitud, id_u64)."""
+        lat = df["latitud"].to_numpy(dtype="float64", na_value=np.nan)
+        lon = df["longitud"].to_numpy(dtype="float64", na_value=np.nan)
+        # El catálogo trae algunas latitudes corruptas (fuera de ±90°): no se indexan
+        positions = np.flatnonzero((np.abs(lat) <= 90) & (np.abs(lon) <= 180))
+        lat, lon = lat[positions], lon[positions]
+
+        lat0 = math.floor(lat.min() / cell_degrees) * cell_degrees if len(lat) else 0.0
+        lon0 = math.floor(lon.min() / cell_degrees) * cell_degrees if len(lon) else 0.0
+        nrows = int((lat.max() - lat0) // cell_degrees) + 1 if len(lat) else 1
+        ncols = int((lon.max() - lon0) // cell_degrees) + 1 if len(lon) else 1
+        rows = np.minimum(((lat - lat0) // cell_degrees).astype(np.int64), nrows - 1)
+        cols = np.minimum(((lon - lon0) // cell_degrees).astype(np.int64), ncols - 1)
+        cells = rows * ncols + cols
+
+        stamps = pd.to_datetime(
+            df["fecha"].astype("string") + " " + df["hora"].astype("string"),
+            format="%d/%m/%Y %H:%M:%S", errors="coerce",
+        )
+        epoch = stamps.to_numpy(dtype="datetime64[s]").view(np.int64)
+        # Por celda y, dentro de la celda, por tiempo (los eventos sin fecha primero)
+        order = np.lexsort((epoch[positions], cells))
+
+        lat_r, lon_r = np.radians(lat[order]), np.radians(lon[order])
+        arrays = {
+            "positions": positions[order],
+            "lat": lat[order],
+            "lon": lon[order],
+            # Vector unitario de cada epicentro, una fila por componente
+            "xyz": np.stack([np.cos(lat_r) * np.cos(lon_r), np.cos(lat_r) * np.sin(lon_r), np.sin(lat_r)]),
+            "epoch": epoch[positions[order]],
+            "magnitude": df["magnitud"].to_numpy(dtype="float64", na_value=np.nan)[positions][order],
+            "ids_u64": df["id_u64"].to_numpy(dtype=np.uint64)[positions][order],
+            "cell_offsets": np.concatenate([[0], np.cumsum(np.bincount(cells, minlength=nrows * ncols))]),
+        }
+        return cls(arrays, cell_degrees, lat0, lon0, nrows, ncols)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    # -- Consultas --
+
+    def radius(self, lat: float, lon: float, radius_km: float, desde: TimeLike = None, hasta: TimeLike = None,
+               magnitud_min: Optional[float] = None, magnitud_max: Optional[float] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Eventos a no más de radius_km del punto, del más cercano al más lejano.
+
+        Returns:
+            (posiciones, distancias_km)
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        sin_r = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi / 2))
+        cos_lat = math.cos(math.radians(lat))
+        if lat - dlat <= -90 or lat + dlat >= 90 or sin_r >= cos_lat:
+            lon_lo, lon_hi = -180.0, 180.0
+        else:
+            # Ancho en longitud de un casquete esférico de radio radius_km
+            dlon = math.degrees(math.asin(sin_r / cos_lat))
+            lon_lo, lon_hi = lon - dlon, lon + dlon
+
+        idx = self._candidates(lat - dlat, lat + dlat, lon_lo, lon_hi)
+        if any(v is not None for v in (desde, hasta, magnitud_min, magnitud_max)):
+            idx = idx[self._filter(idx, desde, hasta, magnitud_min, magnitud_max)]
+        # Se compara la cuerda al cuadrado y solo se convierte a km lo que queda
+        chord2 = self._chord2(idx, lat, lon)
+        keep = chord2 <= (2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        idx, chord2 = idx[keep], chord2[keep]
+        order = np.argsort(chord2, kind="stable")
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(chord2[order]) / 2, 1.0))
+        return self.positions[idx[order]], dist
+
+    def nearest(self, lat: float, lon: float, k: int, desde: TimeLike = None, hasta: TimeLike = None,
+                magnitud_min: Optional[float] = None, magnitud_max: Optional[float] = None,
+                exclude: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Los k eventos más cercanos al punto (menos si no hay tantos que cumplan los filtros).
+
+        Args:
+            exclude: posición de fila a omitir (el propio evento en nearest_to_event).
+
+        Returns:
+            (posiciones, distancias_km), del más cercano al más lejano.
+        """
+        wanted = k + (1 if exclude is not None else 0)
+        radius_km = NEAREST_START_KM
+        while True:
+            positions, dist = self.radius(lat, lon, radius_km, desde, hasta, magnitud_min, magnitud_max)
+            if len(positions) >= wanted or radius_km >= math.pi * EARTH_RADIUS_KM:
+                break
+            radius_km *= 2
+        if exclude is not None:
+            keep = positions != exclude
+            positions, dist = positions[keep], dist[keep]
+        return positions[:k], dist[:k]
+
+    def nearest_to_event(self, event_id: Union[str, int], k: int, **filters) -> Tuple[np.ndarray, np.ndarray]:
+        """Los k eventos más cercanos a un evento del catálogo (por ID hexadecimal o id_u64), sin incluirlo."""
+        i = self._lookup(event_id)
+        return self.nearest(self.lat[i], self.lon[i], k, exclude=int(self.positions[i]), **filters)
+
+    def bbox(self, oeste: float, sur: float, este: float, norte: float, desde: TimeLike = None,
+             hasta: TimeLike = None, magnitud_min: Optional[float] = None,
+             magnitud_max: Optional[float] = None) -> np.ndarray:
+        """Posiciones (en orden creciente) de los eventos dentro del rectángulo."""
+        idx = self._candidates(sur, norte, oeste, este)
+        mask = self._filter(idx, desde, hasta, magnitud_min, magnitud_max)
+        mask &= (self.lat[idx] >= sur) & (self.lat[idx] <= norte) & (self.lon[idx] >= oeste) & (self.lon[idx] <= este)
+        return np.sort(self.positions[idx[mask]])
+
+    def pairs_within(self, radius_km: float, seconds: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Todos los pares de eventos a no más de radius_km y seconds entre sí, cada
+        par una sola vez. Los eventos sin fecha no forman pares.
+
+        Como dentro de cada celda los eventos están ordenados por tiempo, la
+        clave (celda, tiempo) es creciente en los arrays del índice: para cada
+        celda vecina, los candidatos de todos los eventos se ubican a la vez con
+        dos searchsorted sobre esa clave. Costo O(n log n + candidatos), sin
+        comparar todos contra todos.
+
+        Returns:
+            (posiciones_a, posiciones_b, distancias_km)
+        """
+        window = int(seconds)
+        timed = self.epoch != _NO_TIME
+        if not timed.any():
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        cell = self.cell_degrees
+        rows = np.minimum(((self.lat - self.lat0) // cell).astype(np.int64), self.nrows - 1)
+        cols = np.minimum(((self.lon - self.lon0) // cell).astype(np.int64), self.ncols - 1)
+        # Tiempo relativo desplazado en window: las búsquedas de una celda no invaden las vecinas
+        start = self.epoch[timed].min()
+        rel = np.where(timed, self.epoch - start, 0)
+        span = int(rel.max()) + 2 * window + 1
+        keys = (rows * self.ncols + cols) * span + rel + window
+
+        # Celdas vecinas a revisar; solo medio plano, así cada par sale una vez
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(float(np.abs(self.lat).max()))), 1e-6)
+        reach_r = int(math.ceil(dlat / cell))
+        reach_c = min(int(math.ceil(dlat / cos_lat / cell)), self.ncols)
+        offsets = [(dr, dc) for dr in range(0, reach_r + 1) for dc in range(-reach_c, reach_c + 1)
+                   if dr > 0 or dc >= 0]
+
+        limit = (2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        source = np.flatnonzero(timed)
+        found_a, found_b, found_d2 = [], [], []
+        for dr, dc in offsets:
+            r, c = rows[source] + dr, cols[source] + dc
+            inside = (r < self.nrows) & (c >= 0) & (c < self.ncols)
+            a = source[inside]
+            base = (r[inside] * self.ncols + c[inside]) * span + rel[a] + window
+            lo = np.searchsorted(keys, base - window, side="left")
+            hi = np.searchsorted(keys, base + window, side="right")
+            if dr == 0 and dc == 0:
+                # Misma celda: solo los que vienen después en el orden del índice
+                lo = np.maximum(lo, a + 1)
+            counts = np.maximum(hi - lo, 0)
+            if not counts.sum():
+                continue
+            pair_a = np.repeat(a, counts)
+            pair_b = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+            dx = self.xyz[0][pair_a] - self.xyz[0][pair_b]
+            dy = self.xyz[1][pair_a] - self.xyz[1][pair_b]
+            dz = self.xyz[2][pair_a] - self.xyz[2][pair_b]
+            d2 = dx * dx + dy * dy + dz * dz
+            keep = (d2 <= limit) & timed[pair_b]
+            found_a.append(pair_a[keep])
+            found_b.append(pair_b[keep])
+            found_d2.append(d2[keep])
+
+        if not found_a:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+        pair_a, pair_b, d2 = np.concatenate(found_a), np.concatenate(found_b), np.concatenate(found_d2)
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(d2) / 2, 1.0))
+        return self.positions[pair_a], self.positions[pair_b], dist
+
+    # -- Persistencia --
+
+    def save(self, path: str, fingerprint: str = "") -> None:
+        """Guarda el índice en un .npz sin comprimir."""
+        meta = {
+            "version": INDEX_VERSION, "fingerprint": fingerprint, "cell_degrees": self.cell_degrees,
+            "lat0": self.lat0, "lon0": self.lon0, "nrows": self.nrows, "ncols": self.ncols,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path, meta=np.array(json.dumps(meta)), positions=self.positions, lat=self.lat, lon=self.lon,
+            xyz=self.xyz, epoch=self.epoch, magnitude=self.magnitude, ids_u64=self.ids_u64,
+            cell_offsets=self.cell_offsets,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["SpatialIndex", str]:
+        """Carga un índice guardado con save(). Devuelve (índice, huella)."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != INDEX_VERSION:
+                raise ValueError(f"Versión de índice no soportada: {meta.get('version')}")
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        index = cls(arrays, meta["cell_degrees"], meta["lat0"], meta["lon0"], meta["nrows"], meta["ncols"])
+        return index, meta["fingerprint"]
+
+    # -- Auxiliares --
+
+    def _candidates(self, lat_lo: float, lat_hi: float, lon_lo: float, lon_hi: float) -> np.ndarray:
+        """Índices (en los arrays ordenados) de los eventos de las celdas que cubren el rectángulo."""
+        cell = self.cell_degrees
+        r0 = max(int((lat_lo - self.lat0) // cell), 0)
+        r1 = min(int((lat_hi - self.lat0) // cell), self.nrows - 1)
+        c0 = max(int((lon_lo - self.lon0) // cell), 0)
+        c1 = min(int((lon_hi - self.lon0) // cell), self.ncols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.int64)
+        rows = np.arange(r0, r1 + 1) * self.ncols
+        starts = self.cell_offsets[rows + c0]
+        lengths = self.cell_offsets[rows + c1 + 1] - starts
+        return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+    def _filter(self, idx: np.ndarray, desde: TimeLike, hasta: TimeLike,
+                magnitud_min: Optional[float], magnitud_max: Optional[float]) -> np.ndarray:
+        mask = np.ones(len(idx), dtype=bool)
+        if desde is not None or hasta is not None:
+            epoch = self.epoch[idx]
+            mask &= epoch != _NO_TIME
+            if desde is not None:
+                mask &= epoch >= _to_epoch(desde)
+            if hasta is not None:
+                mask &= epoch <= _to_epoch(hasta)
+        if magnitud_min is not None:
+            mask &= self.magnitude[idx] >= magnitud_min
+        if magnitud_max is not None:
+            mask &= self.magnitude[idx] <= magnitud_max
+        return mask
+
+    def _chord2(self, idx: np.ndarray, lat: float, lon: float) -> np.ndarray:
+        """Cuadrado de la cuerda (esfera unitaria) entre el punto y cada candidato."""
+        lat_r, lon_r = math.radians(lat), math.radians(lon)
+        q = (math.cos(lat_r) * math.cos(lon_r), math.cos(lat_r) * math.sin(lon_r), math.sin(lat_r))
+        dx = self.xyz[0][idx] - q[0]
+        dy = self.xyz[1][idx] - q[1]
+        dz = self.xyz[2][idx] - q[2]
+        return dx * dx + dy * dy + dz * dz
+
+    def _lookup(self, event_id: Union[str, int]) -> int:
+        value = np.uint64(int(event_id, 16) if isinstance(event_id, str) else event_id)
+        j = np.searchsorted(self.ids_u64, value, sorter=self._id_order)
+        if j >= len(self._id_order) or self.ids_u64[self._id_order[j]] != value:
+            raise KeyError(f"Evento no indexado: {event_id}")
+        return int(self._id_order[j])
+
+
+def _to_epoch(value: TimeLike) -> int:
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[s]").astype(np.int64))
+
+
+def catalog_fingerprint(df: pd.DataFrame, cell_degrees: float = SPATIAL_INDEX_CELL_DEGREES) -> str:
+    """Huella del catálogo indexado: IDs en orden y tamaño de celda."""
+    h = hashlib.sha256(df["id_u64"].to_numpy(dtype=np.uint64).tobytes())
+    h.update(repr(cell_degrees).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def load_or_build(df: pd.DataFrame, path: Optional[str] = SPATIAL_INDEX_CACHE,
+                  cell_degrees: float = SPATIAL_INDEX_CELL_DEGREES) -> SpatialIndex:
+    """
+    Devuelve el índice guardado en path si corresponde al mismo catálogo; si no,
+    lo construye y lo guarda. Con path=None no se usa el disco.
+    """
+    fingerprint = catalog_fingerprint(df, cell_degrees)
+    if path and os.path.exists(path):
+        try:
+            index, stored = SpatialIndex.load(path)
+            if stored == fingerprint:
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  [WARN] Índice espacial inválido, se reconstruye: {e}")
+
+    index = SpatialIndex.from_dataframe(df, cell_degrees)
+    if path:
+        try:
+            index.save(path, fingerprint)
+        except OSError as e:
+            print(f"  [WARN] No se pudo guardar el índice espacial: {e}")
+    return index
@@ -14,10 +14,31 @@ import pandas as pd
 from exporters.config import STATS_OUT, EXPORTS_DIR
 
 
+MESES_NOMBRES = {
+    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
+    5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
+    9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+}
+
+# Cantidad de eventos destacados por magnitud
+TOP_DESTACADOS = 15
+
+
 def export(df: pd.DataFrame) -> None:
     """
     Genera data/exports/stats.json a partir del DataFrame recibido.
 
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    _write(compute_stats(df))
+    print(f"  [OK] Estadísticas exportadas -> {STATS_OUT}")
+
+
+def compute_stats(df: pd.DataFrame) -> dict:
+    """
+    Calcula las agregaciones de stats.json sobre el DataFrame recibido.
+
     Args:
         df: DataFrame producido por csv_exporter.load_sismos()
     """
@@ -49,12 +70,7 @@ def export(df: pd.DataFrame) -> None:
         .sort_index()
         .to_dict()
     )
-    meses_nombres = {
-        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
-        5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
-        9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-    }
-    por_mes_dict = {meses_nombres.get(k, str(k)): int(v) for k, v in por_mes_raw.items()}
+    por_mes_dict = {MESES_NOMBRES.get(k, str(k)): int(v) for k, v in por_mes_raw.items()}
 
     # 3. Distribución por rangos de magnitud
     mags = df_valid["magnitud"].dropna()
@@ -76,7 +92,7 @@ def export(df: pd.DataFrame) -> None:
     }
 
     # 5. Distribución por provincia normalizada (top)
-    por_provincia = (
+    por_provincia = _sorted_by_count(
         df_valid["provincia_normalizada"]
         .dropna()
         .value_counts()
@@ -84,7 +100,7 @@ def export(df: pd.DataFrame) -> None:
     )
 
     # 6. Distribución por país
-    por_pais = (
+    por_pais = _sorted_by_count(
         df_valid["pais"]
         .dropna()
         .value_counts()
@@ -99,22 +115,25 @@ def export(df: pd.DataFrame) -> None:
     }
 
     # 8. Eventos destacados de magnitud extrema (top 15)
-    top_mags = df_valid.sort_values(by="magnitud", ascending=False).head(15)
+    # Candidatos: todos los empatados con el último del top, para desempatar igual que merge_stats
+    top = df_valid["magnitud"].nlargest(TOP_DESTACADOS, keep="all")
+    candidatos = df_valid.loc[top.index] if len(top) >= TOP_DESTACADOS else df_valid
     destacados = []
-    for _, row in top_mags.iterrows():
+    for _, row in candidatos.iterrows():
         destacados.append({
             "id": str(row["id"]),
-            "fecha": row.get("fecha", None),
-            "hora": row.get("hora", None),
+            "fecha": _nullable(row.get("fecha")),
+            "hora": _nullable(row.get("hora")),
             "magnitud": float(row["magnitud"]) if pd.notna(row["magnitud"]) else None,
             "profundidad": float(row["profundidad"]) if pd.notna(row["profundidad"]) else None,
             "latitud": float(row["latitud"]) if pd.notna(row["latitud"]) else None,
             "longitud": float(row["longitud"]) if pd.notna(row["longitud"]) else None,
-            "ubicacion_normalizada": row.get("ubicacion_normalizada", None),
-            "provincia": row.get("provincia_normalizada", None),
-            "pais": row.get("pais", None),
-            "sentido": row.get("sentido", None),
+            "ubicacion_normalizada": _nullable(row.get("ubicacion_normalizada")),
+            "provincia": _nullable(row.get("provincia_normalizada")),
+            "pais": _nullable(row.get("pais")),
+            "sentido": _nullable(row.get("sentido")),
         })
+    destacados.sort(key=_destacado_key)
 
     stats = {
         "total_registros_analizados": len(df_valid),
@@ -125,11 +144,90 @@ def export(df: pd.DataFrame) -> None:
         "distribucion_provincia": por_provincia,
         "distribucion_pais": por_pais,
         "sismos_sentidos_vs_no": sentidos_dict,
-        "eventos_destacados_magnitud": destacados,
+        "eventos_destacados_magnitud": destacados[:TOP_DESTACADOS],
+    }
+    return stats
+
+
+def update(df_new: pd.DataFrame) -> None:
+    """
+    Actualiza data/exports/stats.json sumando solo los eventos nuevos.
+
+    Todos los contadores son aditivos, por lo que se calculan las estadísticas de
+    df_new y se suman a las ya publicadas; los destacados se recalculan sobre la
+    unión de los destacados previos y los eventos nuevos.
+
+    Args:
+        df_new: filas nuevas del DataFrame producido por csv_exporter.load_sismos()
+    """
+    with open(STATS_OUT, "r", encoding="utf-8") as f:
+        stats = json.load(f)
+
+    _write(merge_stats(stats, compute_stats(df_new)))
+    print(f"  [OK] Estadísticas actualizadas (+{len(df_new)} eventos) -> {STATS_OUT}")
+
+
+def merge_stats(old: dict, new: dict) -> dict:
+    """Combina dos resultados de compute_stats calculados sobre conjuntos disjuntos."""
+    meses_orden = {nombre: mes for mes, nombre in MESES_NOMBRES.items()}
+
+    destacados = sorted(old["eventos_destacados_magnitud"] + new["eventos_destacados_magnitud"], key=_destacado_key)
+
+    return {
+        "total_registros_analizados": old["total_registros_analizados"] + new["total_registros_analizados"],
+        "sismos_por_anio": dict(sorted(
+            _add_counts(old["sismos_por_anio"], new["sismos_por_anio"]).items(),
+            key=lambda kv: int(kv[0]),
+        )),
+        "sismos_por_mes": dict(sorted(
+            _add_counts(old["sismos_por_mes"], new["sismos_por_mes"]).items(),
+            key=lambda kv: meses_orden.get(kv[0], 13),
+        )),
+        "distribucion_magnitud": _add_counts(old["distribucion_magnitud"], new["distribucion_magnitud"]),
+        "distribucion_profundidad": _add_counts(old["distribucion_profundidad"], new["distribucion_profundidad"]),
+        "distribucion_provincia": _sorted_by_count(
+            _add_counts(old["distribucion_provincia"], new["distribucion_provincia"])
+        ),
+        "distribucion_pais": _sorted_by_count(_add_counts(old["distribucion_pais"], new["distribucion_pais"])),
+        "sismos_sentidos_vs_no": _add_counts(old["sismos_sentidos_vs_no"], new["sismos_sentidos_vs_no"]),
+        "eventos_destacados_magnitud": destacados[:TOP_DESTACADOS],
     }
 
+
+def _add_counts(a: dict, b: dict) -> dict:
+    """Suma dos diccionarios de conteos conservando el orden de claves de a."""
+    result = dict(a)
+    for key, value in b.items():
+        result[key] = result.get(key, 0) + value
+    return result
+
+
+def _sorted_by_count(counts: dict) -> dict:
+    """Ordena un diccionario de conteos de mayor a menor y, a igual conteo, por clave."""
+    return dict(sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+
+
+def _nullable(value):
+    """None para valores faltantes (NaN no es JSON válido)."""
+    return None if pd.isna(value) else value
+
+
+def _destacado_key(d: dict) -> tuple:
+    """
+    Orden total de los eventos destacados: magnitud descendente, luego el más
+    reciente primero y, a igual fecha y hora, por id. Los valores nulos van al final.
+    """
+    momento = pd.to_datetime(f"{d['fecha']} {d['hora']}", format="%d/%m/%Y %H:%M:%S", errors="coerce")
+    return (
+        d["magnitud"] is None,
+        -(d["magnitud"] or 0.0),
+        pd.isna(momento),
+        -momento.value if pd.notna(momento) else 0,
+        d["id"],
+    )
+
+
+def _write(stats: dict) -> None:
     os.makedirs(EXPORTS_DIR, exist_ok=True)
     with open(STATS_OUT, "w", encoding="utf-8") as f:
         json.dump(stats, f, ensure_ascii=False, indent=2)
-
-    print(f"  [OK] Estadísticas exportadas -> {STATS_OUT}")
@@ -0,0 +1,596 @@
+"""
+tiles_exporter.py
+
+Responsabilidad única: generar una pirámide de teselas vectoriales (Mapbox Vector
+Tiles) con todos los sismos y empaquetarla en un único archivo PMTiles v3
+(data/exports/sismos.pmtiles).
+
+El frontend (MapLibre GL JS + protocolo pmtiles://) solo descarga las teselas
+del viewport actual en lugar de los ~20 MB de sismos.geojson. En los zooms
+menores al máximo se aplica un raleo por magnitud: dentro de cada celda de
+TILES_THIN_CELL unidades de tesela se conserva solo el evento de mayor magnitud.
+
+Implementado en Python puro + numpy (codificación protobuf y PMTiles a mano),
+sin dependencias adicionales.
+
+El contenido de cada tesela depende solo de sus propios eventos (la tabla de
+valores de la capa sigue el orden de aparición dentro de la tesela), así que
+update() vuelve a codificar únicamente las teselas que contienen eventos
+nuevos o modificados y copia el resto, ya comprimido, del archivo anterior.
+El resultado es idéntico al de export() sobre el catálogo completo.
+
+No modifica sismos.csv, SQLite ni Supabase.
+"""
+import gzip
+import json
+import math
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from exporters.config import (
+    TILES_OUT,
+    EXPORTS_DIR,
+    TILES_MIN_ZOOM,
+    TILES_MAX_ZOOM,
+    TILES_THIN_CELL,
+)
+
+LAYER_NAME = "sismos"
+EXTENT = 4096
+MAX_LATITUDE = 85.05112878
+
+# Propiedades incluidas en cada feature: (propiedad, columna del DataFrame)
+TILE_PROPERTIES = [
+    ("id", "id"),
+    ("fecha", "fecha"),
+    ("hora", "hora"),
+    ("magnitud", "magnitud"),
+    ("profundidad", "profundidad"),
+    ("provincia", "provincia_normalizada"),
+    ("sentido", "sentido"),
+    ("cluster_id", "cluster_id"),
+]
+NUMERIC_PROPERTIES = {"magnitud", "profundidad", "cluster_id"}
+
+# Constantes del formato PMTiles v3
+PMTILES_HEADER_SIZE = 127
+PMTILES_ROOT_MAX_BYTES = 16384 - PMTILES_HEADER_SIZE
+COMPRESSION_GZIP = 2
+TILE_TYPE_MVT = 1
+
+
+def export(df: pd.DataFrame) -> None:
+    """
+    Genera data/exports/sismos.pmtiles a partir del DataFrame recibido.
+
+    Args:
+        df: DataFrame producido por csv_exporter.load_sismos()
+    """
+    df_geo = _mappable(df)
+    tiles = build_tiles(df_geo, TILES_MIN_ZOOM, TILES_MAX_ZOOM)
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    size = write_pmtiles(TILES_OUT, tiles, TILES_MIN_ZOOM, TILES_MAX_ZOOM, _bounds(df_geo), _metadata())
+    print(f"  [OK] PMTiles exportado: {len(tiles)} teselas, {len(df_geo)} eventos, "
+          f"{size / 1e6:.1f} MB -> {TILES_OUT}")
+
+
+def update(df: pd.DataFrame, changed: np.ndarray) -> None:
+    """
+    Regenera en data/exports/sismos.pmtiles solo las teselas que contienen
+    eventos nuevos o modificados; el resto se copia del archivo existente.
+
+    Args:
+        df: DataFrame completo producido por csv_exporter.load_sismos()
+        changed: máscara booleana sobre las filas de df (eventos nuevos y
+            eventos cuyas propiedades cambiaron, por ejemplo su cluster_id).
+    """
+    mappable = _mappable_mask(df)
+    df_geo = df[mappable]
+    tiles = build_tiles(df_geo, TILES_MIN_ZOOM, TILES_MAX_ZOOM, changed=np.asarray(changed)[mappable])
+
+    blobs = read_archive(TILES_OUT)
+    blobs.update(_compress_tiles(tiles))
+    size = _write_archive(TILES_OUT, blobs, TILES_MIN_ZOOM, TILES_MAX_ZOOM, _bounds(df_geo), _metadata())
+    print(f"  [OK] PMTiles actualizado: {len(tiles)} de {len(blobs)} teselas regeneradas, "
+          f"{size / 1e6:.1f} MB -> {TILES_OUT}")
+
+
+def _mappable_mask(df: pd.DataFrame) -> np.ndarray:
+    """Filas con coordenadas presentes y dentro de rango (los errores de carga no tienen tesela)."""
+    return (df["latitud"].between(-90, 90) & df["longitud"].between(-180, 180)).to_numpy()
+
+
+def _mappable(df: pd.DataFrame) -> pd.DataFrame:
+    return df[_mappable_mask(df)]
+
+
+def _bounds(df_geo: pd.DataFrame) -> Tuple[float, float, float, float]:
+    lons = df_geo["longitud"].to_numpy(dtype="float64")
+    lats = df_geo["latitud"].to_numpy(dtype="float64")
+    if not len(df_geo):
+        return (-180.0, -85.0, 180.0, 85.0)
+    return (float(lons.min()), float(lats.min()), float(lons.max()), float(lats.max()))
+
+
+def build_tiles(df_geo: pd.DataFrame, min_zoom: int, max_zoom: int,
+                changed: Optional[np.ndarray] = None) -> Dict[int, bytes]:
+    """
+    Construye las teselas MVT (sin comprimir) de la pirámide.
+
+    Args:
+        changed: máscara booleana sobre las filas de df_geo; si se indica, solo se
+            construyen las teselas que contienen alguna de esas filas.
+
+    Returns:
+        Diccionario {tile_id PMTiles: contenido MVT}.
+    """
+    x, y = lonlat_to_mercator(df_geo["longitud"].to_numpy(dtype="float64"),
+                              df_geo["latitud"].to_numpy(dtype="float64"))
+    magnitudes = df_geo["magnitud"].to_numpy(dtype="float64", na_value=np.nan)
+    rank = np.where(np.isnan(magnitudes), -np.inf, magnitudes)
+    feature_ids = df_geo["id_u64"].to_numpy(dtype=np.uint64)
+
+    # Primera pasada: eventos de cada tesela a construir, por zoom
+    groups = []
+    for z in range(min_zoom, max_zoom + 1):
+        scale = (1 << z) * EXTENT
+        gx = np.minimum((x * scale).astype(np.int64), scale - 1)
+        gy = np.minimum((y * scale).astype(np.int64), scale - 1)
+
+        keep = np.arange(len(gx))
+        if z < max_zoom:
+            keep = _thin_by_magnitude(gx, gy, rank, TILES_THIN_CELL)
+
+        tile_ids = zxy_to_tileid(z, gx[keep] // EXTENT, gy[keep] // EXTENT)
+        if changed is not None:
+            touched = np.unique(zxy_to_tileid(z, gx[changed] // EXTENT, gy[changed] // EXTENT))
+            selected = np.isin(tile_ids, touched)
+            keep, tile_ids = keep[selected], tile_ids[selected]
+        if not len(keep):
+            continue
+        # Dentro de cada tesela, los eventos mayores se dibujan al final (encima)
+        order = np.lexsort((rank[keep], tile_ids))
+        keep, tile_ids = keep[order], tile_ids[order]
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(tile_ids)) + 1))
+        for tile_id, rows in zip(tile_ids[starts].tolist(), np.split(keep, starts[1:])):
+            groups.append((tile_id, gx[rows] % EXTENT, gy[rows] % EXTENT, rows))
+
+    # Las propiedades solo se codifican para los eventos que aparecen en alguna tesela
+    used = np.unique(np.concatenate([rows for _, _, _, rows in groups])) if groups else np.array([], np.int64)
+    position = np.full(len(df_geo), -1, dtype=np.int64)
+    position[used] = np.arange(len(used))
+    codes, encoded_values = _property_tables(df_geo.iloc[used])
+
+    tiles = {}
+    for tile_id, px, py, rows in groups:
+        local = position[rows]
+        tiles[tile_id] = encode_tile(px, py, feature_ids[rows], [column[local] for column in codes], encoded_values)
+    return tiles
+
+
+def lonlat_to_mercator(lon: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Proyecta lon/lat (EPSG:4326) a coordenadas Web Mercator normalizadas en [0, 1)."""
+    lat = np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE)
+    x = (lon + 180.0) / 360.0
+    lat_rad = np.radians(lat)
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0
+    return np.clip(x, 0.0, 1.0), np.clip(y, 0.0, 1.0)
+
+
+def zxy_to_tileid(z: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """ID de tesela PMTiles (curva de Hilbert por zoom) para arrays de coordenadas x, y."""
+    x = np.asarray(x, dtype=np.int64).copy()
+    y = np.asarray(y, dtype=np.int64).copy()
+    n = 1 << z
+    d = np.zeros(len(x), dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotación del cuadrante (ver algoritmo xy2d de la curva de Hilbert)
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return d + ((1 << (2 * z)) - 1) // 3
+
+
+def encode_tile(px: np.ndarray, py: np.ndarray, feature_ids: np.ndarray,
+                codes: List[np.ndarray], encoded_values: List[List[bytes]]) -> bytes:
+    """
+    Codifica una tesela MVT con una única capa de puntos.
+
+    Todo el mensaje de cada feature es una secuencia de varints (claves de campo,
+    longitudes, tags y geometría), así que se arma como una matriz de enteros y
+    se codifica de una sola vez con numpy.
+
+    Args:
+        px, py: coordenadas de los puntos dentro de la tesela (0..EXTENT-1).
+        feature_ids: IDs uint64 de cada feature.
+        codes: por cada propiedad de TILE_PROPERTIES, el código de valor de cada
+            feature en la tabla global (-1 si falta).
+        encoded_values: por cada propiedad, los mensajes Value ya codificados
+            (envueltos como campo 4 de la capa) indexados por código.
+    """
+    n = len(px)
+    n_props = len(codes)
+
+    # Tabla de valores local: solo los valores usados en esta tesela, en orden de
+    # aparición (así la tesela no depende de la numeración global de los códigos)
+    tags = np.zeros((n, 2 * n_props), dtype=np.uint64)
+    tag_mask = np.zeros((n, 2 * n_props), dtype=bool)
+    values = []
+    offset = 0
+    for key_index, column in enumerate(codes):
+        valid = column >= 0
+        uniques, first, local = np.unique(column[valid], return_index=True, return_inverse=True)
+        appearance = np.argsort(first)
+        uniques = uniques[appearance]
+        local = np.argsort(appearance)[local]
+        tags[:, 2 * key_index] = key_index
+        tags[valid, 2 * key_index + 1] = local + offset
+        tag_mask[:, 2 * key_index] = valid
+        tag_mask[:, 2 * key_index + 1] = valid
+        table = encoded_values[key_index]
+        values.extend(table[code] for code in uniques.tolist())
+        offset += len(uniques)
+
+    zx = px.astype(np.uint64) << np.uint64(1)
+    zy = py.astype(np.uint64) << np.uint64(1)
+    geometry_length = 1 + _varint_lengths(zx) + _varint_lengths(zy)
+    tags_length = (_varint_lengths(tags) * tag_mask).sum(axis=1, dtype=np.uint64)
+    feature_length = (
+        1 + _varint_lengths(feature_ids)
+        + 1 + _varint_lengths(tags_length) + tags_length
+        + 2
+        + 2 + geometry_length
+    )
+
+    ones = np.ones(n, dtype=np.uint64)
+    head = np.column_stack([
+        ones * 0x12, feature_length,           # Layer.features (campo 2)
+        ones * 0x08, feature_ids,              # Feature.id (campo 1)
+        ones * 0x12, tags_length,              # Feature.tags (campo 2, packed)
+    ])
+    tail = np.column_stack([
+        ones * 0x18, ones,                     # Feature.type = POINT (campo 3)
+        ones * 0x22, geometry_length,          # Feature.geometry (campo 4, packed)
+        ones * 9, zx, zy,                      # MoveTo(1) + punto
+    ])
+    tokens = np.concatenate([head, tags, tail], axis=1)
+    mask = np.concatenate([np.ones(head.shape, bool), tag_mask, np.ones(tail.shape, bool)], axis=1)
+
+    layer = (
+        _field_varint(15, 2)
+        + _field_bytes(1, LAYER_NAME.encode("utf-8"))
+        + _encode_varints(tokens[mask])
+        + _ENCODED_KEYS
+        + b"".join(values)
+        + _field_varint(5, EXTENT)
+    )
+    return _field_bytes(3, layer)
+
+
+def write_pmtiles(path: str, tiles: Dict[int, bytes], min_zoom: int, max_zoom: int,
+                  bounds: Tuple[float, float, float, float], metadata: dict) -> int:
+    """
+    Escribe un archivo PMTiles v3 con las teselas recibidas (comprimidas con gzip).
+
+    Returns:
+        Tamaño del archivo en bytes.
+    """
+    return _write_archive(path, _compress_tiles(tiles), min_zoom, max_zoom, bounds, metadata)
+
+
+def read_archive(path: str) -> Dict[int, bytes]:
+    """Teselas (comprimidas, tal como están en el archivo) de un PMTiles generado por este módulo."""
+    with open(path, "rb") as f:
+        content = f.read()
+    if content[:7] != b"PMTiles" or content[7] != 3:
+        raise ValueError(f"{path} no es un archivo PMTiles v3")
+    fields = struct.unpack("<QQQQQQQQ", content[8:72])
+    root_offset, root_length, _, _, leaves_offset, _, data_offset, _ = fields
+
+    entries = _deserialize_directory(gzip.decompress(content[root_offset:root_offset + root_length]))
+    blobs = {}
+    # Las entradas de los directorios hoja se agregan a la misma lista que se recorre
+    for tile_id, offset, length, run_length in entries:
+        if run_length == 0:
+            start = leaves_offset + offset
+            leaf = _deserialize_directory(gzip.decompress(content[start:start + length]))
+            entries.extend(leaf)
+            continue
+        for i in range(run_length):
+            blobs[tile_id + i] = content[data_offset + offset:data_offset + offset + length]
+    return blobs
+
+
+def _compress_tiles(tiles: Dict[int, bytes]) -> Dict[int, bytes]:
+    return {tile_id: gzip.compress(tile, compresslevel=6, mtime=0) for tile_id, tile in tiles.items()}
+
+
+def _write_archive(path: str, blobs: Dict[int, bytes], min_zoom: int, max_zoom: int,
+                   bounds: Tuple[float, float, float, float], metadata: dict) -> int:
+    """Escribe el archivo PMTiles a partir de las teselas ya comprimidas."""
+    entries = []
+    data = []
+    offset = 0
+    for tile_id in sorted(blobs):
+        blob = blobs[tile_id]
+        entries.append((tile_id, offset, len(blob), 1))
+        data.append(blob)
+        offset += len(blob)
+
+    root, leaves = _build_directories(entries)
+    metadata_bytes = gzip.compress(json.dumps(metadata, ensure_ascii=False).encode("utf-8"), mtime=0)
+
+    root_offset = PMTILES_HEADER_SIZE
+    metadata_offset = root_offset + len(root)
+    leaves_offset = metadata_offset + len(metadata_bytes)
+    data_offset = leaves_offset + len(leaves)
+
+    west, south, east, north = bounds
+    header = b"PMTiles" + struct.pack(
+        "<BQQQQQQQQQQQBBBBBBiiiiBii",
+        3,
+        root_offset, len(root),
+        metadata_offset, len(metadata_bytes),
+        leaves_offset, len(leaves),
+        data_offset, offset,
+        len(entries), len(entries), len(entries),
+        1,  # clustered: datos ordenados por tile_id
+        COMPRESSION_GZIP,
+        COMPRESSION_GZIP,
+        TILE_TYPE_MVT,
+        min_zoom, max_zoom,
+        int(west * 1e7), int(south * 1e7), int(east * 1e7), int(north * 1e7),
+        min_zoom,
+        int((west + east) / 2 * 1e7), int((south + north) / 2 * 1e7),
+    )
+    assert len(header) == PMTILES_HEADER_SIZE
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(root)
+        f.write(metadata_bytes)
+        f.write(leaves)
+        for blob in data:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return data_offset + offset
+
+
+def read_tile(path: str, z: int, x: int, y: int) -> Optional[bytes]:
+    """
+    Lee una tesela (MVT descomprimido) de un archivo PMTiles generado por este módulo.
+    Útil para depuración y tests.
+    """
+    tile_id = int(zxy_to_tileid(z, np.array([x]), np.array([y]))[0])
+    with open(path, "rb") as f:
+        header = f.read(PMTILES_HEADER_SIZE)
+        fields = struct.unpack("<BQQQQQQQQQQQ", header[7:96])
+        root_offset, root_length = fields[1], fields[2]
+        leaves_offset, data_offset = fields[5], fields[7]
+
+        dir_offset, dir_length = root_offset, root_length
+        for _ in range(4):
+            f.seek(dir_offset)
+            entries = _deserialize_directory(gzip.decompress(f.read(dir_length)))
+            entry = _find_entry(entries, tile_id)
+            if entry is None:
+                return None
+            _, offset, length, run_length = entry
+            if run_length > 0:
+                f.seek(data_offset + offset)
+                return gzip.decompress(f.read(length))
+            dir_offset, dir_length = leaves_offset + offset, length
+    return None
+
+
+def _thin_by_magnitude(gx: np.ndarray, gy: np.ndarray, rank: np.ndarray, cell: int) -> np.ndarray:
+    """Índices del evento de mayor magnitud en cada celda de cell x cell unidades."""
+    cx = gx // cell
+    cy = gy // cell
+    order = np.lexsort((-rank, cy, cx))
+    cx, cy = cx[order], cy[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1])
+    return np.sort(order[first])
+
+
+def _property_tables(df: pd.DataFrame) -> Tuple[List[np.ndarray], List[List[bytes]]]:
+    """
+    Factoriza cada propiedad una sola vez para todo el catálogo.
+
+    Returns:
+        (códigos por propiedad con -1 para nulos,
+         mensajes Value codificados por propiedad e indexados por código)
+    """
+    codes = []
+    encoded_values = []
+    for name, column in TILE_PROPERTIES:
+        if column not in df.columns:
+            codes.append(np.full(len(df), -1, dtype=np.int64))
+            encoded_values.append([])
+            continue
+        column_codes, uniques = pd.factorize(df[column])
+        codes.append(column_codes.astype(np.int64))
+        numeric = name in NUMERIC_PROPERTIES
+        encoded_values.append([
+            _field_bytes(4, _encode_value(float(value) if numeric else str(value)))
+            for value in uniques.tolist()
+        ])
+    return codes, encoded_values
+
+
+def _metadata() -> dict:
+    fields = {
+        name: "Number" if name in NUMERIC_PROPERTIES else "String"
+        for name, _ in TILE_PROPERTIES
+    }
+    return {
+        "name": "sismos",
+        "description": "Sismos registrados por el INPRES (Mapbox Vector Tiles)",
+        "attribution": "INPRES — Instituto Nacional de Prevención Sísmica de Argentina",
+        "type": "overlay",
+        "format": "pbf",
+        "minzoom": TILES_MIN_ZOOM,
+        "maxzoom": TILES_MAX_ZOOM,
+        "vector_layers": [{
+            "id": LAYER_NAME,
+            "fields": fields,
+            "minzoom": TILES_MIN_ZOOM,
+            "maxzoom": TILES_MAX_ZOOM,
+        }],
+    }
+
+
+def _build_directories(entries: List[Tuple[int, int, int, int]]) -> Tuple[bytes, bytes]:
+    """
+    Serializa el directorio raíz (y directorios hoja si hace falta) de PMTiles.
+    El raíz debe entrar en los primeros 16 KB del archivo junto con el header.
+    """
+    root = gzip.compress(_serialize_directory(entries), mtime=0)
+    if len(root) <= PMTILES_ROOT_MAX_BYTES:
+        return root, b""
+
+    leaf_size = 4096
+    while True:
+        root_entries = []
+        leaves = []
+        offset = 0
+        for start in range(0, len(entries), leaf_size):
+            chunk = entries[start:start + leaf_size]
+            leaf = gzip.compress(_serialize_directory(chunk), mtime=0)
+            root_entries.append((chunk[0][0], offset, len(leaf), 0))
+            leaves.append(leaf)
+            offset += len(leaf)
+        root = gzip.compress(_serialize_directory(root_entries), mtime=0)
+        if len(root) <= PMTILES_ROOT_MAX_BYTES:
+            return root, b"".join(leaves)
+        leaf_size *= 2
+
+
+def _serialize_directory(entries: List[Tuple[int, int, int, int]]) -> bytes:
+    """Codificación columnar de directorios PMTiles v3 (varints con deltas)."""
+    out = bytearray(_varint(len(entries)))
+    last_id = 0
+    for tile_id, _, _, _ in entries:
+        out += _varint(tile_id - last_id)
+        last_id = tile_id
+    for _, _, _, run_length in entries:
+        out += _varint(run_length)
+    for _, _, length, _ in entries:
+        out += _varint(length)
+    for i, (_, offset, _, _) in enumerate(entries):
+        if i > 0 and offset == entries[i - 1][1] + entries[i - 1][2]:
+            out += _varint(0)
+        else:
+            out += _varint(offset + 1)
+    return bytes(out)
+
+
+def _deserialize_directory(buf: bytes) -> List[Tuple[int, int, int, int]]:
+    pos = 0
+
+    def read():
+        nonlocal pos
+        value, shift = 0, 0
+        while True:
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    n = read()
+    tile_ids, last = [], 0
+    for _ in range(n):
+        last += read()
+        tile_ids.append(last)
+    run_lengths = [read() for _ in range(n)]
+    lengths = [read() for _ in range(n)]
+    offsets = []
+    for i in range(n):
+        value = read()
+        offsets.append(offsets[i - 1] + lengths[i - 1] if value == 0 and i > 0 else value - 1)
+    return list(zip(tile_ids, offsets, lengths, run_lengths))
+
+
+def _find_entry(entries, tile_id):
+    """Entrada que contiene tile_id (o el directorio hoja que podría contenerla)."""
+    lo, hi = 0, len(entries) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if entries[mid][0] < tile_id:
+            lo = mid + 1
+        elif entries[mid][0] > tile_id:
+            hi = mid - 1
+        else:
+            return entries[mid]
+    if hi >= 0:
+        entry = entries[hi]
+        if entry[3] == 0 or tile_id - entry[0] < entry[3]:
+            return entry
+    return None
+
+
+def _encode_value(value) -> bytes:
+    """Mensaje Value de MVT: double para números, string para el resto."""
+    if isinstance(value, float):
+        return b"\x19" + struct.pack("<d", value)  # campo 3 (double_value), wire type 1
+    return _field_bytes(1, str(value).encode("utf-8"))
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _varint_lengths(values: np.ndarray) -> np.ndarray:
+    """Cantidad de bytes del varint de cada valor (uint64)."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(values.shape, dtype=np.uint64)
+    for shift in range(7, 64, 7):
+        lengths += (values >= (np.uint64(1) << np.uint64(shift))).astype(np.uint64)
+    return lengths
+
+
+def _encode_varints(values: np.ndarray) -> bytes:
+    """Codifica un array de enteros no negativos como varints concatenados."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = _varint_lengths(values)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    for byte in range(int(lengths.max()) if len(lengths) else 0):
+        active = lengths > byte
+        chunk = (values[active] >> np.uint64(7 * byte)) & np.uint64(0x7F)
+        more = lengths[active] > byte + 1
+        out[starts[active] + byte] = (chunk | (more.astype(np.uint64) << np.uint64(7))).astype(np.uint8)
+    return out.tobytes()
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _field_bytes(field: int, payload: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(payload)) + payload
+
+
+_ENCODED_KEYS = b"".join(_field_bytes(3, name.encode("utf-8")) for name, _ in TILE_PROPERTIES)
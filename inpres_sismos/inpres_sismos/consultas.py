@@ -0,0 +1,358 @@
+"""
+consultas.py
+
+API de lectura sobre data/sismos.db (generada por db_scripts/actualizar_database.py).
+
+Los filtros (FiltroSismos) se compilan a consultas SQLite parametrizadas que
+aprovechan los índices de la base:
+- bbox y radio: índice espacial sismos_rtree (el radio se acota primero con su
+  bbox y luego se filtra por distancia exacta). Si la caja contiene más de
+  UMBRAL_RTREE eventos, conviene más recorrer los índices por fecha o magnitud
+  y descartar por coordenadas, así que el R*Tree solo se usa para cajas
+  selectivas;
+- ventana de tiempo: idx_sismos_fecha;
+- magnitud: idx_sismos_magnitud_fecha;
+- provincia: idx_sismos_provincia_normalizada.
+
+Los resultados se ordenan del más reciente al más antiguo y se paginan por
+clave (fecha, hora, id), así cada página cuesta lo mismo sin importar cuán
+lejos esté del inicio. Las páginas y conteos consultados se guardan en una
+caché LRU acotada que se invalida sola cuando la base cambia.
+
+Uso:
+    from inpres_sismos.consultas import ConsultasSismos, FiltroSismos
+
+    with ConsultasSismos() as consultas:
+        filtro = FiltroSismos(bbox=(-70, -33, -67, -30), magnitud_min=4, desde="2021-01-01")
+        pagina = consultas.buscar(filtro, limite=50)
+        while pagina.siguiente is not None:
+            pagina = consultas.buscar(filtro, limite=50, despues=pagina.siguiente)
+
+Solo lee sismos.db; no modifica el CSV, SQLite ni Supabase.
+"""
+import math
+import os
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'sismos.db'))
+
+# Tamaño por defecto de la caché LRU (páginas y conteos)
+CACHE_SIZE = 256
+
+# Filas que se traen de SQLite por vez al iterar
+FETCH_SIZE = 1000
+
+# Máximo de eventos en la caja de búsqueda para usar el R*Tree
+UMBRAL_RTREE = 2000
+
+RADIO_TIERRA_KM = 6371.0
+KM_POR_GRADO = math.pi * RADIO_TIERRA_KM / 180.0
+
+COLUMNAS = [
+    'id', 'fecha', 'hora', 'latitud', 'longitud', 'profundidad', 'magnitud',
+    'provincia', 'sentido', 'provincia_normalizada',
+]
+
+ORDEN_SQL = "s.fecha DESC, s.hora DESC, s.id DESC"
+
+
+class Sismo(NamedTuple):
+    """Un evento de la tabla sismos (fecha YYYY-MM-DD, profundidad como texto, p. ej. "10 Km")."""
+    id: int
+    fecha: str
+    hora: str
+    latitud: Optional[float]
+    longitud: Optional[float]
+    profundidad: Optional[str]
+    magnitud: Optional[float]
+    provincia: Optional[str]
+    sentido: Optional[int]
+    provincia_normalizada: Optional[str]
+
+
+# Posición de un evento en el orden de los resultados: (fecha, hora, id)
+Cursor = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class FiltroSismos:
+    """
+    Filtro de eventos. Los campos en None no filtran.
+
+    Attributes:
+        bbox: (oeste, sur, este, norte) en grados.
+        centro: (latitud, longitud) del centro de búsqueda; requiere radio_km.
+        radio_km: distancia máxima al centro, en km.
+        desde / hasta: fechas YYYY-MM-DD (ambas incluidas).
+        magnitud_min / magnitud_max: rango de magnitud (incluido).
+        profundidad_min / profundidad_max: rango de profundidad en km (incluido).
+        provincia: provincia normalizada, p. ej. "San Juan".
+        sentido: True solo sismos sentidos, False solo no sentidos.
+    """
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    centro: Optional[Tuple[float, float]] = None
+    radio_km: Optional[float] = None
+    desde: Optional[str] = None
+    hasta: Optional[str] = None
+    magnitud_min: Optional[float] = None
+    magnitud_max: Optional[float] = None
+    profundidad_min: Optional[float] = None
+    profundidad_max: Optional[float] = None
+    provincia: Optional[str] = None
+    sentido: Optional[bool] = None
+
+    def __post_init__(self):
+        if (self.centro is None) != (self.radio_km is None):
+            raise ValueError("centro y radio_km deben indicarse juntos")
+        if self.radio_km is not None and self.radio_km <= 0:
+            raise ValueError(f"radio_km debe ser positivo: {self.radio_km}")
+        if self.bbox is not None:
+            oeste, sur, este, norte = self.bbox
+            if oeste > este or sur > norte:
+                raise ValueError(f"bbox inválido (oeste, sur, este, norte): {self.bbox}")
+        for minimo, maximo, nombre in [
+            (self.desde, self.hasta, "desde/hasta"),
+            (self.magnitud_min, self.magnitud_max, "magnitud"),
+            (self.profundidad_min, self.profundidad_max, "profundidad"),
+        ]:
+            if minimo is not None and maximo is not None and minimo > maximo:
+                raise ValueError(f"Rango {nombre} vacío: {minimo} > {maximo}")
+
+
+@dataclass(frozen=True)
+class Pagina:
+    """Una página de resultados y el cursor para pedir la siguiente (None si es la última)."""
+    sismos: Tuple[Sismo, ...]
+    siguiente: Optional[Cursor]
+
+
+def compilar(filtro: FiltroSismos, usar_rtree: bool = True) -> Tuple[str, List[Any]]:
+    """
+    Traduce un filtro a la cláusula FROM/WHERE de una consulta parametrizada.
+
+    Args:
+        filtro: condiciones de búsqueda.
+        usar_rtree: si False, bbox y radio se filtran por coordenadas sobre la tabla.
+
+    Returns:
+        (sql desde "FROM ...", parámetros). Las columnas de sismos se acceden con el alias s.
+    """
+    condiciones = []
+    params: List[Any] = []
+    desde_sql = "FROM sismos s"
+
+    espacial = _bbox_de_busqueda(filtro)
+    if espacial is not None:
+        oeste, sur, este, norte = espacial
+        if usar_rtree:
+            desde_sql = "FROM sismos_rtree r JOIN sismos s ON s.id = r.id"
+            condiciones.append("r.max_lon >= ? AND r.min_lon <= ? AND r.max_lat >= ? AND r.min_lat <= ?")
+            params += [oeste, este, sur, norte]
+            if filtro.bbox is not None:
+                # El R*Tree guarda float32 redondeado hacia afuera: corte exacto sobre la tabla
+                condiciones.append("s.longitud BETWEEN ? AND ? AND s.latitud BETWEEN ? AND ?")
+                params += [filtro.bbox[0], filtro.bbox[2], filtro.bbox[1], filtro.bbox[3]]
+        else:
+            condiciones.append("s.longitud BETWEEN ? AND ? AND s.latitud BETWEEN ? AND ?")
+            params += [oeste, este, sur, norte]
+
+    if filtro.centro is not None:
+        condiciones.append("distancia_km(s.latitud, s.longitud, ?, ?) <= ?")
+        params += [filtro.centro[0], filtro.centro[1], filtro.radio_km]
+
+    rangos = [
+        ("s.fecha", filtro.desde, filtro.hasta),
+        ("s.magnitud", filtro.magnitud_min, filtro.magnitud_max),
+        # "125 Km" -> 125.0
+        ("CAST(s.profundidad AS REAL)", filtro.profundidad_min, filtro.profundidad_max),
+    ]
+    for columna, minimo, maximo in rangos:
+        if minimo is not None:
+            condiciones.append(f"{columna} >= ?")
+            params.append(minimo)
+        if maximo is not None:
+            condiciones.append(f"{columna} <= ?")
+            params.append(maximo)
+
+    if filtro.provincia is not None:
+        condiciones.append("s.provincia_normalizada = ?")
+        params.append(filtro.provincia)
+    if filtro.sentido is not None:
+        condiciones.append("s.sentido = ?")
+        params.append(int(filtro.sentido))
+
+    where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return desde_sql + where, params
+
+
+def distancia_km(lat1: Optional[float], lon1: Optional[float], lat2: float, lon2: float) -> Optional[float]:
+    """Distancia de haversine en km (None si falta alguna coordenada)."""
+    if lat1 is None or lon1 is None:
+        return None
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class ConsultasSismos:
+    """
+    Conexión de solo lectura a sismos.db con caché LRU de resultados.
+
+    Args:
+        db_path: ruta a la base; por defecto data/sismos.db.
+        cache_size: cantidad máxima de resultados (páginas o conteos) en caché; 0 la desactiva.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, cache_size: int = CACHE_SIZE):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No se encontró la base de datos: {db_path}")
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.conn.create_function("distancia_km", 4, distancia_km, deterministic=True)
+        self.cache = _CacheLRU(cache_size)
+
+    def buscar(self, filtro: FiltroSismos, limite: int = 100, despues: Optional[Cursor] = None) -> Pagina:
+        """
+        Devuelve hasta limite eventos, del más reciente al más antiguo.
+
+        Args:
+            filtro: condiciones de búsqueda.
+            limite: tamaño de la página.
+            despues: cursor devuelto por la página anterior.
+        """
+        if limite <= 0:
+            raise ValueError(f"limite debe ser positivo: {limite}")
+        clave = ("buscar", filtro, limite, despues, self._data_version())
+        pagina = self.cache.get(clave)
+        if pagina is None:
+            sql, params = self._select(filtro, despues)
+            # Se pide una fila de más para saber si hay otra página
+            filas = self.conn.execute(f"{sql} LIMIT ?", params + [limite + 1]).fetchall()
+            sismos = tuple(Sismo(*fila) for fila in filas[:limite])
+            siguiente = _cursor(sismos[-1]) if len(filas) > limite else None
+            pagina = Pagina(sismos, siguiente)
+            self.cache.put(clave, pagina)
+        return pagina
+
+    def iterar(self, filtro: FiltroSismos, tamano_lote: int = FETCH_SIZE) -> Iterator[Sismo]:
+        """
+        Recorre todos los eventos que cumplen el filtro sin cargarlos en memoria
+        (no usa la caché). Útil para exportar o agregar resultados grandes.
+        """
+        sql, params = self._select(filtro, None)
+        cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                for fila in filas:
+                    yield Sismo(*fila)
+        finally:
+            cursor.close()
+
+    def contar(self, filtro: FiltroSismos) -> int:
+        """Cantidad de eventos que cumplen el filtro."""
+        clave = ("contar", filtro, self._data_version())
+        total = self.cache.get(clave)
+        if total is None:
+            desde_sql, params = compilar(filtro, self._usar_rtree(filtro))
+            total = self.conn.execute(f"SELECT COUNT(*) {desde_sql}", params).fetchone()[0]
+            self.cache.put(clave, total)
+        return total
+
+    def cerrar(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ConsultasSismos":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    def _select(self, filtro: FiltroSismos, despues: Optional[Cursor]) -> Tuple[str, List[Any]]:
+        desde_sql, params = compilar(filtro, self._usar_rtree(filtro))
+        columnas = ", ".join(f"s.{c}" for c in COLUMNAS)
+        if despues is not None:
+            # Paginación por clave: (fecha, hora, id) estrictamente anterior al cursor
+            desde_sql += " AND " if " WHERE " in desde_sql else " WHERE "
+            desde_sql += "(s.fecha, s.hora, s.id) < (?, ?, ?)"
+            params = params + list(despues)
+        return f"SELECT {columnas} {desde_sql} ORDER BY {ORDEN_SQL}", params
+
+    def _usar_rtree(self, filtro: FiltroSismos) -> bool:
+        """True si la caja de búsqueda tiene a lo sumo UMBRAL_RTREE eventos."""
+        espacial = _bbox_de_busqueda(filtro)
+        if espacial is None:
+            return False
+        clave = ("rtree", espacial, self._data_version())
+        usar = self.cache.get(clave)
+        if usar is None:
+            oeste, sur, este, norte = espacial
+            candidatos = self.conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM sismos_rtree"
+                " WHERE max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ? LIMIT ?)",
+                [oeste, este, sur, norte, UMBRAL_RTREE + 1],
+            ).fetchone()[0]
+            usar = candidatos <= UMBRAL_RTREE
+            self.cache.put(clave, usar)
+        return usar
+
+    def _data_version(self) -> int:
+        # Cambia cuando otra conexión (p. ej. actualizar_database.py) modifica la base
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+class _CacheLRU:
+    """Caché LRU acotada por cantidad de entradas."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: Hashable) -> Any:
+        if clave in self._items:
+            self._items.move_to_end(clave)
+            self.hits += 1
+            return self._items[clave]
+        self.misses += 1
+        return None
+
+    def put(self, clave: Hashable, valor: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._items[clave] = valor
+        self._items.move_to_end(clave)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _bbox_de_busqueda(filtro: FiltroSismos) -> Optional[Tuple[float, float, float, float]]:
+    """bbox (oeste, sur, este, norte) a buscar en el R*Tree: la intersección de bbox y el radio."""
+    cajas = []
+    if filtro.bbox is not None:
+        cajas.append(filtro.bbox)
+    if filtro.centro is not None:
+        lat, lon = filtro.centro
+        dlat = filtro.radio_km / KM_POR_GRADO
+        dlon = filtro.radio_km / (KM_POR_GRADO * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6))
+        cajas.append((lon - dlon, lat - dlat, lon + dlon, lat + dlat))
+    if not cajas:
+        return None
+    return (
+        max(c[0] for c in cajas), max(c[1] for c in cajas),
+        min(c[2] for c in cajas), min(c[3] for c in cajas),
+    )
+
+
+def _cursor(sismo: Sismo) -> Cursor:
+    return (sismo.fecha, sismo.hora, sismo.id)
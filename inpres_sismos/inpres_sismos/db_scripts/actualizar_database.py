@@ -2,139 +2,319 @@
 Actualizar Database SQLite - Sincronización desde CSV
 Lee sismos.csv y actualiza la base de datos SQLite sismos.db
 Compatible con estructura: inpres_sismos/inpres_sismos/db_scripts/
+
+Solo se consideran las filas del CSV con (fecha, hora) mayor o igual a la
+marca de agua de la base (el (fecha, hora) más reciente ya cargado). Se
+insertan con un único executemany de INSERT OR IGNORE dentro de una
+transacción; idx_sismos_unique descarta los duplicados.
+
+Además de la tabla sismos, la base mantiene:
+- sismos_rtree: índice espacial R*Tree de los epicentros, sincronizado con
+  sismos mediante triggers.
+- índices por fecha, por (magnitud, fecha) y por provincia normalizada
+  (columna provincia_normalizada, calculada con exporters/location_normalizer).
+
+Consulta típica "eventos en un bbox, M >= 4, últimos 5 años" (el R*Tree guarda
+coordenadas float32 redondeadas hacia afuera; para un corte exacto se filtra
+también sobre sismos.latitud / sismos.longitud):
+
+    SELECT s.* FROM sismos_rtree r JOIN sismos s ON s.id = r.id
+    WHERE r.min_lon >= :oeste AND r.max_lon <= :este
+      AND r.min_lat >= :sur AND r.max_lat <= :norte
+      AND s.magnitud >= 4 AND s.fecha >= date('now', '-5 years')
 """
 import pandas as pd
 import sqlite3
 import os
 import sys
+import time
+from typing import Optional, Tuple
 
 # Obtener ruta absoluta con múltiples fallbacks
 base_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Path relativo desde db_scripts hacia data (3 niveles arriba)
-csv_path = os.path.join(base_dir, '..', '..', '..', 'data', 'sismos.csv')
-db_path = os.path.join(base_dir, '..', '..', '..', 'data', 'sismos.db')
+# Raíz del repositorio (3 niveles arriba de db_scripts)
+repo_root = os.path.normpath(os.path.join(base_dir, '..', '..', '..'))
+csv_path = os.path.join(repo_root, 'data', 'sismos.csv')
+db_path = os.path.join(repo_root, 'data', 'sismos.db')
+
+# Normalizador de ubicaciones compartido con la etapa de exportación
+sys.path.insert(0, repo_root)
+from exporters.location_normalizer import normalize_many  # noqa: E402
+
+# WAL + sincronización NORMAL: un solo fsync por transacción en lugar de uno por página
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MB
+    "PRAGMA busy_timeout = 5000",
+]
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS sismos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha DATE,
+    hora TIME,
+    latitud REAL,
+    longitud REAL,
+    profundidad TEXT,
+    magnitud REAL,
+    provincia TEXT,
+    sentido INTEGER,
+    provincia_normalizada TEXT
+)
+"""
+
+# Índice único para evitar duplicados
+CREATE_UNIQUE_INDEX_SQL = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sismos_unique
+ON sismos (fecha, hora, latitud, longitud)
+"""
+
+# Índices para consultas por rango de fechas, magnitud y provincia
+CREATE_INDEXES_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_sismos_fecha ON sismos (fecha)",
+    "CREATE INDEX IF NOT EXISTS idx_sismos_magnitud_fecha ON sismos (magnitud, fecha)",
+    "CREATE INDEX IF NOT EXISTS idx_sismos_provincia_normalizada ON sismos (provincia_normalizada, fecha)",
+]
+
+# Índice espacial de epicentros (puntos: min = max)
+CREATE_RTREE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sismos_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)
+"""
+
+# Triggers que mantienen sismos_rtree sincronizado con sismos
+CREATE_RTREE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS sismos_rtree_insert AFTER INSERT ON sismos
+    WHEN NEW.latitud IS NOT NULL AND NEW.longitud IS NOT NULL
+    BEGIN
+        INSERT INTO sismos_rtree VALUES (NEW.id, NEW.longitud, NEW.longitud, NEW.latitud, NEW.latitud);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sismos_rtree_delete AFTER DELETE ON sismos
+    BEGIN
+        DELETE FROM sismos_rtree WHERE id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sismos_rtree_update AFTER UPDATE OF latitud, longitud ON sismos
+    BEGIN
+        DELETE FROM sismos_rtree WHERE id = OLD.id;
+        INSERT INTO sismos_rtree
+        SELECT NEW.id, NEW.longitud, NEW.longitud, NEW.latitud, NEW.latitud
+        WHERE NEW.latitud IS NOT NULL AND NEW.longitud IS NOT NULL;
+    END
+    """,
+]
+
+INSERT_SQL = """
+INSERT OR IGNORE INTO sismos (
+    fecha, hora, latitud, longitud, profundidad, magnitud, provincia, sentido, provincia_normalizada
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+COLUMNS = [
+    'fecha', 'hora', 'latitud', 'longitud', 'profundidad', 'magnitud', 'provincia', 'sentido',
+    'provincia_normalizada',
+]
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Abre la base (creando el directorio si hace falta) y aplica los PRAGMAs."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 
-# Normalizar paths
-csv_path = os.path.normpath(csv_path)
-db_path = os.path.normpath(db_path)
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Crea la tabla, los índices, el R*Tree y sus triggers si no existen.
+
+    Las bases creadas con el esquema anterior se migran: se agrega la columna
+    provincia_normalizada y se completan tanto esa columna como el R*Tree a
+    partir de las filas existentes.
+    """
+    with conn:
+        conn.execute(CREATE_TABLE_SQL)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(sismos)")]
+        if 'provincia_normalizada' not in columns:
+            conn.execute("ALTER TABLE sismos ADD COLUMN provincia_normalizada TEXT")
+            _backfill_provincia_normalizada(conn)
+
+        conn.execute(CREATE_UNIQUE_INDEX_SQL)
+        for sql in CREATE_INDEXES_SQL:
+            conn.execute(sql)
+
+        rtree_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sismos_rtree'"
+        ).fetchone()
+        conn.execute(CREATE_RTREE_SQL)
+        for sql in CREATE_RTREE_TRIGGERS_SQL:
+            conn.execute(sql)
+        if not rtree_exists:
+            conn.execute("""
+            INSERT INTO sismos_rtree
+            SELECT id, longitud, longitud, latitud, latitud FROM sismos
+            WHERE latitud IS NOT NULL AND longitud IS NOT NULL
+            """)
+
+
+def _backfill_provincia_normalizada(conn: sqlite3.Connection) -> None:
+    """Completa provincia_normalizada en las filas cargadas antes de existir la columna."""
+    raw = [row[0] for row in conn.execute("SELECT DISTINCT provincia FROM sismos WHERE provincia IS NOT NULL")]
+    normalized = [meta["provincia"] for meta in normalize_many(raw)]
+    conn.executemany(
+        "UPDATE sismos SET provincia_normalizada = ? WHERE provincia = ?",
+        [(provincia, original) for original, provincia in zip(raw, normalized) if provincia is not None],
+    )
 
-print("=" * 60)
-print("ACTUALIZACIÓN DE BASE DE DATOS SQLITE")
-print("=" * 60)
-print(f"📂 CSV: {csv_path}")
-print(f"💾 DB: {db_path}")
 
-# Verificar que el CSV existe
-if not os.path.exists(csv_path):
-    print(f"❌ Error: No se encontró {csv_path}")
-    sys.exit(1)
+def read_watermark(conn: sqlite3.Connection) -> Optional[Tuple[str, str]]:
+    """
+    (fecha, hora) más reciente cargado en la base, o None si está vacía.
+    Se resuelve con idx_sismos_unique (fecha, hora, ...) sin recorrer la tabla.
+    """
+    row = conn.execute("""
+    SELECT fecha, hora FROM sismos
+    WHERE fecha IS NOT NULL AND hora IS NOT NULL
+    ORDER BY fecha DESC, hora DESC
+    LIMIT 1
+    """).fetchone()
+    return tuple(row) if row else None
 
-try:
-    # Leer el CSV
-    sismos_nuevos_df = pd.read_csv(csv_path)
-    print(f"📊 Registros en CSV: {len(sismos_nuevos_df)}")
+
+def load_csv(path: str) -> pd.DataFrame:
+    """
+    Lee el CSV y lo convierte al formato de la base (fecha YYYY-MM-DD, sentido 0/1,
+    provincia normalizada).
+    """
+    df = pd.read_csv(path)
 
     # Convertir la columna 'fecha' de 'DD/MM/YYYY' a 'YYYY-MM-DD'
-    sismos_nuevos_df['fecha'] = pd.to_datetime(
-        sismos_nuevos_df['fecha'], 
-        format='%d/%m/%Y',
-        errors='coerce'
-    ).dt.strftime('%Y-%m-%d')
-    
+    df['fecha'] = pd.to_datetime(df['fecha'], format='%d/%m/%Y', errors='coerce').dt.strftime('%Y-%m-%d')
+
     # Convertir la columna 'sentido' a 1 (Sí) o 0 (No)
-    sismos_nuevos_df['sentido'] = sismos_nuevos_df['sentido'].apply(
-        lambda x: 1 if str(x).strip().lower() in ['si', 'sí', 'yes', '1', 'true'] else 0
-    )
+    sentido = df['sentido'].astype(str).str.strip().str.lower()
+    df['sentido'] = sentido.isin(['si', 'sí', 'yes', '1', 'true']).astype(int)
 
-    # Crear directorio si no existe
-    db_dir = os.path.dirname(db_path)
-    os.makedirs(db_dir, exist_ok=True)
-
-    # Crear la conexión a SQLite
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Crear la tabla si no existe
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS sismos (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        fecha DATE,
-        hora TIME,
-        latitud REAL,
-        longitud REAL,
-        profundidad TEXT,
-        magnitud REAL,
-        provincia TEXT,
-        sentido INTEGER
-    )
-    """)
+    # Normalizar cada ubicación distinta una sola vez
+    codes, uniques = pd.factorize(df['provincia'])
+    normalized = [meta["provincia"] for meta in normalize_many([str(u) for u in uniques])] + [None]
+    df['provincia_normalizada'] = pd.Series(normalized, dtype=object).take(codes).to_numpy()
+    return df
 
-    # Crear índice único para evitar duplicados
-    cursor.execute("""
-    CREATE UNIQUE INDEX IF NOT EXISTS idx_sismos_unique
-    ON sismos (fecha, hora, latitud, longitud)
-    """)
 
+def select_new_rows(df: pd.DataFrame, watermark: Optional[Tuple[str, str]]) -> pd.DataFrame:
+    """
+    Filas a insertar, en orden cronológico: válidas y con (fecha, hora) >= marca de agua.
+
+    Se usa >= (y no >) porque puede haber eventos distintos con el mismo
+    (fecha, hora); los que ya estaban los descarta INSERT OR IGNORE.
+    """
+    df = df[df['fecha'].notna() & df['hora'].notna()]
+    if watermark is not None:
+        fecha, hora = watermark
+        df = df[(df['fecha'] > fecha) | ((df['fecha'] == fecha) & (df['hora'].astype(str) >= hora))]
     # Revertir el orden para que los más recientes queden al final
-    sismos_nuevos_df = sismos_nuevos_df[::-1]
-
-    # Insertar los datos solo si no están ya presentes
-    inserted_count = 0
-    skipped_count = 0
-    
-    for index, row in sismos_nuevos_df.iterrows():
-        # Skip rows with invalid data
-        if pd.isna(row['fecha']) or pd.isna(row['hora']):
-            skipped_count += 1
-            continue
-            
-        # Verificar si el registro ya existe en la base de datos
-        cursor.execute("""
-        SELECT COUNT(*) FROM sismos 
-        WHERE fecha = ? AND hora = ? AND latitud = ? AND longitud = ?
-        """, (row['fecha'], row['hora'], row['latitud'], row['longitud']))
-        
-        if cursor.fetchone()[0] == 0:  # Si no existe, insertar
-            cursor.execute("""
-            INSERT INTO sismos (fecha, hora, latitud, longitud, profundidad, magnitud, provincia, sentido)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                row['fecha'], 
-                row['hora'], 
-                row['latitud'], 
-                row['longitud'], 
-                row['profundidad'], 
-                row['magnitud'], 
-                row['provincia'], 
-                row['sentido']
-            ))
-            inserted_count += 1
-        else:
-            skipped_count += 1
-
-    # Confirmar los cambios
-    conn.commit()
-
-    # Obtener total de registros
-    cursor.execute("SELECT COUNT(*) FROM sismos")
-    total = cursor.fetchone()[0]
-
-    # Cerrar la conexión
+    return df[::-1]
+
+
+def skipped_counts(df: pd.DataFrame, candidates: pd.DataFrame, inserted: int) -> Tuple[int, int, int]:
+    """
+    Filas del CSV que no se insertaron, por motivo.
+
+    Returns:
+        (sin fecha u hora, anteriores a la marca de agua, duplicadas entre los candidatos)
+    """
+    valid = int((df['fecha'].notna() & df['hora'].notna()).sum())
+    return len(df) - valid, valid - len(candidates), len(candidates) - inserted
+
+
+def insert_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    Inserta las filas con un único executemany en una transacción.
+
+    Returns:
+        Cantidad de filas efectivamente insertadas.
+    """
+    # Valores nativos de Python, con None en lugar de NaN
+    values = df[COLUMNS].astype(object).where(df[COLUMNS].notna(), None).values.tolist()
+    # rowcount no incluye las filas que escriben los triggers del R*Tree
+    with conn:
+        cursor = conn.executemany(INSERT_SQL, values)
+    return max(cursor.rowcount, 0)
+
+
+def close(conn: sqlite3.Connection) -> None:
+    """
+    Vuelca el WAL a la base y deja el archivo en modo rollback journal: sismos.db
+    se publica en el repositorio y debe poder abrirse sin archivos -wal / -shm.
+    """
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA journal_mode = DELETE")
     conn.close()
 
-    print(f"✅ Insertados: {inserted_count} registros nuevos")
-    print(f"ℹ️  Omitidos: {skipped_count} registros (duplicados o inválidos)")
-    print(f"📊 Total en DB: {total} registros")
-    print("=" * 60)
-    print("✅ ACTUALIZACIÓN COMPLETADA")
-    print("=" * 60)
 
-except Exception as e:
+def main():
     print("=" * 60)
-    print("❌ ERROR AL ACTUALIZAR DATABASE")
-    print(f"Detalle: {e}")
+    print("ACTUALIZACIÓN DE BASE DE DATOS SQLITE")
     print("=" * 60)
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
\ No newline at end of file
+    print(f"📂 CSV: {csv_path}")
+    print(f"💾 DB: {db_path}")
+
+    # Verificar que el CSV existe
+    if not os.path.exists(csv_path):
+        print(f"❌ Error: No se encontró {csv_path}")
+        sys.exit(1)
+
+    try:
+        start = time.perf_counter()
+        sismos_nuevos_df = load_csv(csv_path)
+        print(f"📊 Registros en CSV: {len(sismos_nuevos_df)}")
+
+        conn = connect(db_path)
+        ensure_schema(conn)
+
+        watermark = read_watermark(conn)
+        candidatos = select_new_rows(sismos_nuevos_df, watermark)
+        if watermark is not None:
+            print(f"🔖 Marca de agua: {watermark[0]} {watermark[1]} ({len(candidatos)} candidatos)")
+
+        inserted_count = insert_rows(conn, candidatos)
+        invalid_count, below_watermark_count, duplicate_count = skipped_counts(
+            sismos_nuevos_df, candidatos, inserted_count,
+        )
+
+        # Obtener total de registros
+        total = conn.execute("SELECT COUNT(*) FROM sismos").fetchone()[0]
+        close(conn)
+
+        print(f"✅ Insertados: {inserted_count} registros nuevos")
+        print(f"ℹ️  Anteriores a la marca de agua: {below_watermark_count} registros (ya cargados)")
+        print(f"ℹ️  Omitidos: {duplicate_count} de {len(candidatos)} candidatos (duplicados)")
+        if invalid_count:
+            print(f"⚠️  Sin fecha u hora: {invalid_count} registros")
+        print(f"📊 Total en DB: {total} registros")
+        print(f"⏱️  Tiempo: {time.perf_counter() - start:.2f} s")
+        print("=" * 60)
+        print("✅ ACTUALIZACIÓN COMPLETADA")
+        print("=" * 60)
+
+    except Exception as e:
+        print("=" * 60)
+        print("❌ ERROR AL ACTUALIZAR DATABASE")
+        print(f"Detalle: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
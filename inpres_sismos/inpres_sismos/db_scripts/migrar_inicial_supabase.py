@@ -1,10 +1,31 @@
+"""
+Migración inicial de sismos.csv a Supabase.
+Sube todo el CSV en lotes paralelos de tamaño adaptativo y guarda un checkpoint
+local por lote (data/supabase_migracion.jsonl): si se corta o falla algún lote,
+volver a ejecutar el script retoma solo lo que falta, aunque sismos.csv haya
+crecido entre ejecuciones. Ver inpres_sismos/migracion.py
+"""
+import argparse
 import os
+import sys
+
 import pandas as pd
-from supabase import create_client, Client
-from datetime import datetime
-import time
 from dotenv import load_dotenv
 
+base_dir = os.path.dirname(os.path.abspath(__file__))
+csv_path = os.path.join(base_dir, '..', '..', '..', 'data', 'sismos.csv')
+
+sys.path.insert(0, os.path.normpath(os.path.join(base_dir, '..', '..')))
+from inpres_sismos.migracion import (  # noqa: E402
+    CHECKPOINT_PATH,
+    LATENCIA_OBJETIVO,
+    LOTE_INICIAL,
+    VENTANA,
+    ControlLote,
+    migrar,
+)
+from inpres_sismos.sincronizacion import ClientePostgrest  # noqa: E402
+
 # Cargar variables desde .env
 load_dotenv()
 
@@ -13,61 +34,51 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-base_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.join(base_dir, '..', '..', '..', 'data', 'sismos.csv')
 
 def migrate():
+    parser = argparse.ArgumentParser(description="Migración inicial de sismos.csv a Supabase")
+    parser.add_argument("--ventana", type=int, default=VENTANA, help="Lotes en vuelo como máximo")
+    parser.add_argument("--lote", type=int, default=LOTE_INICIAL, help="Tamaño de lote inicial (filas)")
+    parser.add_argument("--latencia", type=float, default=LATENCIA_OBJETIVO,
+                        help="Latencia objetivo por lote (segundos)")
+    parser.add_argument("--reiniciar", action="store_true", help="Ignorar el checkpoint y migrar todo")
+    args = parser.parse_args()
+
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("Error: Configura SUPABASE_URL y SUPABASE_SERVICE_ROLE_KEY")
         return
 
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    if args.reiniciar and os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
 
     print(f"Leyendo datos desde {csv_path}...")
     df = pd.read_csv(csv_path)
-    
-    # Formatear datos
-    df['fecha_iso'] = pd.to_datetime(df['fecha'], format='%d/%m/%Y').dt.strftime('%Y-%m-%d')
-    df['sentido_bool'] = df['sentido'].apply(lambda x: True if x == 'Si' else False)
-    
-    records = []
-    for _, row in df.iterrows():
-        # Helper para limpiar floats y convertirlos a None si son NaN o inválidos
-        def clean_float(val):
-            try:
-                if pd.isna(val): return None
-                f = float(val)
-                import math
-                return f if not math.isnan(f) and not math.isinf(f) else None
-            except:
-                return None
-        
-        records.append({
-            "fecha": row['fecha_iso'],
-            "hora": row['hora'],
-            "latitud": clean_float(row['latitud']),
-            "longitud": clean_float(row['longitud']),
-            "profundidad": str(row['profundidad']) if pd.notna(row['profundidad']) else None,
-            "magnitud": clean_float(row['magnitud']),
-            "provincia": row['provincia'] if pd.notna(row['provincia']) else None,
-            "sentido": bool(row['sentido_bool']) if pd.notna(row['sentido_bool']) else False
-        })
-
-    total = len(records)
-    batch_size = 500
-    print(f"Iniciando migración de {total} registros en lotes de {batch_size}...")
-
-    for i in range(0, total, batch_size):
-        batch = records[i:i+batch_size]
-        try:
-            supabase.table("sismos").upsert(batch, on_conflict="fecha,hora,latitud,longitud").execute()
-            print(f"  Procesados: {min(i + batch_size, total)}/{total}")
-        except Exception as e:
-            print(f"  Error en lote {i}-{i+batch_size}: {e}")
-        
-        time.sleep(0.5) # Evitar saturar la API
+
+    print(f"Iniciando migración de {len(df)} registros "
+          f"(hasta {args.ventana} lotes en paralelo, lote inicial de {args.lote})...")
+    with ClientePostgrest(SUPABASE_URL, SUPABASE_KEY) as cliente:
+        resultado = migrar(
+            df, cliente, checkpoint_path=CHECKPOINT_PATH, ventana=args.ventana,
+            control=ControlLote(inicial=args.lote, latencia_objetivo=args.latencia),
+        )
+
+    if resultado.ya_migradas:
+        print(f"  Retomado desde el checkpoint: {resultado.ya_migradas} registros ya migrados")
+    if resultado.tamanos:
+        print(f"  Lotes: {resultado.lotes} (tamaño {min(resultado.tamanos)}-{max(resultado.tamanos)}, "
+              f"final {resultado.tamanos[-1]}), reintentos: {resultado.reintentos}")
+    print(f"  Procesados: {resultado.ya_migradas + resultado.filas}/{resultado.total} "
+          f"({resultado.filas_por_segundo:.0f} filas/s, {resultado.segundos:.1f}s)")
+
+    if not resultado.completa:
+        print(f"\n{resultado.lotes_fallidos} lotes fallidos:")
+        for error in resultado.errores[:5]:
+            print(f"  {error[:160]}")
+        print("Volver a ejecutar el script para reintentar solo esos lotes.")
+        sys.exit(1)
 
     print("\n¡Migración inicial completada!")
 
+
 if __name__ == "__main__":
     migrate()
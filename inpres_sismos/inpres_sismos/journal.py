@@ -0,0 +1,149 @@
+"""
+journal.py
+
+Journal de checkpoints para las cargas masivas por rangos de fechas
+(selenium/sismos_bulk_scrape.py).
+
+Cada rango terminado se agrega como una línea JSON al final del journal, con
+sus fechas y sus filas, y se hace fsync antes de pasar al siguiente. La
+escritura es O(filas del rango), sin reescribir lo acumulado. Si el proceso se
+interrumpe, al reiniciar se saltean los rangos ya registrados y solo se repite
+el rango que estaba en curso. Una línea final incompleta (corte a mitad de una
+escritura) se ignora.
+
+compactar() arma el CSV final a partir del journal, sin filas duplicadas.
+"""
+import csv
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+JOURNAL_VERSION = 1
+
+FIELDNAMES = [
+    "fecha", "hora", "latitud", "longitud",
+    "profundidad", "magnitud", "provincia", "sentido",
+]
+
+
+class Journal:
+    """
+    Journal append-only de rangos completados.
+
+    Args:
+        path: archivo JSONL del journal (se crea al registrar el primer rango).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rangos: List[Tuple[date, date]] = []
+        self.filas = 0
+        for entry in self._entries():
+            self.rangos.append((date.fromisoformat(entry["inicio"]), date.fromisoformat(entry["fin"])))
+            self.filas += len(entry["filas"])
+
+    def huecos(self, inicio: date, fin: date) -> List[Tuple[date, date]]:
+        """
+        Intervalos de [inicio, fin] que ningún rango registrado cubre, en orden.
+        No dependen de cómo se partió el período en ejecuciones anteriores.
+        """
+        huecos = []
+        actual = inicio
+        for a, b in sorted(self.rangos):
+            if b < actual:
+                continue
+            if a > fin:
+                break
+            if a > actual:
+                huecos.append((actual, a - timedelta(days=1)))
+            actual = max(actual, b + timedelta(days=1))
+        if actual <= fin:
+            huecos.append((actual, fin))
+        return huecos
+
+    def registrar(self, inicio: date, fin: date, filas: Sequence[Dict[str, str]]) -> None:
+        """Agrega un rango completado con sus filas y lo persiste (fsync) antes de volver."""
+        entry = {
+            "version": JOURNAL_VERSION,
+            "inicio": inicio.isoformat(),
+            "fin": fin.isoformat(),
+            "filas": [{k: row.get(k, "") for k in FIELDNAMES} for row in filas],
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._drop_partial_tail()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.rangos.append((inicio, fin))
+        self.filas += len(filas)
+
+    def compactar(self, csv_path: str) -> int:
+        """
+        Escribe el CSV final con las filas de todos los rangos, en orden
+        cronológico de rangos (un rango salteado y completado en una ejecución
+        posterior queda en su lugar, no al final). Si un rango se registró más
+        de una vez, se conserva una sola copia de cada sismo: la última registrada.
+
+        Returns:
+            Cantidad de filas escritas.
+        """
+        filas = {}
+        # Orden estable: las repeticiones de un mismo rango conservan el orden del journal
+        for entry in sorted(self._entries(), key=lambda e: e["inicio"]):
+            for row in entry["filas"]:
+                key = (row["fecha"], row["hora"], row["latitud"], row["longitud"])
+                filas.pop(key, None)
+                filas[key] = row
+
+        tmp_path = f"{csv_path}.tmp"
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(filas.values())
+        os.replace(tmp_path, csv_path)
+        return len(filas)
+
+    def _entries(self):
+        """Entradas válidas del journal (descarta una última línea incompleta)."""
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry.get("version") == JOURNAL_VERSION:
+                    yield entry
+
+    def _drop_partial_tail(self) -> None:
+        """Recorta una línea final sin terminar, para que la próxima escritura empiece en una línea nueva."""
+        try:
+            with open(self.path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size == 0:
+                    return
+                # Buscar el último salto de línea desde el final
+                pos = size
+                while pos > 0:
+                    step = min(4096, pos)
+                    f.seek(pos - step)
+                    chunk = f.read(step)
+                    idx = chunk.rfind(b"\n")
+                    if idx >= 0:
+                        end = pos - step + idx + 1
+                        break
+                    pos -= step
+                else:
+                    end = 0
+                if end != size:
+                    f.truncate(end)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,275 @@
+"""
+migracion.py
+
+Migración inicial (carga completa) de sismos.csv a la tabla sismos de Supabase.
+
+- Las filas se arman columna por columna con preparar_registros() y
+  serializar() de sincronizacion.py, en orden cronológico.
+- Los lotes se envían en paralelo con una ventana acotada de peticiones en
+  vuelo: nunca hay más de `ventana` POST abiertos a la vez.
+- El tamaño de lote se adapta (AIMD): crece de a poco mientras la latencia
+  observada está por debajo del objetivo, se achica en proporción cuando la
+  supera y se divide a la mitad ante un error. Un 413 (cuerpo demasiado
+  grande) divide el lote y lo vuelve a encolar.
+- Cada lote confirmado se agrega a un checkpoint local (JSONL, con fsync) como
+  intervalo de filas [inicio, fin) junto con la huella de esas filas. Al volver
+  a ejecutar, solo se envían las filas que no quedaron en ningún intervalo: los
+  lotes fallidos y los que no llegaron a enviarse. Un intervalo cuenta como
+  migrado solo si sus filas actuales tienen la misma huella, así que si el CSV
+  creció (los sismos nuevos quedan al final del orden cronológico) se conserva
+  todo lo ya migrado, y si se editó o se intercaló alguna fila solo se vuelven
+  a enviar los intervalos afectados (el upsert es idempotente).
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inpres_sismos.sincronizacion import (
+    LOTE_BYTES,
+    ClientePostgrest,
+    ErrorPostgrest,
+    preparar_registros,
+    serializar,
+)
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+CHECKPOINT_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'supabase_migracion.jsonl'))
+
+CHECKPOINT_VERSION = 2
+
+# Peticiones en vuelo como máximo
+VENTANA = 4
+# Tamaño de lote inicial y límites del ajuste adaptativo (en filas)
+LOTE_INICIAL = 500
+LOTE_MIN = 50
+LOTE_MAX = 5000
+# Latencia por POST a la que apunta el ajuste (segundos)
+LATENCIA_OBJETIVO = 1.0
+
+Intervalo = Tuple[int, int]
+
+
+class ControlLote:
+    """
+    Tamaño de lote adaptativo: aumento aditivo mientras la latencia esté por
+    debajo del objetivo, reducción proporcional si la supera y a la mitad ante
+    un error.
+    """
+
+    def __init__(self, inicial: int = LOTE_INICIAL, minimo: int = LOTE_MIN, maximo: int = LOTE_MAX,
+                 latencia_objetivo: float = LATENCIA_OBJETIVO):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.latencia_objetivo = latencia_objetivo
+        self.tamano = min(max(inicial, minimo), maximo)
+
+    def exito(self, filas: int, latencia: float) -> None:
+        if latencia <= self.latencia_objetivo:
+            # Solo crece si el lote medido era del tamaño actual (no un resto más chico)
+            if filas >= self.tamano:
+                self.tamano = min(self.maximo, self.tamano + max(self.minimo, self.tamano // 4))
+        else:
+            self.tamano = max(self.minimo, int(filas * self.latencia_objetivo / latencia))
+
+    def error(self) -> None:
+        self.tamano = max(self.minimo, self.tamano // 2)
+
+
+class CheckpointMigracion:
+    """
+    Checkpoint append-only de intervalos de filas ya confirmados.
+
+    Cada intervalo guarda la huella de sus filas y al abrir el checkpoint solo
+    se conservan los que siguen coincidiendo con las filas actuales.
+
+    Args:
+        path: archivo JSONL (la primera línea indica la versión del formato).
+        filas: filas serializadas a migrar, en orden cronológico.
+    """
+
+    def __init__(self, path: str, filas: Sequence[bytes]):
+        self.path = path
+        self.filas = filas
+        self.total = len(filas)
+        self.intervalos: List[Intervalo] = []
+        # Filas confirmadas en el checkpoint que ya no coinciden con los datos
+        self.descartadas = 0
+
+        lineas = self._lineas()
+        vigente = bool(lineas) and lineas[0] == {"version": CHECKPOINT_VERSION}
+        for linea in lineas[1:]:
+            a, b = linea["inicio"], linea["fin"]
+            if vigente and b <= self.total and huella_filas(filas[a:b]) == linea["huella"]:
+                self.intervalos.append((a, b))
+            else:
+                self.descartadas += b - a
+        if self.descartadas or not vigente:
+            # Se reescribe solo con los intervalos vigentes
+            self._reescribir()
+
+    def pendientes(self) -> List[Intervalo]:
+        """Intervalos [inicio, fin) de filas sin confirmar, en orden."""
+        huecos = []
+        actual = 0
+        for a, b in sorted(self.intervalos):
+            if a > actual:
+                huecos.append((actual, a))
+            actual = max(actual, b)
+        if actual < self.total:
+            huecos.append((actual, self.total))
+        return huecos
+
+    def confirmadas(self) -> int:
+        return self.total - sum(b - a for a, b in self.pendientes())
+
+    def registrar(self, inicio: int, fin: int) -> None:
+        """Agrega un lote confirmado y lo persiste (fsync) antes de volver."""
+        self._agregar(self._entrada(inicio, fin))
+        self.intervalos.append((inicio, fin))
+
+    def _entrada(self, inicio: int, fin: int) -> dict:
+        return {"inicio": inicio, "fin": fin, "huella": huella_filas(self.filas[inicio:fin])}
+
+    def _lineas(self) -> list:
+        """Líneas válidas (descarta una última línea incompleta)."""
+        lineas = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for linea in f:
+                    if not linea.endswith("\n"):
+                        break
+                    try:
+                        lineas.append(json.loads(linea))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return lineas
+
+    def _reescribir(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CHECKPOINT_VERSION}) + "\n")
+            for a, b in self.intervalos:
+                f.write(json.dumps(self._entrada(a, b)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _agregar(self, entrada: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entrada) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@dataclass
+class ResultadoMigracion:
+    """Resumen de una ejecución de la migración."""
+    total: int
+    ya_migradas: int = 0
+    filas: int = 0
+    lotes: int = 0
+    lotes_fallidos: int = 0
+    max_en_vuelo: int = 0
+    reintentos: int = 0
+    segundos: float = 0.0
+    tamanos: List[int] = field(default_factory=list)
+    errores: List[str] = field(default_factory=list)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos > 0 else 0.0
+
+    @property
+    def completa(self) -> bool:
+        return self.ya_migradas + self.filas == self.total
+
+
+def huella_filas(filas: Sequence[bytes]) -> str:
+    h = hashlib.sha1()
+    for fila in filas:
+        h.update(fila)
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def migrar(df: pd.DataFrame, cliente: ClientePostgrest, checkpoint_path: str = CHECKPOINT_PATH,
+           ventana: int = VENTANA, control: Optional[ControlLote] = None,
+           max_bytes: int = LOTE_BYTES) -> ResultadoMigracion:
+    """
+    Sube a Supabase las filas de df que todavía no figuran en el checkpoint.
+
+    Returns:
+        ResultadoMigracion; si hubo lotes fallidos, completa es False y basta
+        con volver a ejecutar para reintentarlos.
+    """
+    inicio_reloj = time.perf_counter()
+    control = control or ControlLote()
+    filas = serializar(preparar_registros(df))
+    # Bytes acumulados hasta cada fila, con la coma separadora
+    acumulado = np.concatenate([[0], np.cumsum([len(f) + 1 for f in filas])])
+
+    checkpoint = CheckpointMigracion(checkpoint_path, filas)
+    if checkpoint.descartadas:
+        print(f"[WARN] {checkpoint.descartadas} filas del checkpoint ya no coinciden con los datos; "
+              f"se vuelven a enviar")
+    pendientes = checkpoint.pendientes()
+    resultado = ResultadoMigracion(total=len(filas), ya_migradas=checkpoint.confirmadas())
+
+    def enviar(a: int, b: int) -> float:
+        t0 = time.perf_counter()
+        cliente.upsert(b"[" + b",".join(filas[a:b]) + b"]")
+        return time.perf_counter() - t0
+
+    def proximo_lote() -> Intervalo:
+        a, fin = pendientes[0]
+        # Tope en filas según el control y en bytes según max_bytes
+        b = min(fin, a + control.tamano)
+        b = max(a + 1, min(b, int(np.searchsorted(acumulado, acumulado[a] + max_bytes - 1, side="right")) - 1))
+        if b < fin:
+            pendientes[0] = (b, fin)
+        else:
+            pendientes.pop(0)
+        return a, b
+
+    en_vuelo = {}
+    with ThreadPoolExecutor(max_workers=ventana) as pool:
+        while pendientes or en_vuelo:
+            while pendientes and len(en_vuelo) < ventana:
+                a, b = proximo_lote()
+                en_vuelo[pool.submit(enviar, a, b)] = (a, b)
+            resultado.max_en_vuelo = max(resultado.max_en_vuelo, len(en_vuelo))
+
+            listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                a, b = en_vuelo.pop(futuro)
+                try:
+                    latencia = futuro.result()
+                except ErrorPostgrest as e:
+                    control.error()
+                    if e.status == 413 and b - a > 1:
+                        # Cuerpo demasiado grande: se vuelve a encolar partido en dos
+                        medio = (a + b) // 2
+                        pendientes[:0] = [(a, medio), (medio, b)]
+                        continue
+                    resultado.lotes += 1
+                    resultado.lotes_fallidos += 1
+                    resultado.errores.append(f"filas {a}-{b}: {e}")
+                else:
+                    checkpoint.registrar(a, b)
+                    control.exito(b - a, latencia)
+                    resultado.lotes += 1
+                    resultado.filas += b - a
+                    resultado.tamanos.append(b - a)
+
+    resultado.reintentos = cliente.reintentos
+    resultado.segundos = time.perf_counter() - inicio_reloj
+    return resultado
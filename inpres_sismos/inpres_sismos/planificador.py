@@ -0,0 +1,194 @@
+"""
+planificador.py
+
+Planificador adaptativo de rangos de fechas para las búsquedas en
+contenidos.inpres.gob.ar/buscar_sismo, que devuelve como máximo
+LIMITE_RESULTADOS sismos por búsqueda.
+
+En lugar de rangos fijos de N días:
+- cada rango se extiende mientras la cantidad esperada de sismos no supere
+  OBJETIVO_RESULTADOS (períodos tranquilos -> rangos largos, menos búsquedas);
+- la cantidad esperada por día se aprende del catálogo existente (sismos.csv);
+  los días fuera del catálogo usan un percentil alto de la tasa diaria;
+- si una búsqueda vuelve con una cantidad igual o cercana al límite, el
+  resultado puede estar truncado: se descarta y el rango se divide en dos
+  (hasta llegar a un solo día);
+- la relación entre lo observado y lo esperado ajusta la estimación de los
+  rangos siguientes.
+
+Lo usan selenium/sismos_bulk_scrape.py (secuencial, con PlanificadorRangos) y
+el spider buscar_sismo (concurrente, con planificar() y dividir()).
+"""
+import csv
+import os
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'sismos.csv'))
+
+# Máximo de resultados que devuelve el buscador por búsqueda
+LIMITE_RESULTADOS = 500
+# Una búsqueda con al menos LIMITE_RESULTADOS - MARGEN_LIMITE resultados se considera truncada
+MARGEN_LIMITE = 10
+# Cantidad esperada de sismos a la que apunta cada rango (margen para picos de actividad)
+OBJETIVO_RESULTADOS = 300
+# Largo máximo de un rango, en días
+MAX_DIAS_POR_RANGO = 365
+# Percentil de la tasa diaria del catálogo usado para días sin datos
+PERCENTIL_TASA_DESCONOCIDA = 90
+
+Rango = Tuple[date, date]
+
+
+def eventos_por_dia(csv_path: str = CSV_PATH) -> Dict[date, int]:
+    """Cantidad de sismos por día en el catálogo (vacío si no existe)."""
+    counts: Counter = Counter()
+    try:
+        with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    counts[datetime.strptime(row.get("fecha") or "", "%d/%m/%Y").date()] += 1
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return dict(counts)
+
+
+def cerca_del_limite(cantidad: int) -> bool:
+    """True si una búsqueda con esta cantidad de resultados puede estar truncada."""
+    return cantidad >= LIMITE_RESULTADOS - MARGEN_LIMITE
+
+
+def dividir(rango: Rango) -> List[Rango]:
+    """Divide un rango en dos mitades (un rango de un solo día no se puede dividir)."""
+    inicio, fin = rango
+    if inicio >= fin:
+        return [rango]
+    medio = inicio + (fin - inicio) // 2
+    return [(inicio, medio), (medio + timedelta(days=1), fin)]
+
+
+class EstimadorTasa:
+    """Cantidad esperada de sismos por día, aprendida del catálogo."""
+
+    def __init__(self, conteos: Dict[date, int]):
+        self.conteos = conteos
+        if conteos:
+            self.primer_dia = min(conteos)
+            self.ultimo_dia = max(conteos)
+            # Días sin sismos dentro del período cubierto cuentan como 0
+            dias = (self.ultimo_dia - self.primer_dia).days + 1
+            tasas = sorted(list(conteos.values()) + [0] * (dias - len(conteos)))
+            self.tasa_desconocida = float(tasas[min(len(tasas) - 1, len(tasas) * PERCENTIL_TASA_DESCONOCIDA // 100)])
+        else:
+            self.primer_dia = self.ultimo_dia = None
+            # Sin catálogo: suponer el peor caso razonable (rangos de pocos días)
+            self.tasa_desconocida = float(OBJETIVO_RESULTADOS) / 7
+        self.tasa_desconocida = max(self.tasa_desconocida, 1.0)
+
+    def tasa(self, dia: date) -> float:
+        if self.primer_dia is not None and self.primer_dia <= dia <= self.ultimo_dia:
+            return float(self.conteos.get(dia, 0))
+        return self.tasa_desconocida
+
+    def esperado(self, rango: Rango) -> float:
+        inicio, fin = rango
+        return sum(self.tasa(inicio + timedelta(days=i)) for i in range((fin - inicio).days + 1))
+
+
+def planificar(huecos: Sequence[Rango], estimador: EstimadorTasa, factor: float = 1.0) -> List[Rango]:
+    """
+    Parte los intervalos a cubrir en rangos cuya cantidad esperada (por factor)
+    no supere OBJETIVO_RESULTADOS.
+    """
+    rangos = []
+    for inicio, fin in huecos:
+        while inicio <= fin:
+            rango = _extender(inicio, fin, estimador, factor)
+            rangos.append(rango)
+            inicio = rango[1] + timedelta(days=1)
+    return rangos
+
+
+class PlanificadorRangos:
+    """
+    Planificación secuencial con retroalimentación: se pide un rango con
+    siguiente(), se busca y se informa la cantidad obtenida con registrar().
+
+    Args:
+        huecos: intervalos (inicio, fin) a cubrir, ambos incluidos.
+        estimador: tasa esperada por día (por defecto, la del catálogo).
+    """
+
+    def __init__(self, huecos: Sequence[Rango], estimador: Optional[EstimadorTasa] = None):
+        self.estimador = estimador if estimador is not None else EstimadorTasa(eventos_por_dia())
+        self._pendientes = deque(h for h in huecos if h[0] <= h[1])
+        # Relación observado / esperado, suavizada
+        self.factor = 1.0
+        self.busquedas = 0
+        self.divisiones = 0
+        self.truncados: List[Rango] = []
+
+    def hay_pendientes(self) -> bool:
+        return bool(self._pendientes)
+
+    def plan(self) -> List[Rango]:
+        """Rangos que se buscarían con la estimación actual, si ninguno llega al límite."""
+        return planificar(self._pendientes, self.estimador, self.factor)
+
+    def siguiente(self) -> Optional[Rango]:
+        """Próximo rango a buscar (None si no queda nada por cubrir)."""
+        if not self._pendientes:
+            return None
+        inicio, fin = self._pendientes.popleft()
+        rango = _extender(inicio, fin, self.estimador, self.factor)
+        if rango[1] < fin:
+            self._pendientes.appendleft((rango[1] + timedelta(days=1), fin))
+        return rango
+
+    def registrar(self, rango: Rango, cantidad: int) -> bool:
+        """
+        Informa el resultado de buscar rango.
+
+        Returns:
+            True si el resultado está completo y se puede guardar; False si
+            puede estar truncado y hay que descartarlo (el rango se dividió y
+            sus mitades se buscarán a continuación).
+        """
+        self.busquedas += 1
+        if cerca_del_limite(cantidad):
+            mitades = dividir(rango)
+            if len(mitades) == 2:
+                self.divisiones += 1
+                for mitad in reversed(mitades):
+                    self._pendientes.appendleft(mitad)
+                # La actividad real es al menos tan alta como la observada
+                self._ajustar(rango, cantidad)
+                return False
+            # Un solo día con más sismos que el límite: no se puede dividir más
+            self.truncados.append(rango)
+        self._ajustar(rango, cantidad)
+        return True
+
+    def _ajustar(self, rango: Rango, cantidad: int) -> None:
+        esperado = self.estimador.esperado(rango)
+        if esperado <= 0:
+            return
+        ratio = min(max(cantidad / esperado, 0.25), 4.0)
+        self.factor = min(max(0.5 * self.factor + 0.5 * ratio, 0.25), 4.0)
+
+
+def _extender(inicio: date, fin: date, estimador: EstimadorTasa, factor: float) -> Rango:
+    """Rango más largo desde inicio (hasta fin) con cantidad esperada <= OBJETIVO_RESULTADOS."""
+    total = estimador.tasa(inicio) * factor
+    ultimo = inicio
+    while ultimo < fin and (ultimo - inicio).days + 1 < MAX_DIAS_POR_RANGO:
+        siguiente = ultimo + timedelta(days=1)
+        total += estimador.tasa(siguiente) * factor
+        if total > OBJETIVO_RESULTADOS:
+            break
+        ultimo = siguiente
+    return (inicio, ultimo)
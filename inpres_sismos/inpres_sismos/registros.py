@@ -0,0 +1,359 @@
+"""
+registros.py
+
+Registro binario de sismos (data/sismos_registros.bin): fuente de verdad de la
+ingesta. Los eventos nuevos se agregan al final y sismos.csv se genera a partir
+del registro.
+
+Cada evento ocupa un registro de ancho fijo (RECORD_SIZE bytes), así que el
+archivo se puede mapear en memoria con numpy (leer()) y recortar por fecha
+(rango()) sin parsear texto:
+
+    bytes 0-63   header: firma b"SISMOREG", versión, tamaño de registro,
+                 cantidad de registros confirmados, flag de orden cronológico
+                 y último epoch
+    bytes 64-... registros, en orden de ingesta (el más antiguo primero)
+
+Cada registro guarda los valores numéricos (epoch de fecha + hora, latitud,
+longitud, profundidad en km, magnitud y sentido) y el texto original de cada
+columna del CSV, de modo que sismos.csv se reconstruye idéntico.
+
+La cantidad de registros del header se actualiza después de escribir los
+registros nuevos: si la escritura se interrumpe, los bytes sobrantes al final
+se ignoran y se pisan en la próxima ingesta.
+
+Uso:
+    python registros.py --importar      # crea el registro a partir de sismos.csv
+    python registros.py --exportar-csv  # regenera sismos.csv desde el registro
+"""
+import argparse
+import calendar
+import csv
+import os
+import shutil
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+LOG_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'sismos_registros.bin'))
+CSV_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'sismos.csv'))
+
+MAGIC = b"SISMOREG"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+# firma, versión, tamaño de registro, cantidad, ordenado, último epoch
+HEADER_STRUCT = struct.Struct("<8sIIQIq")
+
+# Epoch de los eventos sin fecha u hora válida
+EPOCH_INVALIDO = np.iinfo(np.int64).min
+
+CSV_FIELDNAMES = [
+    "fecha", "hora", "latitud", "longitud",
+    "profundidad", "magnitud", "provincia", "sentido",
+]
+
+# Texto original de cada columna del CSV: (campo del registro, ancho en bytes UTF-8)
+TEXT_FIELDS = [
+    ("fecha", 10),
+    ("hora", 8),
+    ("latitud", 12),
+    ("longitud", 12),
+    ("profundidad", 12),
+    ("magnitud", 6),
+    ("provincia", 64),
+    ("sentido", 4),
+]
+
+TEXT_WIDTHS = dict(TEXT_FIELDS)
+
+RECORD_DTYPE = np.dtype([
+    ("epoch", "<i8"),            # segundos desde 1970 de fecha + hora (EPOCH_INVALIDO si falta)
+    ("lat", "<f8"),              # NaN si falta
+    ("lon", "<f8"),
+    ("profundidad_km", "<f4"),
+    ("mag", "<f4"),
+    ("sentido_flag", "u1"),      # 1 sentido, 0 no sentido
+    ("_relleno", "V7"),          # registros de un múltiplo de 8 bytes
+] + [(f"{name}_txt", f"S{width}") for name, width in TEXT_FIELDS])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+def crear(path: str = LOG_PATH) -> None:
+    """Crea un registro vacío (falla si ya existe)."""
+    with open(path, "xb") as f:
+        f.write(_pack_header(0, True, EPOCH_INVALIDO))
+
+
+def contar(path: str = LOG_PATH) -> int:
+    """Cantidad de registros confirmados."""
+    return _read_header(path)["cantidad"]
+
+
+def leer(path: str = LOG_PATH) -> np.ndarray:
+    """
+    Mapea el registro en memoria (solo lectura, sin copias).
+
+    Returns:
+        Array estructurado con dtype RECORD_DTYPE, el más antiguo primero.
+    """
+    header = _read_header(path)
+    if header["cantidad"] == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(header["cantidad"],))
+
+
+def rango(path: str = LOG_PATH, desde: Optional[datetime] = None,
+          hasta: Optional[datetime] = None) -> np.ndarray:
+    """
+    Registros con desde <= fecha + hora < hasta.
+
+    Si el registro está en orden cronológico se resuelve con búsqueda binaria
+    y devuelve una vista del mapeo; si no, con una máscara.
+    """
+    registros = leer(path)
+    epochs = registros["epoch"]
+    inicio = _epoch(desde) if desde is not None else EPOCH_INVALIDO + 1
+    fin = _epoch(hasta) if hasta is not None else np.iinfo(np.int64).max
+    if esta_ordenado(path):
+        a, b = np.searchsorted(epochs, [inicio, fin], side="left")
+        return registros[a:b]
+    return registros[(epochs >= inicio) & (epochs < fin)]
+
+
+def esta_ordenado(path: str = LOG_PATH) -> bool:
+    """True si los registros válidos están en orden cronológico no decreciente."""
+    return _read_header(path)["ordenado"]
+
+
+def agregar(path: str, filas: Sequence[Dict[str, str]]) -> np.ndarray:
+    """
+    Agrega filas (dicts con las columnas del CSV, la más antigua primero) al final del registro.
+
+    Solo lee el header: no recorre los registros existentes.
+
+    Returns:
+        Los registros escritos.
+    """
+    nuevos = codificar(filas)
+    header = _read_header(path)
+    ordenado, ultimo = _orden(nuevos["epoch"], header["ordenado"], header["ultimo_epoch"])
+
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + header["cantidad"] * RECORD_SIZE)
+        f.write(memoryview(nuevos).cast("B"))
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        # Confirmar los registros nuevos recién después de escribirlos
+        f.seek(0)
+        f.write(_pack_header(header["cantidad"] + len(nuevos), ordenado, ultimo))
+        f.flush()
+        os.fsync(f.fileno())
+    return nuevos
+
+
+def claves_recientes(path: str, desde_epoch: int) -> Set[Tuple[str, str, str, str]]:
+    """
+    Claves (fecha, hora, latitud, longitud) de los registros con epoch >= desde_epoch.
+
+    Con el registro ordenado solo se tocan las páginas del final del archivo.
+    """
+    registros = leer(path)
+    if esta_ordenado(path):
+        recientes = registros[np.searchsorted(registros["epoch"], desde_epoch, side="left"):]
+    else:
+        recientes = registros[registros["epoch"] >= desde_epoch]
+    return {
+        tuple(_decode(r[f"{name}_txt"]) for name in ("fecha", "hora", "latitud", "longitud"))
+        for r in recientes
+    }
+
+
+def clave(fila: Dict[str, str]) -> Tuple[str, str, str, str]:
+    """Clave (fecha, hora, latitud, longitud) de una fila del CSV tal como queda en el registro."""
+    return tuple(_decode(_texto(fila.get(name), TEXT_WIDTHS[name]))
+                 for name in ("fecha", "hora", "latitud", "longitud"))
+
+
+def codificar(filas: Sequence[Dict[str, str]]) -> np.ndarray:
+    """
+    Convierte filas del CSV (dicts de texto) en registros.
+
+    Un texto más largo que su campo se trunca en el último carácter UTF-8 completo
+    (con un aviso) para no perder el evento; los valores numéricos del registro se
+    calculan igual a partir del texto completo.
+    """
+    registros = np.zeros(len(filas), dtype=RECORD_DTYPE)
+    for i, fila in enumerate(filas):
+        for name, width in TEXT_FIELDS:
+            value = _texto(fila.get(name), width)
+            if len(value) < len((fila.get(name) or "").encode("utf-8")):
+                print(f"[WARN] {name} excede {width} bytes en el registro, se trunca: {fila.get(name)!r}")
+            registros[i][f"{name}_txt"] = value
+        registros[i]["epoch"] = epoch_de_texto(fila.get("fecha"), fila.get("hora"))
+        registros[i]["lat"] = _float(fila.get("latitud"))
+        registros[i]["lon"] = _float(fila.get("longitud"))
+        registros[i]["profundidad_km"] = _float((fila.get("profundidad") or "").lower().replace("km", "").strip(" ."))
+        registros[i]["mag"] = _float(fila.get("magnitud"))
+        registros[i]["sentido_flag"] = (fila.get("sentido") or "").strip().lower() in ("si", "sí", "yes", "1", "true")
+    return registros
+
+
+def epoch_de_texto(fecha: Optional[str], hora: Optional[str]) -> int:
+    """Epoch de fecha (DD/MM/YYYY) + hora (HH:MM:SS) del CSV; EPOCH_INVALIDO si no se puede parsear."""
+    try:
+        return _epoch(datetime.strptime(f"{fecha} {hora}", "%d/%m/%Y %H:%M:%S"))
+    except (TypeError, ValueError):
+        return EPOCH_INVALIDO
+
+
+def decodificar(registros: np.ndarray) -> List[Dict[str, str]]:
+    """Filas del CSV (texto original) de los registros dados."""
+    columnas = [[_decode(v) for v in registros[f"{name}_txt"].tolist()] for name in CSV_FIELDNAMES]
+    return [dict(zip(CSV_FIELDNAMES, valores)) for valores in zip(*columnas)]
+
+
+def importar_csv(csv_path: str = CSV_PATH, path: str = LOG_PATH) -> int:
+    """
+    Crea el registro a partir de un sismos.csv existente (el más reciente primero en el CSV).
+
+    Returns:
+        Cantidad de registros importados.
+    """
+    with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    filas.reverse()
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    crear(tmp_path)
+    agregar(tmp_path, filas)
+    os.replace(tmp_path, path)
+    return len(filas)
+
+
+def exportar_csv(path: str = LOG_PATH, csv_path: str = CSV_PATH) -> int:
+    """
+    Regenera sismos.csv completo desde el registro (el más reciente primero).
+
+    Returns:
+        Cantidad de filas escritas.
+    """
+    registros = leer(path)
+    terminator = _line_terminator(csv_path)
+    tmp_path = f"{csv_path}.tmp"
+    with open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES, lineterminator=terminator)
+        writer.writeheader()
+        writer.writerows(decodificar(registros[::-1]))
+    os.replace(tmp_path, csv_path)
+    return len(registros)
+
+
+def anteponer_csv(registros: np.ndarray, csv_path: str = CSV_PATH) -> None:
+    """
+    Agrega al principio de sismos.csv los registros recién ingresados (el más
+    antiguo primero, como los devuelve agregar()).
+
+    El resto del archivo se copia byte a byte, sin parsearlo.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"No se encontró {csv_path}: regenerarlo con exportar_csv()")
+    terminator = _line_terminator(csv_path)
+    tmp_path = f"{csv_path}.tmp"
+    with open(csv_path, "rb") as src, open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+        header = src.readline()
+        writer = csv.DictWriter(dst, fieldnames=CSV_FIELDNAMES, lineterminator=terminator)
+        dst.write(header.decode("utf-8"))
+        writer.writerows(decodificar(registros[::-1]))
+        dst.flush()
+        shutil.copyfileobj(src, dst.buffer, 1 << 20)
+    os.replace(tmp_path, csv_path)
+
+
+def _orden(epochs: np.ndarray, ordenado: bool, ultimo: int) -> Tuple[bool, int]:
+    """Estado de orden del registro después de agregar epochs."""
+    validos = epochs[epochs != EPOCH_INVALIDO]
+    if len(validos) == 0:
+        return ordenado and len(epochs) == 0, ultimo
+    # Los eventos sin fecha también rompen el orden (quedan antes que todos en epoch)
+    ordenado = (
+        ordenado
+        and len(validos) == len(epochs)
+        and bool(np.all(np.diff(validos) >= 0))
+        and (ultimo == EPOCH_INVALIDO or int(validos[0]) >= ultimo)
+    )
+    return ordenado, max(ultimo, int(validos.max()))
+
+
+def _pack_header(cantidad: int, ordenado: bool, ultimo_epoch: int) -> bytes:
+    header = HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, cantidad, int(ordenado), ultimo_epoch)
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def _read_header(path: str) -> Dict[str, object]:
+    with open(path, "rb") as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_STRUCT.size:
+        raise ValueError(f"{path} no es un registro {MAGIC.decode()}")
+    magic, version, record_size, cantidad, ordenado, ultimo = HEADER_STRUCT.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} no es un registro {MAGIC.decode()}")
+    if version != FORMAT_VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"Versión de registro no soportada: {version} (registro de {record_size} bytes)")
+    return {"cantidad": cantidad, "ordenado": bool(ordenado), "ultimo_epoch": ultimo}
+
+
+def _epoch(moment: datetime) -> int:
+    return calendar.timegm(moment.timetuple())
+
+
+def _float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _texto(value: Optional[str], width: int) -> bytes:
+    """Texto en UTF-8 recortado a width bytes sin partir un carácter."""
+    encoded = (value or "").encode("utf-8")
+    if len(encoded) <= width:
+        return encoded
+    return encoded[:width].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _decode(value: bytes) -> str:
+    return value.decode("utf-8")
+
+
+def _line_terminator(csv_path: str) -> str:
+    """Fin de línea del CSV existente (se conserva al reescribirlo)."""
+    try:
+        with open(csv_path, "rb") as f:
+            return "\r\n" if f.readline().endswith(b"\r\n") else "\n"
+    except FileNotFoundError:
+        return "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro binario de sismos")
+    parser.add_argument("--importar", action="store_true", help="crear el registro a partir de sismos.csv")
+    parser.add_argument("--exportar-csv", action="store_true", help="regenerar sismos.csv desde el registro")
+    args = parser.parse_args()
+
+    if args.importar:
+        n = importar_csv()
+        print(f"✅ Registro creado: {n} eventos -> {LOG_PATH}")
+    elif args.exportar_csv:
+        n = exportar_csv()
+        print(f"✅ sismos.csv regenerado: {n} eventos -> {CSV_PATH}")
+    else:
+        print(f"📊 {contar()} eventos en {LOG_PATH} (orden cronológico: {'sí' if esta_ordenado() else 'no'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,70 @@
 """
 Actualizar sismos - Scraping diario desde INPRES últimos sismos.
-Scrapea http://contenidos.inpres.gob.ar/sismologia/xultimos
-y prepone los nuevos sismos al archivo sismos.csv
+Scrapea http://contenidos.inpres.gob.ar/sismologia/xultimos,
+agrega los nuevos sismos al final del registro binario (sismos_registros.bin)
+y los prepone a sismos.csv sin releer el histórico.
+
+La página es estática: por defecto se descarga con un cliente HTTP y se parsea
+con lxml en una sola pasada. Con --selenium se usa Chrome headless (por si la
+página pasara a generarse con JavaScript); el HTML renderizado se parsea igual.
+
+Uso:
+    python actualizar_sismos.py [--selenium]
 """
-import csv
+import argparse
 import os
+import sys
+import time
 from datetime import datetime
+from typing import Dict, List
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import requests
+from lxml import html as lxml_html
 
 
 # ── Configuración ──────────────────────────────────────────────
 ULTIMOS_URL = "http://contenidos.inpres.gob.ar/sismologia/xultimos"
 
+# Timeout de la descarga HTTP (conexión, lectura) en segundos
+HTTP_TIMEOUT = (10, 30)
+HTTP_HEADERS = {"User-Agent": "inpres-sismos (+https://github.com/LuisOVaras/inpres-sismos)"}
+
 # Ruta al CSV principal
 OUTPUT_FILE = os.path.join(
     os.path.dirname(__file__), "..", "..", "..", "data", "sismos.csv"
 )
 OUTPUT_FILE = os.path.abspath(OUTPUT_FILE)
 
+# Registro binario: fuente de verdad de la ingesta (ver registros.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from inpres_sismos import registros  # noqa: E402
+
+LOG_FILE = registros.LOG_PATH
+
 CURRENT_YEAR = datetime.now().year
 
+# Colores del número de sismo que indican que fue sentido
+SENTIDO_COLORS = ("#f00", "#ff0000", "red")
+
+
+def fetch_ultimos_http(url: str = ULTIMOS_URL) -> bytes:
+    """Descarga la página de últimos sismos (bytes crudos: lxml detecta la codificación)."""
+    response = requests.get(url, headers=HTTP_HEADERS, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.content
 
-def scrape_ultimos(driver):
+
+def parse_ultimos_html(page) -> List[Dict[str, str]]:
     """
-    Scrapea la tabla de últimos sismos.
-    
+    Parsea la tabla de últimos sismos en una sola pasada con lxml.
+
     La página tiene una estructura vertical especial:
     - Cada columna de datos está en un <div> con id específico
     - Dentro de cada div, hay <p> tags, uno por cada sismo
     - El color #f00 indica que el sismo fue sentido
-    
+
     IDs de los divs:
-      - #num: número
+      - #num: número (el color de su <font> indica sentido)
       - #dia: fecha (DD/MM)
       - #hora: hora (HH:MM)
       - #la: latitud
@@ -45,71 +72,53 @@ def scrape_ultimos(driver):
       - #mg: magnitud
       - #prof: profundidad (con " Km")
       - #provincia: provincia (con links)
+
+    Args:
+        page: HTML de la página (bytes o str).
     """
-    sismos = []
+    tree = lxml_html.fromstring(page)
 
-    try:
-        # Esperar a que la tabla cargue
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.ID, "dia"))
-        )
-    except Exception:
-        print("ERROR: No se pudo cargar la tabla de últimos sismos.")
-        return sismos
+    def paragraphs(div_id):
+        return tree.xpath(f'//div[@id="{div_id}"]//p')
 
-    # Extraer cada columna como lista de textos
     def get_column_data(div_id):
-        """Extrae los textos de los <p> dentro del div con el id dado."""
-        try:
-            div = driver.find_element(By.ID, div_id)
-            paragraphs = div.find_elements(By.TAG_NAME, "p")
-            return [p.text.strip() for p in paragraphs]
-        except Exception:
-            return []
+        """Textos de los <p> dentro del div con el id dado (espacios normalizados, como Selenium)."""
+        return [" ".join(p.text_content().split()) for p in paragraphs(div_id)]
 
     def get_column_colors(div_id):
-        """Extrae los colores de los <font> dentro de cada <p> del div."""
-        try:
-            div = driver.find_element(By.ID, div_id)
-            paragraphs = div.find_elements(By.TAG_NAME, "p")
-            colors = []
-            for p in paragraphs:
-                try:
-                    font = p.find_element(By.TAG_NAME, "font")
-                    color = font.get_attribute("color") or "#000"
-                    colors.append(color.lower())
-                except Exception:
-                    colors.append("#000")
-            return colors
-        except Exception:
-            return []
+        """Colores del primer <font> de cada <p> del div."""
+        colors = []
+        for p in paragraphs(div_id):
+            font = p.find(".//font")
+            color = font.get("color") if font is not None else None
+            colors.append((color or "#000").lower())
+        return colors
 
     def get_provincia_texts(div_id):
-        """Extrae los textos de provincia desde los links."""
-        try:
-            div = driver.find_element(By.ID, div_id)
-            paragraphs = div.find_elements(By.TAG_NAME, "p")
-            provincias = []
-            for p in paragraphs:
-                try:
-                    link = p.find_element(By.TAG_NAME, "a")
-                    font = link.find_element(By.TAG_NAME, "font")
-                    provincias.append(font.text.strip())
-                except Exception:
-                    provincias.append(p.text.strip())
-            return provincias
-        except Exception:
-            return []
+        """Textos de provincia desde los links (o el texto del <p> si no hay link)."""
+        provincias = []
+        for p in paragraphs(div_id):
+            font = p.find(".//a//font")
+            node = font if font is not None else p
+            provincias.append(" ".join(node.text_content().split()))
+        return provincias
+
+    return build_sismos(
+        dias=get_column_data("dia"),
+        horas=get_column_data("hora"),
+        latitudes=get_column_data("la"),
+        longitudes=get_column_data("lo"),
+        magnitudes=get_column_data("mg"),
+        profundidades=get_column_data("prof"),
+        provincias=get_provincia_texts("provincia"),
+        colores=get_column_colors("num"),
+    )
+
 
-    # Extraer columnas
-    dias = get_column_data("dia")
-    horas = get_column_data("hora")
-    latitudes = get_column_data("la")
-    longitudes = get_column_data("lo")
-    magnitudes = get_column_data("mg")
-    profundidades = get_column_data("prof")
-    provincias = get_provincia_texts("provincia")
-    colores = get_column_colors("num")  # el color del número indica sentido
+def build_sismos(dias, horas, latitudes, longitudes, magnitudes, profundidades,
+                 provincias, colores) -> List[Dict[str, str]]:
+    """Arma las filas del CSV a partir de las columnas de la página."""
+    sismos = []
 
     # Determinar cuántos sismos hay
     n = min(len(dias), len(horas), len(latitudes), len(longitudes),
@@ -121,11 +130,7 @@ def scrape_ultimos(driver):
 
     for i in range(n):
         # Fecha: convertir DD/MM → DD/MM/YYYY
-        dia_raw = dias[i]  # ej: "11/02"
-        try:
-            fecha = f"{dia_raw}/{CURRENT_YEAR}"
-        except Exception:
-            fecha = dia_raw
+        fecha = f"{dias[i]}/{CURRENT_YEAR}"
 
         # Hora: agregar :00 para segundos (HH:MM → HH:MM:00)
         hora = f"{horas[i]}:00" if horas[i] else ""
@@ -135,7 +140,7 @@ def scrape_ultimos(driver):
 
         # Sentido: basado en el color (#f00 = rojo = sentido)
         sentido = "No"
-        if i < len(colores) and colores[i] in ("#f00", "#ff0000", "red"):
+        if i < len(colores) and colores[i] in SENTIDO_COLORS:
             sentido = "Si"
 
         sismo = {
@@ -153,14 +158,18 @@ def scrape_ultimos(driver):
     return sismos
 
 
-def main():
-    print("=" * 60)
-    print("INPRES - Actualización diaria de sismos")
-    print(f"Fuente: {ULTIMOS_URL}")
-    print(f"Destino: {OUTPUT_FILE}")
-    print("=" * 60)
+def scrape_ultimos_selenium(url: str = ULTIMOS_URL) -> List[Dict[str, str]]:
+    """
+    Abre la página en Chrome headless, espera a que cargue la tabla y parsea
+    el HTML renderizado con parse_ultimos_html (sin un round trip por celda).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
 
-    # Configurar Selenium
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -170,47 +179,72 @@ def main():
     driver = webdriver.Chrome(
         service=Service(ChromeDriverManager().install()), options=options
     )
-
     try:
-        print("\n[1] Navegando a últimos sismos...")
-        driver.get(ULTIMOS_URL)
-
-        print("[2] Scrapeando datos...")
-        nuevos_sismos = scrape_ultimos(driver)
-        print(f"    Encontrados: {len(nuevos_sismos)} sismos")
-
+        driver.get(url)
+        try:
+            # Esperar a que la tabla cargue
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.ID, "dia"))
+            )
+        except Exception:
+            print("ERROR: No se pudo cargar la tabla de últimos sismos.")
+            return []
+        return parse_ultimos_html(driver.page_source)
     finally:
         driver.quit()
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualización diaria desde INPRES últimos sismos")
+    parser.add_argument("--selenium", action="store_true", help="usar Chrome headless en lugar de HTTP")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("INPRES - Actualización diaria de sismos")
+    print(f"Fuente: {ULTIMOS_URL} ({'Selenium' if args.selenium else 'HTTP'})")
+    print(f"Destino: {OUTPUT_FILE}")
+    print("=" * 60)
+
+    print("\n[1-2] Descargando y parseando últimos sismos...")
+    start = time.perf_counter()
+    if args.selenium:
+        nuevos_sismos = scrape_ultimos_selenium()
+    else:
+        nuevos_sismos = parse_ultimos_html(fetch_ultimos_http())
+    elapsed = time.perf_counter() - start
+    print(f"    Encontrados: {len(nuevos_sismos)} sismos ({elapsed:.2f} s)")
+
     if not nuevos_sismos:
         print("No se obtuvieron datos nuevos.")
         return
 
-    # Leer CSV existente
-    print("[3] Leyendo CSV existente...")
-    existing_data = []
-    try:
-        with open(OUTPUT_FILE, mode="r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            existing_data = list(reader)
-        print(f"    Datos existentes: {len(existing_data)} registros")
-    except FileNotFoundError:
-        print("    Archivo no encontrado, se creará uno nuevo.")
-
-    # Crear set de claves únicas para evitar duplicados
-    existing_keys = set()
-    for row in existing_data:
-        key = (row.get("fecha", ""), row.get("hora", ""),
-               row.get("latitud", ""), row.get("longitud", ""))
-        existing_keys.add(key)
+    # El registro se crea una sola vez a partir del CSV histórico
+    if not os.path.exists(LOG_FILE):
+        print("[3] Creando registro binario desde el CSV existente...")
+        if os.path.exists(OUTPUT_FILE):
+            registros.importar_csv(OUTPUT_FILE, LOG_FILE)
+        else:
+            print("    Archivo no encontrado, se creará uno nuevo.")
+            registros.crear(LOG_FILE)
+            registros.exportar_csv(LOG_FILE, OUTPUT_FILE)
+
+    # Claves únicas de los eventos ya registrados en el período scrapeado
+    # (solo se leen los registros finales, no el histórico)
+    epochs = [registros.epoch_de_texto(s["fecha"], s["hora"]) for s in nuevos_sismos]
+    validos = [e for e in epochs if e != registros.EPOCH_INVALIDO]
+    desde = min(validos) if validos else registros.EPOCH_INVALIDO
+    existing_keys = registros.claves_recientes(LOG_FILE, desde)
+    print(f"[3] Registros existentes: {registros.contar(LOG_FILE)} "
+          f"({len(existing_keys)} en el período scrapeado)")
 
     # Filtrar solo sismos nuevos (no duplicados)
     sismos_nuevos_filtrados = []
     for sismo in nuevos_sismos:
-        key = (sismo["fecha"], sismo["hora"],
-               sismo["latitud"], sismo["longitud"])
+        # Misma clave que guarda el registro (textos largos se truncan)
+        key = registros.clave(sismo)
         if key not in existing_keys:
             sismos_nuevos_filtrados.append(sismo)
+            existing_keys.add(key)
 
     print(f"    Sismos nuevos (sin duplicados): {len(sismos_nuevos_filtrados)}")
 
@@ -218,22 +252,14 @@ def main():
         print("No hay sismos nuevos para agregar.")
         return
 
-    # Preponer nuevos datos al inicio del CSV
-    all_data = sismos_nuevos_filtrados + existing_data
-
-    print(f"[4] Guardando {len(all_data)} registros totales...")
-    fieldnames = [
-        "fecha", "hora", "latitud", "longitud",
-        "profundidad", "magnitud", "provincia", "sentido",
-    ]
-    with open(OUTPUT_FILE, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_data)
+    # La página lista el más reciente primero; el registro guarda el más antiguo primero
+    print(f"[4] Agregando {len(sismos_nuevos_filtrados)} registros...")
+    escritos = registros.agregar(LOG_FILE, sismos_nuevos_filtrados[::-1])
+    registros.anteponer_csv(escritos, OUTPUT_FILE)
 
     print(f"\n¡Actualización completada!")
     print(f"  Nuevos sismos agregados: {len(sismos_nuevos_filtrados)}")
-    print(f"  Total registros: {len(all_data)}")
+    print(f"  Total registros: {registros.contar(LOG_FILE)}")
 
 
 if __name__ == "__main__":
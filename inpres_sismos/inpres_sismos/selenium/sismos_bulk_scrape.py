@@ -1,14 +1,18 @@
 """
 Bulk scraper para INPRES - contenidos.inpres.gob.ar/buscar_sismo
-Scrapea sismos desde 09/09/2025 hasta la fecha actual,
-dividiendo en rangos de 20 dias para evitar el limite de 500 resultados.
-Vuelve al formulario con "Realizar otra busqueda" entre cada rango.
-Guarda los resultados acumulados en data/sismos_nuevos.csv
+Scrapea sismos desde 09/09/2025 hasta la fecha actual.
+Los rangos de fechas los arma el planificador adaptativo (inpres_sismos/planificador.py):
+se alargan en periodos tranquilos y se dividen cuando una busqueda llega al
+limite de 500 resultados. Vuelve al formulario con "Realizar otra busqueda" entre cada rango.
+
+Cada rango terminado se registra en un journal (data/sismos_nuevos.journal.jsonl):
+si el proceso se corta, al volver a ejecutarlo continua desde el primer rango
+incompleto. Al final se compacta el journal en data/sismos_nuevos.csv
 """
 import time
-import csv
 import os
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -27,13 +31,17 @@ from webdriver_manager.chrome import ChromeDriverManager
 SEARCH_URL = "http://contenidos.inpres.gob.ar/buscar_sismo"
 FECHA_INICIO_GLOBAL = datetime(2025, 9, 9)
 FECHA_FIN_GLOBAL = datetime.now()
-DIAS_POR_RANGO = 20  # dias por cada busqueda
 
 # Ruta al CSV de salida
 carpeta_data = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
 )
 OUTPUT_FILE = os.path.join(carpeta_data, "sismos_nuevos.csv")
+JOURNAL_FILE = os.path.join(carpeta_data, "sismos_nuevos.journal.jsonl")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from inpres_sismos.journal import Journal  # noqa: E402
+from inpres_sismos.planificador import PlanificadorRangos  # noqa: E402
 
 
 # -- Funciones auxiliares --
@@ -201,31 +209,34 @@ def go_back_to_search(driver):
     return True
 
 
-def generate_date_ranges(start, end, days_per_range):
-    """Genera pares (inicio, fin) de rangos de fechas."""
-    ranges = []
-    current = start
-    while current < end:
-        range_end = min(current + timedelta(days=days_per_range - 1), end)
-        ranges.append((current, range_end))
-        current = range_end + timedelta(days=1)
-    return ranges
-
-
 # -- Script principal --
 
 def main():
-    date_ranges = generate_date_ranges(
-        FECHA_INICIO_GLOBAL, FECHA_FIN_GLOBAL, DIAS_POR_RANGO
-    )
+    inicio_global = FECHA_INICIO_GLOBAL.date()
+    fin_global = FECHA_FIN_GLOBAL.date()
+
+    # Retomar: solo se planifican los tramos que no quedaron registrados en el journal
+    journal = Journal(JOURNAL_FILE)
+    huecos = journal.huecos(inicio_global, fin_global)
+    planificador = PlanificadorRangos(huecos)
 
     print("=" * 60)
     print("INPRES Bulk Scraper - Multiples rangos de fechas")
-    print(f"Rango total: {FECHA_INICIO_GLOBAL.strftime('%d/%m/%Y')} -> {FECHA_FIN_GLOBAL.strftime('%d/%m/%Y')}")
-    print(f"Dividido en {len(date_ranges)} rangos de {DIAS_POR_RANGO} dias")
+    print(f"Rango total: {inicio_global.strftime('%d/%m/%Y')} -> {fin_global.strftime('%d/%m/%Y')}")
+    print("Rangos adaptativos segun la actividad del catalogo "
+          f"(~{len(planificador.plan())} busquedas estimadas)")
+    if journal.rangos:
+        print(f"Retomando: {len(journal.rangos)} rangos ya completos "
+              f"({journal.filas} sismos en el journal)")
+    print(f"Journal: {JOURNAL_FILE}")
     print(f"Guardando en: {OUTPUT_FILE}")
     print("=" * 60)
 
+    if not huecos:
+        total = journal.compactar(OUTPUT_FILE)
+        print(f"\nNo hay rangos pendientes. CSV compactado: {total} sismos -> {OUTPUT_FILE}")
+        return
+
     # Configurar el navegador
     options = webdriver.ChromeOptions()
     # options.add_argument("--headless")  # Descomentar para modo sin ventana
@@ -233,7 +244,7 @@ def main():
         service=Service(ChromeDriverManager().install()), options=options
     )
 
-    all_data = []
+    scraped = 0
 
     try:
         # Navegar al formulario inicial
@@ -241,11 +252,15 @@ def main():
         driver.get(SEARCH_URL)
         time.sleep(3)
 
-        for i, (rango_inicio, rango_fin) in enumerate(date_ranges, 1):
+        while True:
+            rango = planificador.siguiente()
+            if rango is None:
+                break
+            rango_inicio, rango_fin = rango
             inicio_str = rango_inicio.strftime("%Y-%m-%d")
             fin_str = rango_fin.strftime("%Y-%m-%d")
 
-            print(f"\n--- Rango {i}/{len(date_ranges)}: "
+            print(f"\n--- Busqueda {planificador.busquedas + 1}: "
                   f"{rango_inicio.strftime('%d/%m/%Y')} -> {rango_fin.strftime('%d/%m/%Y')} ---")
 
             # Llenar formulario y buscar
@@ -276,16 +291,22 @@ def main():
 
             # Scrapear todas las paginas de este rango
             range_data = scrape_all_pages(driver)
-            all_data.extend(range_data)
-            print(f"  Sismos en este rango: {len(range_data)} | Total acumulado: {len(all_data)}")
 
-            # Guardar progreso parcial en cada rango
-            if all_data:
-                save_to_csv(all_data)
-                print(f"  Progreso guardado ({len(all_data)} sismos)")
+            if planificador.registrar(rango, len(range_data)):
+                scraped += len(range_data)
+                print(f"  Sismos en este rango: {len(range_data)} | Total en esta ejecucion: {scraped}")
+                if rango in planificador.truncados:
+                    print("  ADVERTENCIA: un solo dia con el limite de resultados, puede estar incompleto")
+
+                # Checkpoint: solo se agregan las filas de este rango al journal
+                journal.registrar(rango_inicio, rango_fin, range_data)
+                print(f"  Rango registrado en el journal ({journal.filas} sismos)")
+            else:
+                print(f"  {len(range_data)} sismos: cerca del limite de resultados, "
+                      f"se divide el rango en dos")
 
             # Volver al formulario para el siguiente rango
-            if i < len(date_ranges):
+            if planificador.hay_pendientes():
                 print("  Volviendo al formulario...")
                 go_back_to_search(driver)
                 time.sleep(2)
@@ -295,28 +316,20 @@ def main():
     finally:
         driver.quit()
 
-    # Guardar final
-    if all_data:
-        save_to_csv(all_data)
-        print(f"\n{'=' * 60}")
-        print(f"SCRAPING COMPLETADO!")
-        print(f"Total de sismos scrapeados: {len(all_data)}")
-        print(f"Archivo: {OUTPUT_FILE}")
-        print(f"{'=' * 60}")
+    # Compactacion final del journal en el CSV
+    faltantes = journal.huecos(inicio_global, fin_global)
+    total = journal.compactar(OUTPUT_FILE)
+    print(f"\n{'=' * 60}")
+    if faltantes:
+        print(f"SCRAPING INCOMPLETO: {len(faltantes)} tramos pendientes "
+              f"(volver a ejecutar para retomarlos)")
     else:
-        print("\nNo se obtuvieron datos.")
-
-
-def save_to_csv(data):
-    """Guarda los datos en el CSV."""
-    fieldnames = [
-        "fecha", "hora", "latitud", "longitud",
-        "profundidad", "magnitud", "provincia", "sentido",
-    ]
-    with open(OUTPUT_FILE, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+        print(f"SCRAPING COMPLETADO!")
+    print(f"Busquedas: {planificador.busquedas} ({planificador.divisiones} rangos divididos)")
+    print(f"Sismos scrapeados en esta ejecucion: {scraped}")
+    print(f"Total de sismos en el CSV: {total}")
+    print(f"Archivo: {OUTPUT_FILE}")
+    print(f"{'=' * 60}")
 
 
 if __name__ == "__main__":
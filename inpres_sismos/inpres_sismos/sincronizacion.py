@@ -0,0 +1,319 @@
+"""
+sincronizacion.py
+
+Sincronización incremental de sismos.csv con la tabla sismos de Supabase, a
+través de su API PostgREST (/rest/v1).
+
+- Watermark: el (fecha, hora) más reciente de la tabla remota, combinado con el
+  guardado en data/supabase_sync.json. Se usa el menor de los dos, porque el
+  estado local solo avanza hasta el último lote confirmado sin huecos.
+- Solo se envían las filas con (fecha, hora) >= watermark. Un mismo segundo
+  puede tener más de un sismo, y el upsert por (fecha, hora, latitud, longitud)
+  hace que reenviar esas filas no duplique nada.
+- Las filas se agrupan en lotes acotados en filas y en bytes y se envían en
+  paralelo desde un pool de hilos. Cada hilo reutiliza su propia sesión HTTP
+  (keep-alive).
+- Los errores transitorios (conexión, timeout, 429 y 5xx) se reintentan con
+  backoff exponencial con jitter. Los demás errores HTTP fallan el lote.
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'sismos.csv'))
+STATE_PATH = os.path.normpath(os.path.join(base_dir, '..', '..', 'data', 'supabase_sync.json'))
+
+TABLA = "sismos"
+ON_CONFLICT = "fecha,hora,latitud,longitud"
+COLUMNAS = ["fecha", "hora", "latitud", "longitud", "profundidad", "magnitud", "provincia", "sentido"]
+
+# Límites de cada lote enviado en un POST
+LOTE_FILAS = 500
+LOTE_BYTES = 512 * 1024
+# Lotes enviados en paralelo
+HILOS = 4
+
+# Reintentos con backoff exponencial: BACKOFF_BASE * 2^(intento - 1), con jitter y tope BACKOFF_MAX
+MAX_REINTENTOS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+TIMEOUT = 30
+ESTADOS_REINTENTABLES = {408, 425, 429, 500, 502, 503, 504}
+
+VALORES_SENTIDO = ["si", "sí", "yes", "1", "true"]
+
+Watermark = Tuple[str, str]
+
+
+class ErrorPostgrest(RuntimeError):
+    """Error de una petición a PostgREST (status es None si no hubo respuesta HTTP)."""
+
+    def __init__(self, mensaje: str, status: Optional[int] = None):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class ClientePostgrest:
+    """
+    Cliente mínimo de PostgREST para una tabla, seguro para usar desde varios hilos.
+
+    Args:
+        url: URL del proyecto (SUPABASE_URL); las peticiones van a {url}/rest/v1/{tabla}.
+        key: clave de servicio, enviada como apikey y como Bearer token.
+        dormir: función de espera entre reintentos (reemplazable en tests).
+    """
+
+    def __init__(self, url: str, key: str, tabla: str = TABLA, timeout: float = TIMEOUT,
+                 max_reintentos: int = MAX_REINTENTOS, backoff_base: float = BACKOFF_BASE,
+                 dormir: Callable[[float], None] = time.sleep):
+        self.endpoint = f"{url.rstrip('/')}/rest/v1/{tabla}"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+        self.timeout = timeout
+        self.max_reintentos = max_reintentos
+        self.backoff_base = backoff_base
+        self.dormir = dormir
+        self.reintentos = 0
+        self._local = threading.local()
+        self._sesiones: List[requests.Session] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            for sesion in self._sesiones:
+                sesion.close()
+            self._sesiones.clear()
+
+    def watermark(self) -> Optional[Watermark]:
+        """(fecha, hora) del sismo más reciente de la tabla, o None si está vacía."""
+        resp = self._pedir("GET", params={"select": "fecha,hora", "order": "fecha.desc,hora.desc", "limit": "1"})
+        filas = resp.json()
+        if not filas:
+            return None
+        return str(filas[0]["fecha"]), str(filas[0]["hora"])
+
+    def upsert(self, cuerpo: bytes) -> None:
+        """Envía un arreglo JSON de filas como upsert por (fecha, hora, latitud, longitud)."""
+        self._pedir(
+            "POST",
+            params={"on_conflict": ON_CONFLICT},
+            data=cuerpo,
+            headers={
+                "Content-Type": "application/json",
+                "Prefer": "resolution=merge-duplicates,return=minimal",
+            },
+        )
+
+    def _sesion(self) -> requests.Session:
+        # Una sesión por hilo: cada una mantiene su conexión abierta entre lotes
+        sesion = getattr(self._local, "sesion", None)
+        if sesion is None:
+            sesion = requests.Session()
+            sesion.headers.update(self.headers)
+            self._local.sesion = sesion
+            with self._lock:
+                self._sesiones.append(sesion)
+        return sesion
+
+    def _pedir(self, metodo: str, **kwargs) -> requests.Response:
+        intento = 0
+        while True:
+            espera = None
+            try:
+                resp = self._sesion().request(metodo, self.endpoint, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = ErrorPostgrest(f"{metodo} {self.endpoint}: {e}")
+            else:
+                if resp.status_code < 400:
+                    return resp
+                error = ErrorPostgrest(
+                    f"{metodo} {self.endpoint}: HTTP {resp.status_code} {resp.text[:200]}", resp.status_code,
+                )
+                if resp.status_code not in ESTADOS_REINTENTABLES:
+                    raise error
+                espera = _retry_after(resp)
+
+            intento += 1
+            if intento > self.max_reintentos:
+                raise error
+            with self._lock:
+                self.reintentos += 1
+            backoff = min(BACKOFF_MAX, self.backoff_base * 2 ** (intento - 1)) * random.uniform(0.5, 1.0)
+            self.dormir(max(backoff, espera or 0.0))
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    try:
+        return min(BACKOFF_MAX, float(resp.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+@dataclass
+class ResultadoSync:
+    """Resumen de una sincronización."""
+    watermark: Optional[Watermark]
+    filas: int = 0
+    lotes: int = 0
+    lotes_fallidos: int = 0
+    reintentos: int = 0
+    segundos: float = 0.0
+    nuevo_watermark: Optional[Watermark] = None
+    errores: List[str] = field(default_factory=list)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos > 0 else 0.0
+
+
+def preparar_registros(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de sismos.csv al formato de la tabla remota (fecha
+    ISO, números o None, sentido booleano), columna por columna. Descarta las
+    filas sin fecha u hora y ordena del sismo más antiguo al más reciente.
+    """
+    hora = df["hora"].astype("string").str.strip()
+    registros = pd.DataFrame({
+        "fecha": pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce").dt.strftime("%Y-%m-%d"),
+        "hora": hora.where(hora != ""),
+        "latitud": _numero(df["latitud"]),
+        "longitud": _numero(df["longitud"]),
+        "profundidad": _texto(df["profundidad"]),
+        "magnitud": _numero(df["magnitud"]),
+        "provincia": _texto(df["provincia"]),
+        "sentido": df["sentido"].astype("string").str.strip().str.lower().isin(VALORES_SENTIDO),
+    })
+    registros = registros[registros["fecha"].notna() & registros["hora"].notna()]
+    return registros.sort_values(["fecha", "hora"], kind="stable")
+
+
+def _numero(col: pd.Series) -> pd.Series:
+    valores = pd.to_numeric(col, errors="coerce").astype("float64")
+    return valores.where(np.isfinite(valores))
+
+
+def _texto(col: pd.Series) -> pd.Series:
+    texto = col.astype("string").str.strip()
+    return texto.where(texto != "")
+
+
+def serializar(registros: pd.DataFrame) -> List[bytes]:
+    """Una fila JSON (en bytes UTF-8) por registro; los faltantes van como null."""
+    columnas = [registros[c].astype(object).where(registros[c].notna(), None).tolist() for c in COLUMNAS]
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    return [encode(dict(zip(COLUMNAS, valores))).encode("utf-8") for valores in zip(*columnas)]
+
+
+def agrupar_lotes(filas: Sequence[bytes], max_filas: int = LOTE_FILAS,
+                  max_bytes: int = LOTE_BYTES) -> List[Tuple[int, int]]:
+    """Cortes [inicio, fin) de lotes con a lo sumo max_filas filas y max_bytes bytes de cuerpo."""
+    lotes = []
+    inicio = 0
+    tamano = 2  # corchetes del arreglo
+    for i, fila in enumerate(filas):
+        extra = len(fila) + (1 if i > inicio else 0)
+        if i > inicio and (i - inicio >= max_filas or tamano + extra > max_bytes):
+            lotes.append((inicio, i))
+            inicio, tamano, extra = i, 2, len(fila)
+        tamano += extra
+    if inicio < len(filas):
+        lotes.append((inicio, len(filas)))
+    return lotes
+
+
+def leer_estado(path: str = STATE_PATH) -> Optional[Watermark]:
+    """Watermark guardado por la última sincronización (None si no hay estado)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        return estado["watermark"]["fecha"], estado["watermark"]["hora"]
+    except (FileNotFoundError, KeyError, TypeError, ValueError):
+        return None
+
+
+def guardar_estado(watermark: Watermark, filas: int, path: str = STATE_PATH) -> None:
+    estado = {
+        "watermark": {"fecha": watermark[0], "hora": watermark[1]},
+        "filas": filas,
+        "actualizado": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def sincronizar(df: pd.DataFrame, cliente: ClientePostgrest, estado_path: str = STATE_PATH,
+                max_filas: int = LOTE_FILAS, max_bytes: int = LOTE_BYTES,
+                hilos: int = HILOS) -> ResultadoSync:
+    """
+    Envía a Supabase las filas de df posteriores al watermark.
+
+    Returns:
+        ResultadoSync con filas enviadas, lotes, reintentos y tiempo total.
+    """
+    inicio = time.perf_counter()
+    local = leer_estado(estado_path)
+    try:
+        remoto = cliente.watermark()
+        # Tabla remota vacía: se envía todo, aunque haya estado local
+        watermark = min(remoto, local) if remoto and local else remoto
+    except ErrorPostgrest as e:
+        print(f"[WARN] No se pudo leer el watermark remoto ({e}); se usa el estado local")
+        watermark = local
+
+    registros = preparar_registros(df)
+    if watermark:
+        fecha, hora = registros["fecha"], registros["hora"]
+        registros = registros[(fecha > watermark[0]) | ((fecha == watermark[0]) & (hora >= watermark[1]))]
+
+    resultado = ResultadoSync(watermark=watermark)
+    filas = serializar(registros)
+    lotes = agrupar_lotes(filas, max_filas, max_bytes)
+    resultado.lotes = len(lotes)
+
+    fallidos: Dict[int, str] = {}
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        futuros = {
+            pool.submit(cliente.upsert, b"[" + b",".join(filas[a:b]) + b"]"): i
+            for i, (a, b) in enumerate(lotes)
+        }
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                futuro.result()
+            except ErrorPostgrest as e:
+                fallidos[i] = str(e)
+            else:
+                a, b = lotes[i]
+                resultado.filas += b - a
+
+    # El watermark local solo avanza hasta el último lote sin fallidos anteriores
+    confirmados = min(fallidos) if fallidos else len(lotes)
+    if confirmados:
+        ultima = registros.iloc[lotes[confirmados - 1][1] - 1]
+        resultado.nuevo_watermark = (ultima["fecha"], ultima["hora"])
+        guardar_estado(resultado.nuevo_watermark, resultado.filas, estado_path)
+
+    resultado.lotes_fallidos = len(fallidos)
+    resultado.errores = [fallidos[i] for i in sorted(fallidos)]
+    resultado.reintentos = cliente.reintentos
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
@@ -0,0 +1,219 @@
+"""
+Spider de carga masiva desde contenidos.inpres.gob.ar/buscar_sismo.
+
+Reemplaza el recorrido secuencial de selenium/sismos_bulk_scrape.py: envía el
+formulario de búsqueda por HTTP para muchos rangos de fechas a la vez, usando
+el motor asíncrono de Scrapy con límite de concurrencia por dominio y
+AutoThrottle. Cada rango usa su propia sesión (cookiejar), así las búsquedas
+concurrentes no se pisan entre sí.
+
+La tabla de resultados (#tableFiltro) se pagina del lado del cliente: la
+respuesta del formulario ya trae todas las filas, así que no hay que recorrer
+páginas con "Siguiente".
+
+Los rangos los arma el planificador adaptativo (inpres_sismos/planificador.py)
+a partir de la actividad del catálogo; si una búsqueda vuelve con una cantidad
+cercana al límite de resultados, se descarta y se piden sus dos mitades.
+Con -a dias=N se usan rangos fijos de N días (también divididos si llegan al límite).
+
+Uso (desde inpres_sismos/):
+    scrapy crawl buscar_sismo -a desde=2025-09-09 -a hasta=2026-02-12
+
+Guarda los resultados en data/sismos_nuevos.csv, con las mismas columnas que sismos.csv.
+"""
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import scrapy
+
+from inpres_sismos.planificador import (
+    CSV_PATH,
+    LIMITE_RESULTADOS,
+    EstimadorTasa,
+    cerca_del_limite,
+    dividir,
+    eventos_por_dia,
+    planificar,
+)
+
+SEARCH_URL = "http://contenidos.inpres.gob.ar/buscar_sismo"
+FECHA_INICIO_GLOBAL = date(2025, 9, 9)
+DIAS_POR_RANGO = 20  # dias por cada busqueda (solo con -a dias=N)
+
+OUTPUT_FILE = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "sismos_nuevos.csv",
+))
+
+FIELDNAMES = [
+    "fecha", "hora", "latitud", "longitud",
+    "profundidad", "magnitud", "provincia", "sentido",
+]
+
+
+def generate_date_ranges(start: date, end: date, days_per_range: int) -> List[Tuple[date, date]]:
+    """Genera pares (inicio, fin) de rangos de fechas, ambos incluidos."""
+    ranges = []
+    current = start
+    while current <= end:
+        range_end = min(current + timedelta(days=days_per_range - 1), end)
+        ranges.append((current, range_end))
+        current = range_end + timedelta(days=1)
+    return ranges
+
+
+def parse_row(row: scrapy.Selector) -> Optional[Dict[str, str]]:
+    """
+    Parsea una fila <tr> de #tableFiltro con las mismas transformaciones que
+    parse_row de selenium/sismos_bulk_scrape.py.
+    Columnas: #, datetime, lat, lon, depth, mag, intensity, province
+    """
+    cells = row.xpath("./td")
+    if len(cells) < 8:
+        return None
+
+    datetime_str = _cell_text(cells[1])
+    latitud = _cell_text(cells[2])
+    longitud = _cell_text(cells[3])
+    profundidad_raw = _cell_text(cells[4])
+    magnitud = _cell_text(cells[5])
+    intensidad = _cell_text(cells[6])
+
+    link = cells[7].xpath("./a")
+    provincia = _cell_text(link[0]) if link else _cell_text(cells[7])
+
+    # Transformaciones al formato CSV
+    try:
+        dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
+        fecha = dt.strftime("%d/%m/%Y")
+        hora = dt.strftime("%H:%M:%S")
+    except ValueError:
+        fecha = datetime_str
+        hora = ""
+
+    profundidad = f"{profundidad_raw} Km" if profundidad_raw else ""
+    sentido = "Si" if intensidad else "No"
+
+    return {
+        "fecha": fecha,
+        "hora": hora,
+        "latitud": latitud,
+        "longitud": longitud,
+        "profundidad": profundidad,
+        "magnitud": magnitud,
+        "provincia": provincia,
+        "sentido": sentido,
+    }
+
+
+def _cell_text(cell: scrapy.Selector) -> str:
+    """Texto visible de una celda, con los espacios normalizados (como .text en Selenium)."""
+    return " ".join(" ".join(cell.xpath(".//text()").getall()).split())
+
+
+class BuscarSismoSpider(scrapy.Spider):
+    name = "buscar_sismo"
+    allowed_domains = ["contenidos.inpres.gob.ar"]
+
+    custom_settings = {
+        # Presupuesto de cortesía: pocas conexiones simultáneas y AutoThrottle
+        # ajustando la demora según la latencia del servidor
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
+        "DOWNLOAD_DELAY": 0.5,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 1.0,
+        "AUTOTHROTTLE_MAX_DELAY": 30.0,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 2.0,
+        "RETRY_TIMES": 3,
+        "DOWNLOAD_TIMEOUT": 60,
+        # Salida propia (sin heredar el FEED_URI de historicos)
+        "FEED_URI": None,
+        "FEED_FORMAT": None,
+        "FEEDS": {
+            OUTPUT_FILE: {
+                "format": "csv",
+                "encoding": "utf-8",
+                "fields": FIELDNAMES,
+                "overwrite": True,
+            },
+        },
+    }
+
+    def __init__(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                 dias: Optional[int] = None, catalogo: str = CSV_PATH, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.desde = date.fromisoformat(desde) if desde else FECHA_INICIO_GLOBAL
+        self.hasta = date.fromisoformat(hasta) if hasta else date.today()
+        if dias:
+            self.date_ranges = generate_date_ranges(self.desde, self.hasta, int(dias))
+        else:
+            estimador = EstimadorTasa(eventos_por_dia(catalogo))
+            self.date_ranges = planificar([(self.desde, self.hasta)], estimador)
+        self.divisiones = 0
+        self._cookiejars = 0
+
+    def start_requests(self) -> Iterator[scrapy.Request]:
+        self.logger.info(
+            f"Rango total: {self.desde} -> {self.hasta}, dividido en {len(self.date_ranges)} rangos"
+        )
+        for inicio, fin in self.date_ranges:
+            yield self._search_request(inicio, fin)
+
+    def _search_request(self, inicio: date, fin: date) -> scrapy.Request:
+        # Un cookiejar por rango: cada búsqueda tiene su propia sesión
+        cookiejar = self._cookiejars
+        self._cookiejars += 1
+        return scrapy.Request(
+            SEARCH_URL,
+            callback=self.parse_form,
+            dont_filter=True,
+            meta={"cookiejar": cookiejar, "rango": (inicio, fin)},
+        )
+
+    def parse_form(self, response) -> Iterator[scrapy.FormRequest]:
+        """Completa y envía el formulario de búsqueda para el rango de la request."""
+        inicio, fin = response.meta["rango"]
+        desde_name = response.css("#datepicker::attr(name)").get("datepicker")
+        hasta_name = response.css("#datepicker2::attr(name)").get("datepicker2")
+        tilde_value = response.css("input[name=tilde1]::attr(value)").get("on")
+        yield scrapy.FormRequest.from_response(
+            response,
+            formxpath='//form[.//*[@id="datepicker"]]',
+            formdata={
+                desde_name: inicio.isoformat(),
+                hasta_name: fin.isoformat(),
+                "tilde1": tilde_value,
+            },
+            callback=self.parse_results,
+            dont_filter=True,
+            meta={"cookiejar": response.meta["cookiejar"], "rango": (inicio, fin)},
+        )
+
+    def parse_results(self, response) -> Iterator[Union[Dict[str, str], scrapy.Request]]:
+        """
+        Extrae los sismos de #tableFiltro. Si la cantidad está en el límite de
+        resultados (o cerca), el resultado puede estar truncado: se descarta y
+        se buscan las dos mitades del rango.
+        """
+        inicio, fin = response.meta["rango"]
+        items = [data for data in map(parse_row, response.css("#tableFiltro tbody tr")) if data]
+        count = len(items)
+
+        if cerca_del_limite(count):
+            mitades = dividir((inicio, fin))
+            if len(mitades) == 2:
+                self.divisiones += 1
+                self.logger.info(
+                    f"Rango {inicio} -> {fin}: {count} sismos, cerca del límite de "
+                    f"{LIMITE_RESULTADOS}; se divide en {mitades[0][1]} / {mitades[1][0]}"
+                )
+                for mitad_inicio, mitad_fin in mitades:
+                    yield self._search_request(mitad_inicio, mitad_fin)
+                return
+            self.logger.warning(
+                f"Rango {inicio} -> {fin}: un solo día con {count} sismos; "
+                f"puede faltar alguno (límite de {LIMITE_RESULTADOS} resultados)"
+            )
+
+        self.logger.info(f"Rango {inicio} -> {fin}: {count} sismos")
+        yield from items
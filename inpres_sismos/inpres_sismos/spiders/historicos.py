@@ -1,7 +1,15 @@
 import scrapy
 from datetime import datetime
 import locale
-locale.setlocale(locale.LC_TIME, 'es_ES')
+
+# Nombres de meses en español para strptime. Si el locale no está instalado no
+# se interrumpe la carga de los demás spiders del proyecto (Scrapy los importa a todos)
+for _nombre_locale in ('es_ES', 'es_ES.UTF-8', 'es_AR.UTF-8'):
+    try:
+        locale.setlocale(locale.LC_TIME, _nombre_locale)
+        break
+    except locale.Error:
+        continue
 
 
 class SismosHistoricosSpider(scrapy.Spider):
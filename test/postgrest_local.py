@@ -0,0 +1,132 @@
+"""
+postgrest_local.py
+
+Servidor HTTP local que imita lo que usan los scripts de Supabase de la API
+PostgREST (/rest/v1/<tabla>): GET del sismo más reciente y POST con upsert por
+on_conflict. Guarda las filas en memoria y permite inyectar respuestas de error.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class ServidorPostgrest:
+    """
+    Uso:
+        with ServidorPostgrest() as servidor:
+            cliente = ClientePostgrest(servidor.url, "clave")
+    """
+
+    def __init__(self, clave: str = "clave", tabla: str = "sismos"):
+        self.clave = clave
+        self.tabla = tabla
+        self.filas = {}
+        # Status HTTP a devolver en los próximos POST (en orden), antes de aceptar
+        self.fallas = []
+        # Predicado opcional sobre las filas de un POST: si devuelve un status, se responde con él
+        self.rechazar = None
+        self.posts = 0
+        self.filas_recibidas = 0
+        # POST atendidos a la vez (actual y máximo)
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self.conexiones = set()
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _handler(servidor):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, cuerpo=None):
+            datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def _autorizado(self, url):
+            with servidor.lock:
+                servidor.conexiones.add(self.client_address)
+            if url.path != f"/rest/v1/{servidor.tabla}":
+                self._responder(404, {"message": "tabla inexistente"})
+                return False
+            if (self.headers.get("apikey") != servidor.clave
+                    or self.headers.get("Authorization") != f"Bearer {servidor.clave}"):
+                self._responder(401, {"message": "JWT inválido"})
+                return False
+            return True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if not self._autorizado(url):
+                return
+            params = parse_qs(url.query)
+            columnas = params.get("select", ["*"])[0].split(",")
+            filas = list(servidor.filas.values())
+            for orden in reversed(params.get("order", [""])[0].split(",")):
+                if orden:
+                    col, _, sentido = orden.partition(".")
+                    filas.sort(key=lambda f: f[col], reverse=sentido == "desc")
+            if "limit" in params:
+                filas = filas[:int(params["limit"][0])]
+            if columnas != ["*"]:
+                filas = [{c: f[c] for c in columnas} for f in filas]
+            self._responder(200, filas)
+
+        def do_POST(self):
+            with servidor.lock:
+                servidor.en_curso += 1
+                servidor.max_en_curso = max(servidor.max_en_curso, servidor.en_curso)
+            try:
+                self._post()
+            finally:
+                with servidor.lock:
+                    servidor.en_curso -= 1
+
+        def _post(self):
+            url = urlparse(self.path)
+            cuerpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self._autorizado(url):
+                return
+            with servidor.lock:
+                servidor.posts += 1
+                status = servidor.fallas.pop(0) if servidor.fallas else None
+            if status:
+                self._responder(status, {"message": "falla inyectada"})
+                return
+            if "resolution=merge-duplicates" not in self.headers.get("Prefer", ""):
+                self._responder(409, {"message": "duplicate key"})
+                return
+            filas = json.loads(cuerpo)
+            if servidor.rechazar:
+                status = servidor.rechazar(filas)
+                if status:
+                    self._responder(status, {"message": "lote rechazado"})
+                    return
+            claves = parse_qs(url.query)["on_conflict"][0].split(",")
+            with servidor.lock:
+                servidor.filas_recibidas += len(filas)
+                for fila in filas:
+                    servidor.filas[tuple(fila[c] for c in claves)] = fila
+            self._responder(201)
+
+    return Handler
@@ -0,0 +1,147 @@
+"""
+test_consultas.py
+
+Tests de la API de lectura sobre sismos.db (inpres_sismos/consultas.py).
+
+Ejecutar con:
+    python -m unittest test/test_consultas.py
+"""
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "inpres_sismos"))
+sys.path.insert(0, PROJECT_DIR)
+
+from inpres_sismos import consultas  # noqa: E402
+from inpres_sismos.consultas import ConsultasSismos, FiltroSismos, distancia_km  # noqa: E402
+
+spec = importlib.util.spec_from_file_location(
+    "actualizar_database", os.path.join(PROJECT_DIR, "inpres_sismos", "db_scripts", "actualizar_database.py"),
+)
+actualizar_database = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(actualizar_database)
+
+CSV = (
+    "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+    "12/02/2026,01:02:03,-31.5,-68.5,15 Km,4.1,SAN JUAN,Sí\n"
+    "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+    "11/02/2026,19:04:25,-31.6,-68.6,110 Km,3.3,SAN JUAN,No\n"
+    "11/02/2026,11:58:04,-23.337,-66.863,237 Km,3.9,JUJUY,Si\n"
+    "05/06/2019,10:00:00,-31.4,-68.4,8 Km,5.0,SAN JUAN,Si\n"
+    "01/01/2010,00:00:01,-33.0,-71.5,30 Km,4.5,CHILE,No\n"
+)
+
+
+class TestConsultas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(cls.tmp.name, "sismos.csv")
+        cls.db_path = os.path.join(cls.tmp.name, "sismos.db")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write(CSV)
+        conn = actualizar_database.connect(cls.db_path)
+        actualizar_database.ensure_schema(conn)
+        df = actualizar_database.load_csv(csv_path)
+        actualizar_database.insert_rows(conn, actualizar_database.select_new_rows(df, None))
+        actualizar_database.close(conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.consultas = ConsultasSismos(self.db_path, cache_size=4)
+
+    def tearDown(self):
+        self.consultas.cerrar()
+
+    def _magnitudes(self, filtro):
+        return [s.magnitud for s in self.consultas.iterar(filtro)]
+
+    def test_filters(self):
+        """Verifica cada filtro por separado y combinado (resultados del más reciente al más antiguo)."""
+        self.assertEqual(self._magnitudes(FiltroSismos()), [4.1, 2.9, 3.3, 3.9, 5.0, 4.5])
+        self.assertEqual(self._magnitudes(FiltroSismos(bbox=(-69, -32, -68, -31))), [4.1, 3.3, 5.0])
+        self.assertEqual(self._magnitudes(FiltroSismos(centro=(-31.5, -68.5), radio_km=20)), [4.1, 3.3, 5.0])
+        self.assertEqual(self._magnitudes(FiltroSismos(centro=(-31.5, -68.5), radio_km=5)), [4.1])
+        self.assertEqual(self._magnitudes(FiltroSismos(desde="2019-01-01", hasta="2026-02-11")), [2.9, 3.3, 3.9, 5.0])
+        self.assertEqual(self._magnitudes(FiltroSismos(magnitud_min=4, magnitud_max=4.5)), [4.1, 4.5])
+        self.assertEqual(self._magnitudes(FiltroSismos(profundidad_min=100, profundidad_max=200)), [2.9, 3.3])
+        self.assertEqual(self._magnitudes(FiltroSismos(provincia="San Juan")), [4.1, 3.3, 5.0])
+        self.assertEqual(self._magnitudes(FiltroSismos(sentido=True)), [4.1, 3.9, 5.0])
+        self.assertEqual(
+            self._magnitudes(FiltroSismos(bbox=(-69, -32, -68, -31), magnitud_min=4, desde="2021-02-12")),
+            [4.1],
+        )
+        self.assertEqual(self.consultas.contar(FiltroSismos(provincia="San Juan", sentido=False)), 1)
+
+    def test_spatial_filters_without_rtree(self):
+        """Verifica que con cajas poco selectivas (sin R*Tree) los resultados sean los mismos."""
+        filtros = [
+            FiltroSismos(bbox=(-69, -32, -68, -31)),
+            FiltroSismos(centro=(-31.5, -68.5), radio_km=20, magnitud_min=4),
+        ]
+        esperado = [self._magnitudes(f) for f in filtros]
+        with mock.patch.object(consultas, "UMBRAL_RTREE", 0):
+            sin_rtree = ConsultasSismos(self.db_path)
+            try:
+                self.assertFalse(sin_rtree._usar_rtree(filtros[0]))
+                self.assertEqual([[s.magnitud for s in sin_rtree.iterar(f)] for f in filtros], esperado)
+            finally:
+                sin_rtree.cerrar()
+
+    def test_keyset_pagination(self):
+        """Verifica que las páginas recorran todos los eventos una sola vez y en orden."""
+        vistos = []
+        pagina = self.consultas.buscar(FiltroSismos(), limite=2)
+        while True:
+            vistos += [s.id for s in pagina.sismos]
+            if pagina.siguiente is None:
+                break
+            pagina = self.consultas.buscar(FiltroSismos(), limite=2, despues=pagina.siguiente)
+        self.assertEqual(vistos, [s.id for s in self.consultas.iterar(FiltroSismos(), tamano_lote=1)])
+        self.assertEqual(len(vistos), 6)
+
+    def test_lru_cache(self):
+        """Verifica aciertos de la caché, el límite de entradas y la invalidación al cambiar la base."""
+        filtro = FiltroSismos(magnitud_min=4)
+        primera = self.consultas.buscar(filtro)
+        self.assertIs(self.consultas.buscar(filtro), primera)
+        self.assertEqual(self.consultas.cache.hits, 1)
+
+        for limite in range(1, 10):
+            self.consultas.buscar(filtro, limite=limite)
+        self.assertEqual(len(self.consultas.cache), 4)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE sismos SET magnitud = 3.0 WHERE magnitud = 4.5")
+        try:
+            self.assertEqual([s.magnitud for s in self.consultas.buscar(filtro).sismos], [4.1, 5.0])
+        finally:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("UPDATE sismos SET magnitud = 4.5 WHERE magnitud = 3.0")
+
+    def test_invalid_filters(self):
+        """Verifica que los filtros contradictorios se rechacen al construirlos."""
+        with self.assertRaises(ValueError):
+            FiltroSismos(centro=(-31.5, -68.5))
+        with self.assertRaises(ValueError):
+            FiltroSismos(bbox=(-68, -32, -69, -31))
+        with self.assertRaises(ValueError):
+            FiltroSismos(magnitud_min=5, magnitud_max=4)
+
+    def test_distancia_km(self):
+        """Verifica la distancia de haversine con un grado de latitud."""
+        self.assertAlmostEqual(distancia_km(0.0, 0.0, 1.0, 0.0), 111.19, places=2)
+        self.assertIsNone(distancia_km(None, 0.0, 1.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+test_database.py
+
+Tests de la sincronización CSV -> SQLite (db_scripts/actualizar_database.py).
+
+Ejecutar con:
+    python -m unittest test/test_database.py
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPT_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "inpres_sismos", "inpres_sismos", "db_scripts", "actualizar_database.py",
+))
+
+
+def _load_script(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+actualizar_database = _load_script("actualizar_database", SCRIPT_PATH)
+
+HEADER = "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+# El CSV tiene los eventos más recientes primero
+OLD_ROWS = (
+    "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+    "11/02/2026,11:58:04,-23.337,-66.863,237 Km,3.9,JUJUY,Si\n"
+    "10/02/2026,08:00:00,-32.0,-68.1,10 Km,,,No\n"
+    ",08:00:00,-32.0,-68.1,10 Km,2.0,SAN JUAN,No\n"
+)
+NEW_ROWS = (
+    "12/02/2026,01:02:03,-32.1,-69.2,15 Km,4.1,SAN JUAN,Sí\n"
+    # Mismo (fecha, hora) que la marca de agua pero otro epicentro: es un evento nuevo
+    "11/02/2026,19:04:25,-30.0,-67.0,20 Km,3.0,SAN JUAN,No\n"
+)
+
+
+class TestActualizarDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "sismos.csv")
+        self.db_path = os.path.join(self.tmp.name, "sismos.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sync(self, content):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        conn = actualizar_database.connect(self.db_path)
+        actualizar_database.ensure_schema(conn)
+        df = actualizar_database.load_csv(self.csv_path)
+        watermark = actualizar_database.read_watermark(conn)
+        candidates = actualizar_database.select_new_rows(df, watermark)
+        inserted = actualizar_database.insert_rows(conn, candidates)
+        actualizar_database.close(conn)
+        return watermark, len(candidates), inserted
+
+    def _rows(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(
+                "SELECT fecha, hora, latitud, profundidad, magnitud, provincia, sentido FROM sismos ORDER BY id"
+            ).fetchall()
+
+    def test_initial_load_and_watermark_update(self):
+        """Verifica la carga inicial, la marca de agua y que los duplicados se ignoren."""
+        watermark, candidates, inserted = self._sync(HEADER + OLD_ROWS)
+        self.assertIsNone(watermark)
+        self.assertEqual((candidates, inserted), (3, 3))
+        # Orden cronológico, NaN como NULL y sentido como 0/1
+        self.assertEqual(self._rows(), [
+            ("2026-02-10", "08:00:00", -32.0, "10 Km", None, None, 0),
+            ("2026-02-11", "11:58:04", -23.337, "237 Km", 3.9, "JUJUY", 1),
+            ("2026-02-11", "19:04:25", -31.53, "125 Km", 2.9, "LA RIOJA", 0),
+        ])
+
+        watermark, candidates, inserted = self._sync(HEADER + NEW_ROWS + OLD_ROWS)
+        self.assertEqual(watermark, ("2026-02-11", "19:04:25"))
+        # Solo se consideran las filas desde la marca de agua (incluida)
+        self.assertEqual((candidates, inserted), (3, 2))
+        rows = self._rows()
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[-1][:2], ("2026-02-12", "01:02:03"))
+        self.assertEqual(rows[-1][-1], 1)
+
+        # Sin filas nuevas no se inserta nada
+        self.assertEqual(self._sync(HEADER + NEW_ROWS + OLD_ROWS)[2], 0)
+
+    def test_report_separates_rows_below_watermark(self):
+        """Verifica que una ejecución sin novedades no informe el CSV entero como omitido."""
+        self._sync(HEADER + OLD_ROWS)
+        with mock.patch.object(actualizar_database, "csv_path", self.csv_path), \
+                mock.patch.object(actualizar_database, "db_path", self.db_path), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            actualizar_database.main()
+        output = output.getvalue()
+        self.assertIn("Insertados: 0 ", output)
+        self.assertIn("Anteriores a la marca de agua: 2 registros", output)
+        self.assertIn("Omitidos: 1 de 1 candidatos", output)
+        self.assertIn("Sin fecha u hora: 1 registros", output)
+
+    def test_published_database_is_not_left_in_wal_mode(self):
+        """Verifica que sismos.db quede sin archivos -wal / -shm al terminar."""
+        self._sync(HEADER + OLD_ROWS)
+        self.assertFalse(os.path.exists(f"{self.db_path}-wal"))
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+
+    def test_rtree_and_normalized_province_follow_inserts(self):
+        """Verifica que el R*Tree y provincia_normalizada acompañen a cada fila insertada."""
+        self._sync(HEADER + NEW_ROWS + OLD_ROWS)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM sismos").fetchone()[0],
+                conn.execute("SELECT COUNT(*) FROM sismos_rtree").fetchone()[0],
+            )
+            rows = conn.execute("""
+                SELECT s.provincia_normalizada FROM sismos_rtree r JOIN sismos s ON s.id = r.id
+                WHERE r.min_lon >= -70 AND r.max_lon <= -68 AND r.min_lat >= -33 AND r.max_lat <= -31
+                ORDER BY s.fecha, s.hora
+            """).fetchall()
+            self.assertEqual(rows, [(None,), ("San Juan",)])
+
+            conn.execute("DELETE FROM sismos WHERE magnitud = 4.1")
+            conn.execute("UPDATE sismos SET latitud = 10.0, longitud = 10.0 WHERE provincia = 'JUJUY'")
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM sismos_rtree WHERE min_lon > -69.3 AND max_lon < -69.1").fetchone()[0],
+                0,
+            )
+            self.assertEqual(
+                conn.execute("SELECT min_lat FROM sismos_rtree WHERE min_lon = 10.0").fetchall(),
+                [(10.0,)],
+            )
+
+    def test_migrates_database_created_with_previous_schema(self):
+        """Verifica que una base sin provincia_normalizada ni R*Tree se complete al abrirla."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE sismos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, fecha TEXT, hora TEXT, latitud REAL,
+                    longitud REAL, profundidad TEXT, magnitud REAL, provincia TEXT, sentido INTEGER
+                )
+            """)
+            conn.execute(
+                "INSERT INTO sismos (fecha, hora, latitud, longitud, profundidad, magnitud, provincia, sentido) "
+                "VALUES ('2026-02-11', '11:58:04', -23.337, -66.863, '237 Km', 3.9, 'JUJUY', 1)"
+            )
+        conn = actualizar_database.connect(self.db_path)
+        actualizar_database.ensure_schema(conn)
+        actualizar_database.close(conn)
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT provincia_normalizada FROM sismos").fetchall(), [("Jujuy",)])
+            (rtree_id, min_lat), = conn.execute("SELECT id, min_lat FROM sismos_rtree").fetchall()
+            self.assertEqual(rtree_id, 1)
+            self.assertAlmostEqual(min_lat, -23.337, places=4)
+
+    def test_bbox_magnitude_date_query_uses_indexes(self):
+        """Verifica que la consulta bbox + magnitud + fechas use el R*Tree y no recorra la tabla."""
+        self._sync(HEADER + OLD_ROWS)
+        with sqlite3.connect(self.db_path) as conn:
+            plan = " | ".join(row[-1] for row in conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT s.* FROM sismos_rtree r JOIN sismos s ON s.id = r.id
+                WHERE r.min_lon >= -70 AND r.max_lon <= -65 AND r.min_lat >= -35 AND r.max_lat <= -20
+                  AND s.magnitud >= 4 AND s.fecha >= '2021-02-12'
+            """))
+            self.assertIn("VIRTUAL TABLE INDEX", plan)
+            self.assertNotIn("SCAN s", plan)
+
+            plan = " | ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM sismos WHERE magnitud >= 4 AND fecha >= '2021-02-12'"
+            ))
+            self.assertIn("idx_sismos_", plan)
+            self.assertNotIn("SCAN sismos", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
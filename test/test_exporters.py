@@ -10,14 +10,41 @@ Ejecutar con:
 import unittest
 import os
 import json
+import io
+import contextlib
 import sys
+import gzip
+import struct
+import tempfile
+import re
+import time
+from unittest import mock
+import numpy as np
 import pandas as pd
 
 # Añadir raíz del proyecto al sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from exporters import csv_exporter
-from exporters.location_normalizer import normalize_location
+from exporters import (
+    binary_exporter,
+    cluster_detector,
+    clusters_exporter,
+    compression,
+    csv_exporter,
+    export_state,
+    geojson_exporter,
+    gutenberg_richter_exporter,
+    location_normalizer,
+    metadata_exporter,
+    periods_exporter,
+    province_locator,
+    run_exports,
+    shards_exporter,
+    spatial_index,
+    stats_exporter,
+    tiles_exporter,
+)
+from exporters.location_normalizer import normalize_location, normalize_many
 from exporters.config import (
     GEOJSON_OUT,
     METADATA_OUT,
@@ -134,5 +161,1152 @@ class TestExporters(unittest.TestCase):
         self.assertEqual(res5["tipo_ubicacion"], "desconocido")
 
 
+class TestDeterministicIdsBatch(unittest.TestCase):
+
+    def test_batch_ids_match_row_by_row(self):
+        """Verifica que los IDs por lotes sean idénticos a make_deterministic_id, incluso con nulos."""
+        df = pd.DataFrame({
+            "fecha": ["11/02/2026", "10/02/2026", None, " 09/02/2026 "],
+            "hora": ["19:04:25", "11:58:04", "00:00:01", "23:59:59"],
+            "latitud": [-31.53, np.nan, -23.337, -0.00001],
+            "longitud": [-66.45, -66.863, np.nan, -70.123456],
+            "profundidad": [125.0, 237.0, np.nan, 0.05],
+            "magnitud": [2.9, 3.95, 4.0, np.nan],
+        })
+        ids, ids_u64 = csv_exporter.make_deterministic_ids(df)
+
+        expected = [csv_exporter.make_deterministic_id(row) for _, row in df.iterrows()]
+        self.assertEqual(ids, expected)
+        self.assertEqual(ids_u64.dtype, np.uint64)
+        self.assertEqual([csv_exporter.id_to_u64(i) for i in ids], ids_u64.tolist())
+        self.assertEqual(csv_exporter.u64_to_ids(ids_u64), ids)
+
+
+class TestLocationEnrichment(unittest.TestCase):
+
+    def test_factorized_enrichment_matches_normalize_location(self):
+        """Verifica que la normalización factorizada coincida con normalize_location fila a fila."""
+        raw = ["SAN JUAn", "TFAIAS", None, "SAN JUAn", "LIMITE SAN JUAN - MENDOZA", "", "CHILE", "TFAIAS"]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "ubicaciones.json")
+            df = csv_exporter.enrich_location(pd.DataFrame({"provincia": raw}), cache_path=cache_path)
+
+            for i, value in enumerate(raw):
+                expected = normalize_location(value)
+                for column, key in csv_exporter.LOCATION_FIELDS:
+                    if expected[key] is None:
+                        self.assertTrue(pd.isna(df[column].iloc[i]), f"{column} en fila {i}")
+                    else:
+                        self.assertEqual(df[column].iloc[i], expected[key], f"{column} en fila {i}")
+
+            # El caché persistido se reutiliza en la siguiente corrida
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self.assertEqual(set(cached["ubicaciones"]), {v for v in raw if v is not None})
+            self.assertEqual(normalize_many(["CHILE"], cache_path=cache_path), [normalize_location("CHILE")])
+
+
+def _ray_cast(x, y, ring):
+    """Ray casting punto a punto (referencia para el test vectorizado)."""
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+class TestProvinceLocator(unittest.TestCase):
+
+    def test_polygons_with_holes_and_invalid_points(self):
+        """Verifica el ray casting vectorizado con huecos, puntos fuera y coordenadas nulas."""
+        outer = [(0, 0), (4, 0), (4, 4), (0, 4)]
+        hole = [(1, 1), (3, 1), (3, 3), (1, 3)]
+        island = [(1.5, 1.5), (2.5, 1.5), (2.5, 2.5), (1.5, 2.5)]
+        locator = province_locator.ProvinceLocator(["A", "B"], [[outer, hole], [island]], slab_degrees=0.5)
+        lons = [0.5, 1.2, 2.0, 5.0, np.nan, 3.5, -1.0]
+        lats = [0.5, 1.2, 2.0, 2.0, 2.0, 3.9, -50.0]
+        self.assertEqual(locator.locate(lons, lats).tolist(), [0, -1, 1, -1, -1, 0, -1])
+        self.assertEqual(list(locator.locate_names(lons, lats)), ["A", None, "B", None, None, "A", None])
+
+    def test_known_cities(self):
+        """Verifica la provincia de algunas ciudades con los polígonos del repositorio."""
+        locator = province_locator.load_locator()
+        cities = {
+            "San Juan": (-68.53, -31.54),
+            "Mendoza": (-68.83, -32.89),
+            "Salta": (-65.41, -24.78),
+            "Neuquén": (-70.07, -38.9),  # Zapala
+            "Tierra del Fuego, Antártida e Islas del Atlántico Sur": (-67.7, -53.8),
+            None: (-70.67, -33.45),  # Santiago de Chile
+        }
+        lons, lats = zip(*cities.values())
+        self.assertEqual(list(locator.locate_names(lons, lats)), list(cities))
+
+    def test_matches_point_by_point_ray_casting(self):
+        """Verifica que el índice por franjas dé lo mismo que recorrer todos los polígonos."""
+        with open(province_locator.PROVINCIAS_GEOJSON, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        locator = province_locator.load_locator()
+        rng = np.random.default_rng(7)
+        lons, lats = rng.uniform(-74, -53, 1500), rng.uniform(-56, -21, 1500)
+        expected = [
+            next((k for k, feat in enumerate(features)
+                  if any(_ray_cast(x, y, [tuple(p) for p in ring]) for ring in feat["geometry"]["coordinates"])), -1)
+            for x, y in zip(lons, lats)
+        ]
+        self.assertEqual(locator.locate(lons, lats).tolist(), expected)
+
+    def test_catalog_sized_input_is_fast(self):
+        """Verifica que 80.000 epicentros se clasifiquen en menos de un segundo."""
+        locator = province_locator.load_locator()
+        rng = np.random.default_rng(3)
+        lons, lats = rng.uniform(-72, -62, 80000), rng.uniform(-40, -22, 80000)
+        start = time.perf_counter()
+        locator.locate(lons, lats)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_mismatches_are_flagged(self):
+        """Verifica las columnas provincia_geografica y provincia_discrepante."""
+        df = csv_exporter.enrich_location(pd.DataFrame({
+            "provincia": ["SAN JUAN", "SAN JUAN", "LIMITE SAN JUAN - MENDOZA", "CHILE", "SAN JUAN"],
+            "latitud": [-31.54, -32.89, -32.89, -33.45, np.nan],
+            "longitud": [-68.53, -68.83, -68.83, -70.67, -68.5],
+        }), cache_path=None)
+        df = province_locator.enrich_geographic_province(df)
+        self.assertEqual(df["provincia_geografica"].tolist()[:3], ["San Juan", "Mendoza", "Mendoza"])
+        self.assertTrue(df["provincia_geografica"].iloc[3:].isna().all())
+        self.assertEqual(df["provincia_discrepante"].tolist(), [False, True, False, False, False])
+        self.assertEqual(province_locator.mismatch_summary(df), {("San Juan", "Mendoza"): 1})
+
+    def test_unreadable_geojson_leaves_nulls(self):
+        """Verifica que un GeoJSON faltante o inválido no interrumpa la carga del catálogo."""
+        df = csv_exporter.enrich_location(pd.DataFrame({
+            "provincia": ["SAN JUAN", "CHILE"], "latitud": [-31.54, -33.45], "longitud": [-68.53, -70.67],
+        }), cache_path=None)
+        with tempfile.TemporaryDirectory() as tmp:
+            broken = os.path.join(tmp, "provincias.geojson")
+            with open(broken, "w", encoding="utf-8") as f:
+                f.write('{"features": [{"geometry": null')
+            for path in (os.path.join(tmp, "no_existe.geojson"), broken):
+                with mock.patch.object(province_locator, "PROVINCIAS_GEOJSON", path), \
+                        mock.patch.object(province_locator, "_LOCATOR", None), \
+                        contextlib.redirect_stdout(io.StringIO()) as output:
+                    result = province_locator.enrich_geographic_province(df.copy())
+                self.assertIn("[WARN]", output.getvalue())
+                self.assertTrue(result["provincia_geografica"].isna().all())
+                self.assertTrue(result["provincia_discrepante"].isna().all())
+                self.assertEqual(province_locator.mismatch_summary(result), {})
+
+
+def _haversine_km(lat, lon, lats, lons):
+    p1, p2 = np.radians(lat), np.radians(lats)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * spatial_index.EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _random_catalog(n, seed=11):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * 20, n)
+    seconds = rng.integers(0, 86400, n)
+    stamps = pd.Timestamp("2005-01-01") + pd.to_timedelta(days, unit="D") + pd.to_timedelta(seconds, unit="s")
+    df = pd.DataFrame({
+        "fecha": stamps.strftime("%d/%m/%Y"),
+        "hora": stamps.strftime("%H:%M:%S"),
+        "latitud": rng.uniform(-40, -22, n),
+        "longitud": rng.uniform(-72, -62, n),
+        "magnitud": rng.uniform(1.5, 6.5, n).round(1),
+    })
+    df.loc[::97, "latitud"] = np.nan
+    df.loc[5, "latitud"] = -328210.5
+    df["id"], df["id_u64"] = csv_exporter.make_deterministic_ids(df)
+    return df
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = _random_catalog(5000)
+        cls.index = spatial_index.SpatialIndex.from_dataframe(cls.df, cell_degrees=0.5)
+        cls.lats = cls.df["latitud"].to_numpy()
+        cls.lons = cls.df["longitud"].to_numpy()
+
+    def test_radius_matches_brute_force(self):
+        """Verifica radio y filtros de fecha/magnitud contra haversine sobre todo el catálogo."""
+        stamps = pd.to_datetime(self.df["fecha"] + " " + self.df["hora"], format="%d/%m/%Y %H:%M:%S")
+        for lat, lon, radius_km in [(-31.5, -68.5, 50), (-24.0, -65.0, 5), (-35.0, -67.0, 400), (-50.0, -68.0, 100)]:
+            dist = _haversine_km(lat, lon, self.lats, self.lons)
+            positions, distances = self.index.radius(lat, lon, radius_km)
+            inside = np.flatnonzero(dist <= radius_km)
+            self.assertEqual(positions.tolist(), inside[np.argsort(dist[inside], kind="stable")].tolist())
+            np.testing.assert_allclose(distances, dist[positions], atol=1e-6)
+
+            mask = (dist <= radius_km) & (stamps >= "2010-01-01").to_numpy() & (stamps <= "2015-06-30").to_numpy()
+            mask &= self.df["magnitud"].to_numpy() >= 3.5
+            positions, _ = self.index.radius(lat, lon, radius_km, desde="2010-01-01", hasta="2015-06-30",
+                                             magnitud_min=3.5)
+            self.assertEqual(sorted(positions.tolist()), np.flatnonzero(mask).tolist())
+
+    def test_nearest_matches_brute_force(self):
+        """Verifica los k vecinos más cercanos, también lejos de todo evento."""
+        for lat, lon, k in [(-31.5, -68.5, 10), (-55.0, -60.0, 3), (-30.0, -66.0, 200)]:
+            dist = _haversine_km(lat, lon, self.lats, self.lons)
+            expected = np.sort(dist[np.isfinite(dist)])[:k]
+            positions, distances = self.index.nearest(lat, lon, k)
+            self.assertEqual(len(positions), k)
+            np.testing.assert_allclose(distances, expected, atol=1e-6)
+
+    def test_nearest_to_event_excludes_itself(self):
+        """Verifica que nearest_to_event no devuelva el propio evento."""
+        event = self.df.iloc[10]
+        positions, distances = self.index.nearest_to_event(event["id"], 5, magnitud_min=2.0)
+        self.assertNotIn(10, positions.tolist())
+        self.assertEqual(len(positions), 5)
+        self.assertTrue((np.diff(distances) >= 0).all())
+        self.assertTrue((self.df["magnitud"].to_numpy()[positions] >= 2.0).all())
+        with self.assertRaises(KeyError):
+            self.index.nearest_to_event("0" * 16, 5)
+
+    def test_bbox_and_invalid_coordinates(self):
+        """Verifica bbox contra una máscara y que las coordenadas inválidas no se indexen."""
+        positions = self.index.bbox(-69.0, -33.0, -67.5, -30.0, magnitud_max=4.0)
+        mask = (self.lons >= -69.0) & (self.lons <= -67.5) & (self.lats >= -33.0) & (self.lats <= -30.0)
+        mask &= self.df["magnitud"].to_numpy() <= 4.0
+        self.assertEqual(positions.tolist(), np.flatnonzero(mask).tolist())
+        self.assertEqual(len(self.index), int((np.abs(self.lats) <= 90).sum()))
+        self.assertNotIn(5, self.index.bbox(-180, -90, 180, 90).tolist())
+
+    def test_persisted_index_is_reused_until_catalog_changes(self):
+        """Verifica que load_or_build reutilice el .npz y lo reconstruya si cambia el catálogo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "indice.npz")
+            built = spatial_index.load_or_build(self.df, path, cell_degrees=0.5)
+            with mock.patch.object(spatial_index.SpatialIndex, "from_dataframe") as rebuild:
+                loaded = spatial_index.load_or_build(self.df, path, cell_degrees=0.5)
+                rebuild.assert_not_called()
+            np.testing.assert_array_equal(loaded.radius(-31.5, -68.5, 80)[0], built.radius(-31.5, -68.5, 80)[0])
+
+            smaller = self.df.iloc[:4000]
+            rebuilt = spatial_index.load_or_build(smaller, path, cell_degrees=0.5)
+            self.assertTrue((rebuilt.bbox(-180, -90, 180, 90) < 4000).all())
+            _, fingerprint = spatial_index.SpatialIndex.load(path)
+            self.assertEqual(fingerprint, spatial_index.catalog_fingerprint(smaller, 0.5))
+
+
+def _brute_force_clusters(df, radius_km, window_hours, min_events):
+    """ST-DBSCAN comparando todos los pares (O(n²)), para contrastar con cluster_detector."""
+    lat, lon = df["latitud"].to_numpy(), df["longitud"].to_numpy()
+    stamps = pd.to_datetime(df["fecha"] + " " + df["hora"], format="%d/%m/%Y %H:%M:%S")
+    epoch = stamps.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    dist = np.array([_haversine_km(lat[i], lon[i], lat, lon) for i in range(len(df))])
+    near = (dist <= radius_km) & (np.abs(epoch[:, None] - epoch[None, :]) <= window_hours * 3600)
+    core = near.sum(axis=1) >= min_events
+    labels = np.full(len(df), -1)
+    current = 0
+    for seed in np.flatnonzero(core):
+        if labels[seed] != -1:
+            continue
+        stack = [seed]
+        labels[seed] = current
+        while stack:
+            i = stack.pop()
+            for j in np.flatnonzero(near[i] & core & (labels == -1)):
+                labels[j] = current
+                stack.append(j)
+        current += 1
+    # Bordes al núcleo vecino más cercano
+    for i in np.flatnonzero(~core):
+        anchors = np.flatnonzero(near[i] & core)
+        if len(anchors):
+            labels[i] = labels[anchors[np.argmin(dist[i, anchors])]]
+    return labels, core
+
+
+def _sequence_catalog():
+    """Fondo aleatorio más una secuencia de réplicas de un M6.1 y un enjambre sin evento dominante."""
+    df = _random_catalog(1500, seed=5)
+    rng = np.random.default_rng(9)
+    mainshock = pd.Timestamp("2021-01-19 03:46:21")
+    offsets = np.sort(rng.exponential(12, 40)) * 3600
+    stamps = [mainshock] + [mainshock + pd.Timedelta(seconds=float(s)) for s in offsets]
+    swarm = [pd.Timestamp("2015-03-02 10:00:00") + pd.Timedelta(hours=6 * i) for i in range(8)]
+    extra = pd.DataFrame({
+        "fecha": [t.strftime("%d/%m/%Y") for t in stamps + swarm],
+        "hora": [t.strftime("%H:%M:%S") for t in stamps + swarm],
+        "latitud": np.concatenate([[-31.8], -31.8 + rng.normal(0, 0.04, 40), -24.2 + rng.normal(0, 0.02, 8)]),
+        "longitud": np.concatenate([[-68.9], -68.9 + rng.normal(0, 0.04, 40), -66.5 + rng.normal(0, 0.02, 8)]),
+        "magnitud": np.concatenate([[6.1], rng.uniform(2.5, 4.5, 40), rng.uniform(3.0, 3.4, 8)]).round(1),
+    })
+    extra["id"], extra["id_u64"] = csv_exporter.make_deterministic_ids(extra)
+    df = pd.concat([df, extra], ignore_index=True)
+    df = df[(np.abs(df["latitud"]) <= 90)].reset_index(drop=True)
+    df["profundidad"] = 10.0
+    df["provincia_normalizada"] = "San Juan"
+    return df
+
+
+class TestClusters(unittest.TestCase):
+
+    def test_matches_brute_force_st_dbscan(self):
+        """Verifica núcleos y clusters contra ST-DBSCAN por fuerza bruta."""
+        df = _sequence_catalog()
+        index = spatial_index.SpatialIndex.from_dataframe(df, cell_degrees=0.25)
+        labels = cluster_detector.detect_clusters(index, len(df), radius_km=20, window_hours=72, min_events=4)
+        expected, core = _brute_force_clusters(df, 20, 72, 4)
+
+        self.assertEqual((labels >= 0).tolist(), (expected >= 0).tolist())
+        # Misma partición de los núcleos (la numeración puede diferir)
+        pairs = set(zip(labels[core].tolist(), expected[core].tolist()))
+        self.assertEqual(len(pairs), len(set(expected[core].tolist())))
+        self.assertEqual(len(pairs), len(set(labels[core].tolist())))
+
+    def test_sequences_are_detected_and_numbered_chronologically(self):
+        """Verifica la secuencia de réplicas, el enjambre y el orden de cluster_id."""
+        df = cluster_detector.enrich_clusters(_sequence_catalog(), index_path=None)
+        self.assertEqual(str(df["cluster_id"].dtype), "Int32")
+        result = clusters_exporter.build_clusters(df)
+        clusters = {c["sismo_principal"]["magnitud"]: c for c in result["clusters"]}
+
+        aftershocks = clusters[6.1]
+        self.assertEqual(aftershocks["tipo"], "replicas")
+        self.assertGreaterEqual(aftershocks["eventos"], 35)
+        self.assertEqual(aftershocks["sismo_principal"]["fecha"], "19/01/2021")
+        self.assertEqual(aftershocks["inicio"], "2021-01-19T03:46:21")
+        self.assertIn(aftershocks["sismo_principal"]["id"], aftershocks["ids"])
+
+        swarm = next(c for c in result["clusters"] if c["inicio"].startswith("2015-03-02"))
+        self.assertEqual(swarm["tipo"], "enjambre")
+        self.assertEqual(swarm["eventos"], 8)
+        self.assertAlmostEqual(swarm["duracion_horas"], 42.0)
+        box = swarm["bounding_box"]
+        self.assertTrue(box["west"] <= -66.4 and box["east"] >= -66.6 and box["south"] <= box["north"])
+
+        starts = [c["inicio"] for c in result["clusters"]]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual([c["cluster_id"] for c in result["clusters"]], list(range(len(starts))))
+        self.assertEqual(result["eventos_en_clusters"], int(df["cluster_id"].notna().sum()))
+        for c in result["clusters"]:
+            member_ids = set(df.loc[df["cluster_id"] == c["cluster_id"], "id"])
+            self.assertEqual(set(c["ids"]), member_ids)
+
+    def test_catalog_sized_input_is_fast(self):
+        """Verifica que el clustering de 80.000 eventos tarde menos de un segundo."""
+        df = _random_catalog(80000, seed=2)
+        index = spatial_index.SpatialIndex.from_dataframe(df)
+        start = time.perf_counter()
+        cluster_detector.detect_clusters(index, len(df))
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+def _gutenberg_richter_reference(magnitudes):
+    """Mc por máxima curvatura y b de Aki-Utsu calculados directamente sobre una lista de magnitudes."""
+    width = gutenberg_richter_exporter.GR_MAGNITUDE_BIN
+    bins = np.rint(np.asarray(magnitudes) / width).astype(int)
+    values, counts = np.unique(bins, return_counts=True)
+    mc = (values[np.argmax(counts)] + round(gutenberg_richter_exporter.GR_MC_CORRECTION / width)) * width
+    above = bins[bins * width >= mc - 1e-9] * width
+    if len(above) < gutenberg_richter_exporter.GR_MIN_EVENTS:
+        return round(mc, 1), None
+    return round(mc, 1), round(np.log10(np.e) / (above.mean() - (mc - width / 2)), 3)
+
+
+class TestGutenbergRichter(unittest.TestCase):
+
+    def test_recovers_known_b_value(self):
+        """Verifica b ≈ 1 y Mc sobre magnitudes con distribución de Gutenberg-Richter."""
+        rng = np.random.default_rng(4)
+        magnitudes = (1.95 + rng.exponential(1 / np.log(10), 20000)).round(1)
+        df = pd.DataFrame({
+            "fecha": "01/01/2020",
+            "magnitud": magnitudes,
+            "provincia_normalizada": None,
+        })
+        total = gutenberg_richter_exporter.compute_gutenberg_richter(df)["general"]["total"]
+        self.assertEqual(total["mc"], 2.2)
+        self.assertAlmostEqual(total["b"], 1.0, delta=0.05)
+        self.assertLess(total["b_error"], 0.05)
+        self.assertAlmostEqual(total["a"], np.log10(total["eventos_sobre_mc"]) + total["b"] * 2.2, places=2)
+        self.assertEqual(total["acumulado"][0], 20000)
+        self.assertTrue(all(x >= y for x, y in zip(total["acumulado"], total["acumulado"][1:])))
+        self.assertGreater(total["acumulado"][-1], 0)
+
+    def test_groups_match_per_group_computation(self):
+        """Verifica provincia × año, ventanas móviles y total general contra un cálculo grupo por grupo."""
+        rng = np.random.default_rng(8)
+        n = 6000
+        years = rng.integers(2010, 2022, n)
+        df = pd.DataFrame({
+            "fecha": [f"15/06/{y}" for y in years],
+            "magnitud": (2.0 + rng.exponential(0.5, n)).round(1),
+            "provincia_normalizada": rng.choice(["San Juan", "Salta", "Mendoza", None], n, p=[0.5, 0.3, 0.15, 0.05]),
+        })
+        df.loc[::50, "magnitud"] = np.nan
+        result = gutenberg_richter_exporter.compute_gutenberg_richter(df)
+        window = gutenberg_richter_exporter.GR_WINDOW_YEARS
+        valid = df["magnitud"].notna()
+
+        self.assertEqual(result["anios"], [2010, 2021])
+        self.assertEqual(sorted(result["provincias"]), ["Mendoza", "Salta", "San Juan"])
+        self.assertEqual(result["general"]["total"]["eventos"], int(valid.sum()))
+        self.assertEqual(len(result["general"]["ventanas_moviles"]), 12 - window + 1)
+
+        for provincia, series in [(None, result["general"])] + list(result["provincias"].items()):
+            in_group = valid & ((df["provincia_normalizada"] == provincia) if provincia else True)
+            for year, entry in series["por_anio"].items():
+                mags = df.loc[in_group & (years == int(year)), "magnitud"]
+                self.assertEqual(entry["eventos"], len(mags))
+                self.assertEqual((entry["mc"], entry["b"]), _gutenberg_richter_reference(mags))
+            for label, entry in series["ventanas_moviles"].items():
+                start, end = map(int, label.split("-"))
+                self.assertEqual(end - start + 1, window)
+                mags = df.loc[in_group & (years >= start) & (years <= end), "magnitud"]
+                self.assertEqual((entry["mc"], entry["b"]), _gutenberg_richter_reference(mags))
+
+    def test_export_writes_compact_json(self):
+        """Verifica que el archivo se escriba sin espacios y con el eje de magnitudes común."""
+        df = _sample_enriched_df(40)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "gutenberg_richter.json")
+            with mock.patch.object(gutenberg_richter_exporter, "GUTENBERG_RICHTER_OUT", path), \
+                    mock.patch.object(gutenberg_richter_exporter, "EXPORTS_DIR", tmp):
+                gutenberg_richter_exporter.export(df)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        result = json.loads(text)
+        self.assertNotIn(", ", text)
+        self.assertEqual(result["magnitud_minima"], round(df["magnitud"].min(), 1))
+        # Pocos eventos: hay Mc pero no b
+        self.assertIsNotNone(result["general"]["total"]["mc"])
+        self.assertIsNone(result["general"]["total"]["b"])
+
+
+def _sample_enriched_df(n=12):
+    """DataFrame enriquecido sintético, sin depender de data/sismos.csv."""
+    df = pd.DataFrame({
+        "fecha": [f"{1 + i % 28:02d}/{1 + i % 12:02d}/{2000 + i % 7}" for i in range(n)],
+        "hora": [f"{i % 24:02d}:{i % 60:02d}:00" for i in range(n)],
+        "latitud": [-31.5 - 0.01 * i for i in range(n)],
+        "longitud": [-68.5 + 0.02 * i for i in range(n)],
+        "profundidad": [np.nan if i % 5 == 0 else 10.0 + i for i in range(n)],
+        "magnitud": [np.nan if i % 7 == 3 else 2.0 + 0.3 * i for i in range(n)],
+        "provincia": ["SAN JUAN", "CHILE", None, "LIMITE SAN JUAN - MENDOZA"] * (n // 4) + ["TFAIAS"] * (n % 4),
+        "sentido": ["Si" if i % 3 == 0 else "No" for i in range(n)],
+    })
+    df["id"], df["id_u64"] = csv_exporter.make_deterministic_ids(df)
+    return csv_exporter.enrich_location(df, cache_path=None)
+
+
+def _legacy_feature(row):
+    """Feature tal como lo armaba geojson_exporter antes del writer en streaming."""
+    return {
+        "type": "Feature",
+        "id": str(row["id"]),
+        "geometry": {"type": "Point", "coordinates": [row["longitud"], row["latitud"]]},
+        "properties": {
+            "id": str(row["id"]),
+            "fecha": row.get("fecha", None),
+            "hora": row.get("hora", None),
+            "latitud": row["latitud"] if pd.notna(row["latitud"]) else None,
+            "longitud": row["longitud"] if pd.notna(row["longitud"]) else None,
+            "profundidad": row["profundidad"] if pd.notna(row["profundidad"]) else None,
+            "magnitud": row["magnitud"] if pd.notna(row["magnitud"]) else None,
+            "sentido": row.get("sentido", None),
+            "ubicacion_original": row.get("ubicacion_original", None),
+            "ubicacion_normalizada": row.get("ubicacion_normalizada", None),
+            "provincia": row.get("provincia_normalizada", None),
+            "provincias": row.get("provincias", []),
+            "pais": row.get("pais", None),
+            "tipo_ubicacion": row.get("tipo_ubicacion", None),
+            "es_argentina": bool(row.get("es_argentina", False)),
+            "es_limite": bool(row.get("es_limite", False)),
+        },
+    }
+
+
+class TestGeojsonStreaming(unittest.TestCase):
+
+    def test_streaming_writer_matches_json_dump(self):
+        """Verifica que el writer en streaming produzca los mismos bytes que json.dump."""
+        df = _sample_enriched_df(23)
+        legacy = io.StringIO()
+        json.dump(
+            {"type": "FeatureCollection", "features": [_legacy_feature(row) for _, row in df.iterrows()]},
+            legacy, ensure_ascii=False, default=lambda o: o.item(),
+        )
+
+        for chunk_size in (1, 5, 1000):
+            streamed = io.StringIO()
+            with mock.patch.object(geojson_exporter, "CHUNK_SIZE", chunk_size):
+                total = geojson_exporter.write_feature_collection(df, streamed)
+            self.assertEqual(total, len(df))
+            self.assertEqual(streamed.getvalue(), legacy.getvalue())
+
+        empty = io.StringIO()
+        geojson_exporter.write_feature_collection(df.iloc[0:0], empty)
+        self.assertEqual(empty.getvalue(), json.dumps({"type": "FeatureCollection", "features": []}))
+
+
+class TestEnrichedCache(unittest.TestCase):
+
+    def test_cache_hit_and_prepended_rows_match_full_load(self):
+        """Verifica que el caché columnar (acierto y filas antepuestas) equivalga a una carga completa."""
+        header = "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+        old_rows = (
+            "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+            "11/02/2026,11:58:04,-23.337,-66.863,237 Km,3.9,JUJUY,No\n"
+            "10/02/2026,08:00:00,,-68.1,10 Km,,,Si\n"
+        )
+        new_rows = "12/02/2026,01:02:03,-32.1,-69.2,15 Km,4.1,SAN JUAN,Si\n"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "sismos.csv")
+            with mock.patch.object(csv_exporter, "ENRICHED_CACHE_DIR", os.path.join(tmp, "cache")), \
+                    mock.patch.object(csv_exporter, "LOCATION_CACHE", os.path.join(tmp, "ubicaciones.json")):
+                for content, expected_status in (
+                    (header + old_rows, "miss"),
+                    (header + old_rows, "hit"),
+                    (header + new_rows + old_rows, "prefix"),
+                    # Primera fila cacheada editada en el lugar: mismo sufijo, pero no es un prefijo de filas
+                    (header + "2" + new_rows + old_rows, "miss"),
+                ):
+                    with open(csv_path, "w", encoding="utf-8") as f:
+                        f.write(content)
+                    df = csv_exporter.load_sismos(csv_path)
+                    self.assertEqual(df.attrs["cache"], expected_status)
+                    self.assertNotIn("cluster_id", df.columns)
+                    pd.testing.assert_frame_equal(df, csv_exporter.load_sismos(csv_path, use_cache=False))
+                    self.assertEqual(len(df), content.count("\n") - 1)
+
+
+def _patched_exports(tmp):
+    """Redirige las salidas de los exportadores a un directorio temporal."""
+    paths = {
+        "GEOJSON_OUT": os.path.join(tmp, "sismos.geojson"),
+        "METADATA_OUT": os.path.join(tmp, "metadata.json"),
+        "STATS_OUT": os.path.join(tmp, "stats.json"),
+        "EXPORTS_DIR": tmp,
+        "EXPORT_STATE_DIR": os.path.join(tmp, "estado"),
+    }
+    patches = []
+    for module in (geojson_exporter, metadata_exporter, stats_exporter, export_state):
+        for name, value in paths.items():
+            if hasattr(module, name):
+                patches.append(mock.patch.object(module, name, value))
+    return patches
+
+
+class TestIncrementalExport(unittest.TestCase):
+
+    def test_incremental_update_matches_full_export(self):
+        """Verifica que el modo incremental produzca los mismos archivos que una exportación completa."""
+        df = _sample_enriched_df(40)
+        # Magnitudes repetidas y eventos simultáneos: el top de destacados se define por desempate
+        df["magnitud"] = df["magnitud"].where(df["magnitud"].isna(), 5.0 + np.arange(len(df)) % 3)
+        df.loc[[0, 21, 33], ["fecha", "hora"]] = ["01/01/2006", "12:00:00"]
+        n_new = 6
+        with tempfile.TemporaryDirectory() as tmp:
+            patches = _patched_exports(tmp)
+            for p in patches:
+                p.start()
+            try:
+                previous = df.iloc[n_new:].reset_index(drop=True)
+                geojson_exporter.export(previous)
+                metadata_exporter.export(previous)
+                stats_exporter.export(previous)
+                export_state.save_state(previous, metadata_exporter.aggregates(previous))
+
+                state = export_state.load_state()
+                self.assertIsNotNone(state)
+                self.assertEqual(export_state.count_new_rows(df, state), n_new)
+                # Un catálogo reordenado no admite actualización incremental
+                self.assertIsNone(export_state.count_new_rows(df.iloc[::-1], state))
+
+                df_new = df.head(n_new)
+                geojson_exporter.update(df_new)
+                metadata_exporter.update(df_new, state["metadata_agregados"])
+                stats_exporter.update(df_new)
+                with open(os.path.join(tmp, "sismos.geojson"), "rb") as f:
+                    incremental_geojson = f.read()
+                with open(os.path.join(tmp, "metadata.json"), "r", encoding="utf-8") as f:
+                    incremental_meta = json.load(f)
+                with open(os.path.join(tmp, "stats.json"), "r", encoding="utf-8") as f:
+                    incremental_stats = json.load(f)
+
+                geojson_exporter.export(df)
+                metadata_exporter.export(df)
+                with open(os.path.join(tmp, "sismos.geojson"), "rb") as f:
+                    self.assertEqual(incremental_geojson, f.read())
+                with open(os.path.join(tmp, "metadata.json"), "r", encoding="utf-8") as f:
+                    full_meta = json.load(f)
+            finally:
+                for p in patches:
+                    p.stop()
+
+        for key in ("fecha_generacion_utc", "ultima_actualizacion_utc"):
+            full_meta.pop(key)
+            incremental_meta.pop(key)
+        self.assertEqual(incremental_meta, full_meta)
+
+        full_stats = stats_exporter.compute_stats(df)
+        self.assertEqual(list(incremental_stats), list(full_stats))
+        for key in full_stats:
+            self.assertEqual(incremental_stats[key], full_stats[key], key)
+            if isinstance(full_stats[key], dict):
+                self.assertEqual(list(incremental_stats[key]), list(full_stats[key]), key)
+
+
+    def test_changed_rows_include_renumbered_clusters(self):
+        """Verifica que se marquen las filas nuevas y las anteriores cuyo cluster_id cambió."""
+        df = _sample_enriched_df(12)
+        df["cluster_id"] = pd.array([None] * 12, dtype="Int64")
+        with tempfile.TemporaryDirectory() as tmp:
+            patches = _patched_exports(tmp)
+            for p in patches:
+                p.start()
+            try:
+                previous = df.iloc[2:].reset_index(drop=True)
+                geojson_exporter.export(previous)
+                metadata_exporter.export(previous)
+                stats_exporter.export(previous)
+                export_state.save_state(previous, metadata_exporter.aggregates(previous))
+                state = export_state.load_state()
+            finally:
+                for p in patches:
+                    p.stop()
+
+        current = df.copy()
+        current.loc[[0, 5], "cluster_id"] = 3
+        self.assertEqual(np.flatnonzero(export_state.changed_rows(current, 2, state)).tolist(), [0, 1, 5])
+        # Sin cluster_id previo no se puede acotar: se marcan todas
+        self.assertTrue(export_state.changed_rows(current, 2, dict(state, cluster_ids=None)).all())
+
+    def test_code_change_invalidates_state(self):
+        """Verifica que un cambio en las reglas de normalización o en un exportador fuerce una exportación completa."""
+        df = _sample_enriched_df(12)
+        with tempfile.TemporaryDirectory() as tmp:
+            patches = _patched_exports(tmp)
+            for p in patches:
+                p.start()
+            try:
+                geojson_exporter.export(df)
+                metadata_exporter.export(df)
+                stats_exporter.export(df)
+                export_state.save_state(df, metadata_exporter.aggregates(df))
+                self.assertIsNotNone(export_state.load_state())
+
+                with mock.patch.object(location_normalizer, "rules_version", return_value="reglas-nuevas"):
+                    self.assertIsNone(export_state.load_state())
+                with mock.patch.object(csv_exporter, "enrichment_version", return_value="otra"):
+                    self.assertIsNone(export_state.load_state())
+                changed = dict(export_state.code_versions(), stats_exporter="otra")
+                with mock.patch.object(export_state, "code_versions", return_value=changed):
+                    self.assertIsNone(export_state.load_state())
+                self.assertIsNotNone(export_state.load_state())
+            finally:
+                for p in patches:
+                    p.stop()
+
+
+class TestParallelExport(unittest.TestCase):
+
+    def test_worker_reports_errors_without_raising(self):
+        """Verifica que un exportador en paralelo reporte su error sin interrumpir el pool."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch.object(csv_exporter, "ENRICHED_CACHE_DIR", os.path.join(tmp, "vacio")):
+                output, error, elapsed, _ = run_exports._export_in_worker("stats")
+        self.assertIsNotNone(error)
+        self.assertGreaterEqual(elapsed, 0)
+
+    def test_worker_loads_shared_cache(self):
+        """Verifica que los procesos lean el catálogo desde el caché columnar compartido."""
+        header = "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+        rows = "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "sismos.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write(header + rows)
+            with mock.patch.object(csv_exporter, "ENRICHED_CACHE_DIR", os.path.join(tmp, "cache")), \
+                    mock.patch.object(csv_exporter, "LOCATION_CACHE", os.path.join(tmp, "ubicaciones.json")), \
+                    mock.patch.object(stats_exporter, "STATS_OUT", os.path.join(tmp, "stats.json")), \
+                    mock.patch.object(stats_exporter, "EXPORTS_DIR", tmp):
+                df = csv_exporter.load_sismos(csv_path)
+                shared = csv_exporter.load_cached()
+                output, error, _, _ = run_exports._export_in_worker("stats")
+
+                self.assertTrue(csv_exporter.cache_matches(df))
+
+            pd.testing.assert_frame_equal(shared, df)
+            self.assertIsNone(error)
+            self.assertIn("[OK]", output)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "stats.json")))
+
+    def test_parallel_falls_back_without_cache(self):
+        """Verifica que --parallel corra en secuencia si no se pudo escribir el caché compartido."""
+        header = "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+        rows = "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "sismos.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write(header + rows)
+            with mock.patch.object(csv_exporter, "ENRICHED_CACHE_DIR", os.path.join(tmp, "cache")), \
+                    mock.patch.object(csv_exporter, "LOCATION_CACHE", os.path.join(tmp, "ubicaciones.json")), \
+                    mock.patch.object(csv_exporter, "_write_cache", side_effect=OSError("disco lleno")), \
+                    mock.patch.object(run_exports, "SISMOS_CSV", csv_path), \
+                    mock.patch.object(csv_exporter, "SISMOS_CSV", csv_path), \
+                    mock.patch.object(run_exports, "run_full_parallel", side_effect=AssertionError("sin caché")), \
+                    mock.patch.object(run_exports, "run_full") as run_full, \
+                    mock.patch.object(export_state, "save_state"), \
+                    mock.patch.object(sys, "argv", ["run_exports.py", "--parallel"]), \
+                    contextlib.redirect_stdout(io.StringIO()) as output:
+                run_exports.main()
+                self.assertFalse(csv_exporter.cache_matches(run_full.call_args[0][0]))
+        run_full.assert_called_once()
+        self.assertIn("modo secuencial", output.getvalue())
+
+    def test_worker_receives_cluster_ids(self):
+        """Verifica que los procesos usen el cluster_id calculado una sola vez por el proceso principal."""
+        df = _sample_enriched_df(8)
+        cluster_ids = pd.array([0, 0, None, 1, 1, None, 1, 0], dtype="Int32")
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(csv_exporter, "load_cached", return_value=df.copy()), \
+                mock.patch.object(clusters_exporter, "enrich_clusters", side_effect=AssertionError("recalculado")), \
+                mock.patch.object(clusters_exporter, "CLUSTERS_OUT", os.path.join(tmp, "clusters.json")), \
+                mock.patch.object(clusters_exporter, "EXPORTS_DIR", tmp):
+            output, error, _, _ = run_exports._export_in_worker("clusters", cluster_ids)
+            with open(os.path.join(tmp, "clusters.json"), "r", encoding="utf-8") as f:
+                result = json.load(f)
+        self.assertIsNone(error, output)
+        self.assertEqual(result["total_clusters"], 2)
+        self.assertEqual(result["eventos_en_clusters"], 6)
+
+    def test_cluster_detection_failure_is_isolated(self):
+        """Verifica que un error al detectar clusters se registre sin interrumpir la exportación."""
+        df = _sample_enriched_df(8)
+        errors = []
+        with mock.patch.object(cluster_detector, "enrich_clusters", side_effect=OSError("sin permisos")), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            run_exports.detect_clusters(df, errors)
+        self.assertEqual(errors, ["cluster_id"])
+        self.assertNotIn("cluster_id", df.columns)
+        self.assertIn("[WARN]", output.getvalue())
+
+
+def _read_message(buf):
+    """Decodificador protobuf mínimo: lista de (campo, valor) de un mensaje."""
+    fields, pos = [], 0
+
+    def varint():
+        nonlocal pos
+        value, shift = 0, 0
+        while True:
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    while pos < len(buf):
+        key = varint()
+        wire_type = key & 7
+        if wire_type == 0:
+            fields.append((key >> 3, varint()))
+        elif wire_type == 1:
+            fields.append((key >> 3, buf[pos:pos + 8]))
+            pos += 8
+        else:
+            length = varint()
+            fields.append((key >> 3, buf[pos:pos + length]))
+            pos += length
+    return fields
+
+
+def _decode_mvt_points(tile):
+    """Features de la capa "sismos" como dicts {id, x, y, properties}."""
+    (_, layer), = _read_message(tile)
+    layer_fields = _read_message(layer)
+    keys = [v.decode("utf-8") for f, v in layer_fields if f == 3]
+    values = []
+    for f, v in layer_fields:
+        if f == 4:
+            (value_field, raw), = _read_message(v)
+            values.append(raw.decode("utf-8") if value_field == 1 else struct.unpack("<d", raw)[0])
+
+    features = []
+    for f, v in layer_fields:
+        if f != 2:
+            continue
+        feature = dict(_read_message(v))
+        tags = _packed_varints(feature[2])
+        command, zx, zy = _packed_varints(feature[4])
+        features.append({
+            "id": feature[1],
+            "type": feature[3],
+            "command": command,
+            "x": zx >> 1,
+            "y": zy >> 1,
+            "properties": {keys[k]: values[i] for k, i in zip(tags[::2], tags[1::2])},
+        })
+    return features
+
+
+def _packed_varints(buf):
+    """Enteros de un campo packed (varints concatenados)."""
+    values, value, shift = [], 0, 0
+    for byte in buf:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            values.append(value)
+            value, shift = 0, 0
+    return values
+
+
+class TestTilesExporter(unittest.TestCase):
+
+    def _export(self, df, tmp):
+        path = os.path.join(tmp, "sismos.pmtiles")
+        with mock.patch.object(tiles_exporter, "TILES_OUT", path), \
+                mock.patch.object(tiles_exporter, "EXPORTS_DIR", tmp):
+            tiles_exporter.export(df)
+        return path
+
+    def _tile_xy(self, df, z):
+        x, y = tiles_exporter.lonlat_to_mercator(df["longitud"].to_numpy(), df["latitud"].to_numpy())
+        scale = (1 << z) * tiles_exporter.EXTENT
+        return (x * scale).astype(int), (y * scale).astype(int)
+
+    def test_max_zoom_tiles_contain_every_event(self):
+        """Verifica que en el zoom máximo estén todos los eventos con sus propiedades."""
+        df = _sample_enriched_df(40)
+        z = tiles_exporter.TILES_MAX_ZOOM
+        gx, gy = self._tile_xy(df, z)
+        extent = tiles_exporter.EXTENT
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._export(df, tmp)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(7), b"PMTiles")
+            decoded = {}
+            for tx, ty in set(zip((gx // extent).tolist(), (gy // extent).tolist())):
+                for feature in _decode_mvt_points(tiles_exporter.read_tile(path, z, tx, ty)):
+                    decoded[feature["id"]] = (tx, ty, feature)
+            self.assertIsNone(tiles_exporter.read_tile(path, z, 0, 0))
+
+        self.assertEqual(len(decoded), len(df))
+        for i, row in enumerate(df.itertuples()):
+            tx, ty, feature = decoded[int(row.id_u64)]
+            self.assertEqual((feature["type"], feature["command"]), (1, 9))
+            self.assertEqual(tx * extent + feature["x"], gx[i])
+            self.assertEqual(ty * extent + feature["y"], gy[i])
+            props = feature["properties"]
+            self.assertEqual(props["id"], row.id)
+            self.assertEqual(props["fecha"], row.fecha)
+            if pd.isna(row.magnitud):
+                self.assertNotIn("magnitud", props)
+            else:
+                self.assertEqual(props["magnitud"], row.magnitud)
+            if pd.isna(row.provincia_normalizada):
+                self.assertNotIn("provincia", props)
+            else:
+                self.assertEqual(props["provincia"], row.provincia_normalizada)
+
+    def test_update_only_regenerates_touched_tiles(self):
+        """Verifica que la actualización incremental produzca el mismo archivo que una exportación completa."""
+        df = _sample_enriched_df(40)
+        df["cluster_id"] = pd.array([1] * 10 + [None] * 30, dtype="Int64")
+        changed = np.zeros(len(df), dtype=bool)
+        changed[:2] = True
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(self._export(df, tmp), "rb") as f:
+                full = f.read()
+            path = self._export(df.iloc[2:], tmp)
+            with mock.patch.object(tiles_exporter, "TILES_OUT", path), \
+                    mock.patch.object(tiles_exporter, "EXPORTS_DIR", tmp), \
+                    contextlib.redirect_stdout(io.StringIO()) as output:
+                tiles_exporter.update(df, changed)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), full)
+        regenerated, total = map(int, re.search(r"(\d+) de (\d+) teselas", output.getvalue()).groups())
+        self.assertLess(regenerated, total)
+
+    def test_low_zoom_keeps_strongest_event_per_cell(self):
+        """Verifica el raleo por magnitud en zooms bajos y el uso de directorios hoja."""
+        df = _sample_enriched_df(40)
+        with tempfile.TemporaryDirectory() as tmp:
+            # Un directorio raíz diminuto obliga a usar directorios hoja
+            with mock.patch.object(tiles_exporter, "PMTILES_ROOT_MAX_BYTES", 40):
+                path = self._export(df, tmp)
+            features = _decode_mvt_points(tiles_exporter.read_tile(path, 0, 0, 0))
+
+        gx, gy = self._tile_xy(df, 0)
+        cell = tiles_exporter.TILES_THIN_CELL
+        cells = pd.Series(df["magnitud"].fillna(-np.inf).to_numpy()).groupby([gx // cell, gy // cell])
+        self.assertEqual(len(features), cells.ngroups)
+        strongest = df["id"].to_numpy()[cells.idxmax().to_numpy()]
+        self.assertEqual(sorted(f["properties"]["id"] for f in features), sorted(strongest))
+
+
+class TestShardsExporter(unittest.TestCase):
+
+    def test_cells_partition_the_catalog(self):
+        """Verifica que las celdas contengan cada feature una sola vez y coincidan con el manifest."""
+        df = _sample_enriched_df(40)
+        # Un evento en otra celda y uno con coordenadas inválidas
+        df.loc[5, ["latitud", "longitud"]] = [-24.2, -65.1]
+        df.loc[7, "latitud"] = -3000.0
+        expected = {f["id"]: f for f in geojson_exporter.iter_features(df.drop(index=7))}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shards_dir = os.path.join(tmp, "celdas")
+            os.makedirs(shards_dir)
+            stale = os.path.join(shards_dir, shards_exporter.cell_filename(10, 10))
+            open(stale, "w").close()
+            with mock.patch.object(shards_exporter, "SHARDS_DIR", shards_dir), \
+                    mock.patch.object(shards_exporter, "SHARDS_MANIFEST_OUT", os.path.join(shards_dir, "manifest.json")):
+                shards_exporter.export(df)
+
+            with open(os.path.join(shards_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.assertFalse(os.path.exists(stale))
+            self.assertEqual(manifest["total_eventos"], len(expected))
+            # Los eventos sintéticos cruzan el meridiano -68°, más la celda del evento movido
+            self.assertEqual(manifest["total_celdas"], 3)
+
+            seen = {}
+            for cell in manifest["celdas"]:
+                path = os.path.join(shards_dir, cell["archivo"])
+                self.assertEqual(os.path.getsize(path), cell["bytes"])
+                with open(path, "r", encoding="utf-8") as f:
+                    features = json.load(f)["features"]
+                self.assertEqual(len(features), cell["eventos"])
+                west, south, east, north = cell["bbox"]
+                magnitudes = [f["properties"]["magnitud"] for f in features if f["properties"]["magnitud"] is not None]
+                self.assertEqual(cell["magnitud_minima"], min(magnitudes))
+                self.assertEqual(cell["magnitud_maxima"], max(magnitudes))
+                for feature in features:
+                    lon, lat = feature["geometry"]["coordinates"]
+                    self.assertTrue(west <= lon < east and south <= lat < north)
+                    seen[feature["id"]] = feature
+
+        self.assertEqual(seen, json.loads(json.dumps(expected)))
+
+    def test_only_changed_cells_are_rewritten(self):
+        """Verifica que solo se reescriban las celdas que cambiaron y que un corte no trunque las anteriores."""
+        df = _sample_enriched_df(40)
+        df.loc[5, ["latitud", "longitud"]] = [-24.2, -65.1]
+        with tempfile.TemporaryDirectory() as tmp:
+            shards_dir = os.path.join(tmp, "celdas")
+            with mock.patch.object(shards_exporter, "SHARDS_DIR", shards_dir), \
+                    mock.patch.object(shards_exporter, "SHARDS_MANIFEST_OUT", os.path.join(shards_dir, "manifest.json")):
+                shards_exporter.export(df.iloc[1:])
+                contents = {}
+                for name in os.listdir(shards_dir):
+                    with open(os.path.join(shards_dir, name), "rb") as f:
+                        contents[name] = f.read()
+
+                # Un corte a mitad de la escritura deja intactas las celdas publicadas
+                with mock.patch.object(geojson_exporter, "write_feature_collection", side_effect=OSError("corte")), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    with self.assertRaises(OSError):
+                        shards_exporter.export(df)
+                for name, content in contents.items():
+                    with open(os.path.join(shards_dir, name), "rb") as f:
+                        self.assertEqual(f.read(), content, name)
+
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    shards_exporter.export(df.iloc[1:])
+                self.assertIn("0 de 3 archivos reescritos", output.getvalue())
+
+                # La fila 0 solo cae en una de las celdas
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    shards_exporter.export(df)
+                self.assertIn("1 de 3 archivos reescritos", output.getvalue())
+            self.assertFalse([name for name in os.listdir(shards_dir) if name.endswith(".tmp")])
+
+    def test_new_rows_are_prepended_to_existing_cells(self):
+        """Verifica que en modo incremental las filas nuevas se inserten sin recodificar la celda."""
+        df = _sample_enriched_df(40)
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            for name, steps in (("completa", [(df, 0)]), ("incremental", [(df.iloc[3:], 0), (df, 3)])):
+                shards_dir = os.path.join(tmp, name)
+                with mock.patch.object(shards_exporter, "SHARDS_DIR", shards_dir), \
+                        mock.patch.object(shards_exporter, "SHARDS_MANIFEST_OUT", os.path.join(shards_dir, "manifest.json")), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    shards_exporter.export(*steps[0])
+                    for step in steps[1:]:
+                        with mock.patch.object(geojson_exporter, "write_feature_collection",
+                                               side_effect=AssertionError("celda recodificada")):
+                            shards_exporter.export(*step)
+                contents = {}
+                for file_name in os.listdir(shards_dir):
+                    with open(os.path.join(shards_dir, file_name), "rb") as f:
+                        contents[file_name] = f.read()
+                results.append(contents)
+        self.assertEqual(results[0], results[1])
+
+
+class TestPeriodsExporter(unittest.TestCase):
+
+    def _export(self, df, tmp):
+        out = io.StringIO()
+        with mock.patch.object(periods_exporter, "PERIODS_DIR", tmp), \
+                mock.patch.object(periods_exporter, "PERIODS_INDEX_OUT", os.path.join(tmp, "index.json")), \
+                mock.patch("sys.stdout", out):
+            periods_exporter.export(df)
+        with open(os.path.join(tmp, "index.json"), "r", encoding="utf-8") as f:
+            return json.load(f), out.getvalue()
+
+    def test_partitions_match_catalog_and_skip_unchanged(self):
+        """Verifica el contenido de las particiones y que solo se reescriban las que cambiaron."""
+        df = _sample_enriched_df(40)
+        with tempfile.TemporaryDirectory() as tmp:
+            index, output = self._export(df, tmp)
+            self.assertIn("47 de 47 archivos reescritos", output)
+            self.assertEqual(index["total_eventos"], len(df))
+            self.assertEqual([p["periodo"] for p in index["anual"]], [str(y) for y in range(2006, 1999, -1)])
+
+            fechas = pd.to_datetime(df["fecha"], format="%d/%m/%Y")
+            for partition in index["anual"] + index["mensual"]:
+                path = os.path.join(tmp, partition["archivo"])
+                self.assertEqual(os.path.getsize(path), partition["bytes"])
+                with open(path, "r", encoding="utf-8") as f:
+                    features = json.load(f)["features"]
+                expected = df[fechas.dt.strftime("%Y" if len(partition["periodo"]) == 4 else "%Y-%m")
+                              == partition["periodo"]]
+                self.assertEqual([f["id"] for f in features], expected["id"].tolist())
+                self.assertEqual(partition["eventos"], len(expected))
+
+            _, output = self._export(df, tmp)
+            self.assertIn("0 de 47 archivos reescritos", output)
+
+            # Un evento nuevo solo toca su año y su mes
+            new_event = df.iloc[[0]].copy()
+            new_event["hora"] = "23:59:59"
+            new_event["id"], new_event["id_u64"] = csv_exporter.make_deterministic_ids(new_event)
+            before = {p["archivo"]: p["huella"] for p in index["anual"] + index["mensual"]}
+            index, output = self._export(pd.concat([new_event, df], ignore_index=True), tmp)
+            self.assertIn("2 de 47 archivos reescritos", output)
+            changed = sorted(p["archivo"] for p in index["anual"] + index["mensual"]
+                             if before[p["archivo"]] != p["huella"])
+            self.assertEqual(changed, ["anual/2000.geojson", "mensual/2000-01.geojson"])
+
+            # Las particiones que quedan vacías se eliminan
+            self._export(df[fechas.dt.year != 2006], tmp)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "anual", "2006.geojson")))
+
+
+class TestBinaryExporter(unittest.TestCase):
+
+    def test_roundtrip_matches_geojson(self):
+        """Verifica que el binario columnar reproduzca los features de sismos.geojson."""
+        df = _sample_enriched_df(40)
+        df.loc[2, "latitud"] = np.nan
+        df.loc[4, "hora"] = "hora invalida"
+        with tempfile.TemporaryDirectory() as tmp:
+            geojson_path = os.path.join(tmp, "sismos.geojson")
+            binary_path = os.path.join(tmp, "sismos.bin")
+            with mock.patch.object(geojson_exporter, "GEOJSON_OUT", geojson_path), \
+                    mock.patch.object(geojson_exporter, "EXPORTS_DIR", tmp), \
+                    mock.patch.object(binary_exporter, "BINARY_OUT", binary_path), \
+                    mock.patch.object(binary_exporter, "EXPORTS_DIR", tmp):
+                geojson_exporter.export(df)
+                binary_exporter.export(df)
+            with open(geojson_path, "r", encoding="utf-8") as f:
+                features = json.load(f)["features"]
+            data = binary_exporter.read_binary(binary_path)
+
+            header = data["header"]
+            self.assertEqual(header["registros"], len(features))
+            for column in header["columnas"]:
+                self.assertEqual(column["offset"] % 8, 0)
+                self.assertEqual(len(data[column["nombre"]]), len(features))
+            # Mismos bytes que leería un BigUint64Array en un navegador little-endian
+            self.assertEqual(data["id"].dtype, np.dtype("<u8"))
+            self.assertEqual(data["id"].tolist(), df.dropna(subset=["latitud"])["id_u64"].tolist())
+
+            def decode(name, i):
+                code = int(data[name][i])
+                return None if code == binary_exporter.MISSING_CODE else header["diccionarios"][name][code]
+
+            for i, feature in enumerate(features):
+                props = feature["properties"]
+                self.assertEqual(f"{int(data['id'][i]):016x}", feature["id"])
+                self.assertEqual(data["longitud"][i], np.float32(props["longitud"]))
+                self.assertEqual(data["latitud"][i], np.float32(props["latitud"]))
+                for name in ("profundidad", "magnitud"):
+                    if props[name] is None:
+                        self.assertTrue(np.isnan(data[name][i]))
+                    else:
+                        self.assertEqual(data[name][i], np.float32(props[name]))
+                for name, prop in (("pais", "pais"), ("tipo_ubicacion", "tipo_ubicacion"), ("provincia", "provincia")):
+                    # Los nulos de columnas de texto salen como NaN en el GeoJSON
+                    expected = None if pd.isna(props[prop]) else props[prop]
+                    self.assertEqual(decode(name, i), expected)
+
+                moment = pd.to_datetime(f"{props['fecha']} {props['hora']}", format="%d/%m/%Y %H:%M:%S",
+                                        errors="coerce")
+                expected_epoch = 0 if pd.isna(moment) else int(moment.timestamp())
+                self.assertEqual(int(data["epoch"][i]), expected_epoch)
+
+
+class TestCompressedSidecars(unittest.TestCase):
+
+    def test_sidecars_are_written_in_the_same_pass(self):
+        """Verifica que los sidecars descompriman al mismo contenido y se reporten."""
+        sidecars = ("gz", "br") if compression.brotli is not None else ("gz",)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "datos.json")
+            compression.pop_reports()
+            with compression.open_text(path, sidecars) as f:
+                for i in range(2000):
+                    f.write(json.dumps({"i": i, "ubicación": "Neuquén"}, ensure_ascii=False))
+            with open(path, "rb") as f:
+                content = f.read()
+
+            with open(f"{path}.gz", "rb") as f:
+                self.assertEqual(gzip.decompress(f.read()), content)
+            if compression.brotli is not None:
+                with open(f"{path}.br", "rb") as f:
+                    self.assertEqual(compression.brotli.decompress(f.read()), content)
+
+            (report,) = compression.pop_reports()
+            self.assertEqual(report["bytes"], len(content))
+            self.assertEqual(report["sidecars"]["gz"][0], os.path.getsize(f"{path}.gz"))
+            self.assertIn("datos.json.gz", compression.format_report(report)[0])
+
+            # Un error durante la escritura no publica nada ni deja temporales
+            with self.assertRaises(RuntimeError):
+                with compression.open_text(path, sidecars) as f:
+                    f.write("incompleto")
+                    raise RuntimeError("fallo")
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(["datos.json"] + [f"datos.json.{e}" for e in sidecars]))
+
+            # Sin sidecars configurados se eliminan los anteriores
+            with compression.open_text(path, ()) as f:
+                f.write("{}")
+            self.assertEqual(os.listdir(tmp), ["datos.json"])
+
+    def test_incremental_geojson_update_regenerates_sidecars(self):
+        """Verifica que update() produzca el mismo .gz que una exportación completa."""
+        df = _sample_enriched_df(30)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sismos.geojson")
+            with mock.patch.object(geojson_exporter, "GEOJSON_OUT", path), \
+                    mock.patch.object(geojson_exporter, "EXPORTS_DIR", tmp), \
+                    mock.patch.object(compression, "COMPRESSED_SIDECARS", ("gz",)):
+                geojson_exporter.export(df.iloc[4:])
+                geojson_exporter.update(df.head(4))
+                with open(f"{path}.gz", "rb") as f:
+                    incremental = f.read()
+                geojson_exporter.export(df)
+                with open(f"{path}.gz", "rb") as f:
+                    self.assertEqual(incremental, f.read())
+        compression.pop_reports()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,154 @@
+"""
+test_migracion.py
+
+Tests de la migración inicial a Supabase (inpres_sismos/migracion.py) contra un
+servidor PostgREST local (test/postgrest_local.py).
+
+Ejecutar con:
+    python -m unittest test/test_migracion.py
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "inpres_sismos")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inpres_sismos.migracion import CheckpointMigracion, ControlLote, migrar  # noqa: E402
+from inpres_sismos.sincronizacion import ClientePostgrest  # noqa: E402
+from postgrest_local import ServidorPostgrest  # noqa: E402
+
+
+def _sismos(n):
+    """n sismos, uno por minuto desde el 01/03/2026, del más reciente al más antiguo."""
+    filas = [f"{1 + i // 1440:02d}/03/2026,{i // 60 % 24:02d}:{i % 60:02d}:00,-31.{i:04d},-68.5,10 Km,3.0,SAN JUAN,No"
+             for i in range(n)]
+    return pd.read_csv(io.StringIO(
+        "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n" + "\n".join(reversed(filas)) + "\n"
+    ))
+
+
+class TestMigracion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmp.name, "supabase_migracion.jsonl")
+        self.servidor = ServidorPostgrest()
+        self.servidor.__enter__()
+        self.cliente = ClientePostgrest(self.servidor.url, "clave", max_reintentos=1, dormir=lambda s: None)
+
+    def tearDown(self):
+        self.cliente.cerrar()
+        self.servidor.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _migrar(self, df, **kwargs):
+        return migrar(df, self.cliente, checkpoint_path=self.checkpoint, **kwargs)
+
+    def test_concurrent_upload_respects_the_window(self):
+        """Verifica que todas las filas lleguen sin superar la ventana de peticiones en vuelo."""
+        # Cada POST tarda un poco, así se llegan a solapar
+        self.servidor.rechazar = lambda filas: time.sleep(0.01)
+        resultado = self._migrar(_sismos(1000), ventana=3, control=ControlLote(inicial=50, minimo=50))
+        self.assertTrue(resultado.completa)
+        self.assertEqual(len(self.servidor.filas), 1000)
+        self.assertEqual(self.servidor.filas_recibidas, 1000)
+        self.assertLessEqual(self.servidor.max_en_curso, 3)
+        self.assertEqual(resultado.max_en_vuelo, 3)
+
+    def test_rerun_retries_only_failed_batches(self):
+        """Verifica que una segunda ejecución envíe solo las filas de los lotes fallidos."""
+        df = _sismos(600)
+        self.servidor.rechazar = lambda filas: 400 if "00:00:00" <= filas[0]["hora"] < "01:40:00" else None
+        control = ControlLote(inicial=100, minimo=100, maximo=100)
+        resultado = self._migrar(df, ventana=2, control=control)
+        self.assertFalse(resultado.completa)
+        self.assertEqual(resultado.lotes_fallidos, 1)
+        self.assertEqual(resultado.filas, 500)
+
+        self.servidor.rechazar = None
+        self.servidor.filas_recibidas = 0
+        resultado = self._migrar(df, ventana=2, control=ControlLote(inicial=100, minimo=100, maximo=100))
+        self.assertTrue(resultado.completa)
+        self.assertEqual(resultado.ya_migradas, 500)
+        self.assertEqual(self.servidor.filas_recibidas, 100)
+        self.assertEqual(len(self.servidor.filas), 600)
+
+        # Todo migrado: no se envía nada más
+        self.servidor.filas_recibidas = 0
+        self.assertEqual(self._migrar(df).lotes, 0)
+        self.assertEqual(self.servidor.filas_recibidas, 0)
+
+    def test_grown_csv_keeps_migrated_rows(self):
+        """Verifica que si el CSV creció solo se envíen los sismos nuevos."""
+        self._migrar(_sismos(100), control=ControlLote(inicial=30, minimo=30, maximo=30))
+        self.servidor.filas_recibidas = 0
+        resultado = self._migrar(_sismos(120))
+        self.assertTrue(resultado.completa)
+        self.assertEqual(resultado.ya_migradas, 100)
+        self.assertEqual(self.servidor.filas_recibidas, 20)
+        self.assertEqual(len(self.servidor.filas), 120)
+
+    def test_edited_rows_resend_only_their_batch(self):
+        """Verifica que una fila editada invalide solo el intervalo que la contiene."""
+        df = _sismos(100)
+        self._migrar(df, control=ControlLote(inicial=25, minimo=25, maximo=25))
+        # Fila 0 del CSV: el sismo más reciente, en el último intervalo cronológico
+        df.loc[0, "magnitud"] = 4.5
+        self.servidor.filas_recibidas = 0
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            resultado = self._migrar(df)
+        self.assertIn("[WARN] 25 filas", output.getvalue())
+        self.assertEqual(resultado.ya_migradas, 75)
+        self.assertEqual(self.servidor.filas_recibidas, 25)
+
+        # Datos completamente distintos: no se saltea ninguna fila
+        otros = _sismos(100)
+        otros["latitud"] = otros["latitud"] - 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self._migrar(otros).ya_migradas, 0)
+
+    def test_partial_checkpoint_line_is_ignored(self):
+        """Verifica que una línea final incompleta del checkpoint no rompa la reanudación."""
+        filas = [str(i).encode() for i in range(300)]
+        checkpoint = CheckpointMigracion(self.checkpoint, filas)
+        checkpoint.registrar(0, 100)
+        checkpoint.registrar(200, 300)
+        with open(self.checkpoint, "a", encoding="utf-8") as f:
+            f.write('{"inicio": 100, "fi')
+        self.assertEqual(CheckpointMigracion(self.checkpoint, filas).pendientes(), [(100, 200)])
+
+    def test_payload_too_large_splits_the_batch(self):
+        """Verifica que un 413 parta el lote en dos y achique los siguientes."""
+        self.servidor.rechazar = lambda filas: 413 if len(filas) > 60 else None
+        control = ControlLote(inicial=200, minimo=10)
+        resultado = self._migrar(_sismos(400), ventana=1, control=control)
+        self.assertTrue(resultado.completa)
+        self.assertLessEqual(max(resultado.tamanos), 60)
+        self.assertEqual(len(self.servidor.filas), 400)
+
+    def test_batch_size_follows_latency_and_errors(self):
+        """Verifica el ajuste AIMD del tamaño de lote."""
+        control = ControlLote(inicial=400, minimo=50, maximo=1000, latencia_objetivo=1.0)
+        control.exito(400, 0.2)
+        self.assertEqual(control.tamano, 500)
+        control.exito(500, 2.0)
+        self.assertEqual(control.tamano, 250)
+        control.error()
+        self.assertEqual(control.tamano, 125)
+        control.error()
+        control.error()
+        self.assertEqual(control.tamano, 50)
+        for _ in range(100):
+            control.exito(control.tamano, 0.1)
+        self.assertEqual(control.tamano, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
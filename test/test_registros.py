@@ -0,0 +1,139 @@
+"""
+test_registros.py
+
+Tests del registro binario de sismos (inpres_sismos/registros.py).
+
+Ejecutar con:
+    python -m unittest test/test_registros.py
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "inpres_sismos")))
+
+from inpres_sismos import registros  # noqa: E402
+
+# El CSV tiene los eventos más recientes primero
+CSV = (
+    "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+    "11/02/2026,19:04:25,-31.530,-66.45,125 Km,2.9,LA RIOJA,No\n"
+    "11/02/2026,11:58:04,-23.337,-66.863,237 Km.,3.9,\"San Miguel de Tucumán, Tucumán\",Sí\n"
+    "10/02/2026,08:00:00,-32.0,-68.1,10 Km,,,No\n"
+)
+NUEVOS = [
+    {"fecha": "12/02/2026", "hora": "01:02:03", "latitud": "-32.1", "longitud": "-69.2",
+     "profundidad": "15 Km", "magnitud": "4.1", "provincia": "SAN JUAN", "sentido": "Si"},
+    {"fecha": "12/02/2026", "hora": "06:00:00", "latitud": "-30.0", "longitud": "-67.0",
+     "profundidad": "20 Km", "magnitud": "3.0", "provincia": "SAN JUAN", "sentido": "No"},
+]
+
+
+class TestRegistros(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "sismos.csv")
+        self.log_path = os.path.join(self.tmp.name, "sismos_registros.bin")
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            f.write(CSV)
+        registros.importar_csv(self.csv_path, self.log_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _csv(self):
+        with open(self.csv_path, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def test_import_and_export_roundtrip(self):
+        """Verifica que sismos.csv regenerado desde el registro sea idéntico al original."""
+        self.assertEqual(registros.contar(self.log_path), 3)
+        self.assertTrue(registros.esta_ordenado(self.log_path))
+        self.assertEqual(os.path.getsize(self.log_path), registros.HEADER_SIZE + 3 * registros.RECORD_SIZE)
+        self.assertEqual(registros.RECORD_SIZE % 8, 0)
+
+        os.remove(self.csv_path)
+        registros.exportar_csv(self.log_path, self.csv_path)
+        self.assertEqual(self._csv(), CSV)
+
+    def test_memory_mapped_numeric_columns(self):
+        """Verifica las columnas numéricas del registro mapeado y el recorte por fecha."""
+        mapeo = registros.leer(self.log_path)
+        self.assertIsInstance(mapeo, np.memmap)
+        np.testing.assert_allclose(mapeo["lat"], [-32.0, -23.337, -31.53])
+        np.testing.assert_allclose(mapeo["profundidad_km"], [10, 237, 125])
+        self.assertTrue(np.isnan(mapeo["mag"][0]))
+        self.assertEqual(mapeo["sentido_flag"].tolist(), [0, 1, 0])
+
+        dia = registros.rango(self.log_path, datetime(2026, 2, 11), datetime(2026, 2, 12))
+        self.assertEqual([r["hora_txt"] for r in dia], [b"11:58:04", b"19:04:25"])
+
+    def test_append_writes_only_new_records_and_prepends_csv(self):
+        """Verifica que agregar escriba solo los registros nuevos y anteponga sus filas al CSV."""
+        tamano = os.path.getsize(self.log_path)
+        escritos = registros.agregar(self.log_path, NUEVOS)
+        self.assertEqual(os.path.getsize(self.log_path), tamano + 2 * registros.RECORD_SIZE)
+        self.assertTrue(registros.esta_ordenado(self.log_path))
+
+        registros.anteponer_csv(escritos, self.csv_path)
+        lineas = self._csv().split("\n")
+        self.assertTrue(lineas[1].startswith("12/02/2026,06:00:00"))
+        self.assertTrue(lineas[2].startswith("12/02/2026,01:02:03"))
+        self.assertEqual("\n".join([lineas[0]] + lineas[3:]), CSV)
+
+        # El CSV antepuesto es el mismo que se regenera desde el registro
+        antepuesto = self._csv()
+        registros.exportar_csv(self.log_path, self.csv_path)
+        self.assertEqual(self._csv(), antepuesto)
+
+        claves = registros.claves_recientes(self.log_path, registros.epoch_de_texto("12/02/2026", "00:00:00"))
+        self.assertEqual(claves, {
+            ("12/02/2026", "01:02:03", "-32.1", "-69.2"),
+            ("12/02/2026", "06:00:00", "-30.0", "-67.0"),
+        })
+
+    def test_out_of_order_append_falls_back_to_mask(self):
+        """Verifica que un evento más antiguo que el último desactive el orden y rango() siga siendo correcto."""
+        viejo = dict(NUEVOS[0], fecha="01/01/2020")
+        registros.agregar(self.log_path, [viejo])
+        self.assertFalse(registros.esta_ordenado(self.log_path))
+        self.assertEqual(len(registros.rango(self.log_path, datetime(2019, 1, 1), datetime(2021, 1, 1))), 1)
+        self.assertEqual(len(registros.rango(self.log_path, datetime(2026, 1, 1))), 3)
+
+    def test_uncommitted_tail_is_ignored(self):
+        """Verifica que los bytes escritos sin confirmar en el header se ignoren y se pisen."""
+        with open(self.log_path, "ab") as f:
+            f.write(b"\xff" * (registros.RECORD_SIZE + 5))
+        self.assertEqual(len(registros.leer(self.log_path)), 3)
+
+        registros.agregar(self.log_path, NUEVOS[:1])
+        self.assertEqual(os.path.getsize(self.log_path), registros.HEADER_SIZE + 4 * registros.RECORD_SIZE)
+        self.assertEqual(registros.leer(self.log_path)["magnitud_txt"][-1], b"4.1")
+
+    def test_truncates_text_wider_than_field(self):
+        """Verifica que un valor más largo que su campo se trunque sin cortar un carácter UTF-8."""
+        # 81 bytes: el corte en 64 cae en medio de una "Á" (2 bytes)
+        provincia = "X" + "Á" * 40
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            escritos = registros.agregar(self.log_path, [dict(NUEVOS[0], provincia=provincia)])
+        self.assertIn("[WARN]", output.getvalue())
+        self.assertEqual(registros.contar(self.log_path), 4)
+        self.assertEqual(registros.decodificar(escritos)[0]["provincia"], "X" + "Á" * 31)
+        self.assertEqual(float(escritos["lat"][0]), -32.1)
+
+        # La clave de deduplicación coincide con la que queda en el registro aunque se trunque
+        fila = dict(NUEVOS[1], latitud="-30.000000000001")
+        with contextlib.redirect_stdout(io.StringIO()):
+            registros.agregar(self.log_path, [fila])
+        self.assertIn(registros.clave(fila), registros.claves_recientes(self.log_path, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,353 @@
+"""
+test_scrapers.py
+
+Tests de los scrapers de INPRES contra páginas HTML guardadas en test/test_scraping/.
+
+Ejecutar con:
+    python -m unittest test/test_scrapers.py
+"""
+import csv
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+from urllib.parse import parse_qs
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "inpres_sismos"))
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "test_scraping")
+sys.path.insert(0, PROJECT_DIR)
+
+from scrapy.http import HtmlResponse, Request  # noqa: E402
+
+from inpres_sismos import planificador  # noqa: E402
+from inpres_sismos.journal import Journal  # noqa: E402
+from inpres_sismos.spiders import buscar_sismo  # noqa: E402
+
+
+def _load_script(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+actualizar_sismos = _load_script(
+    "actualizar_sismos", os.path.join(PROJECT_DIR, "inpres_sismos", "selenium", "actualizar_sismos.py"),
+)
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class TestUltimosScraper(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(actualizar_sismos, "CURRENT_YEAR", 2026)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_xultimos_fixture(self):
+        """Verifica que el parser lxml produzca las mismas filas que el scraper con Selenium."""
+        sismos = actualizar_sismos.parse_ultimos_html(_fixture("xultimos.html"))
+        self.assertEqual(sismos, [
+            {"fecha": "12/02/2026", "hora": "01:02:00", "latitud": "-32.1", "longitud": "-69.2",
+             "profundidad": "15 Km", "magnitud": "4.1", "provincia": "San Juan", "sentido": "Si"},
+            {"fecha": "12/02/2026", "hora": "00:15:00", "latitud": "-26.817", "longitud": "-65.2",
+             "profundidad": "8 Km", "magnitud": "2.6", "provincia": "Tucumán", "sentido": "No"},
+            {"fecha": "11/02/2026", "hora": "19:04:00", "latitud": "-31.53", "longitud": "-66.45",
+             "profundidad": "125 Km", "magnitud": "2.9", "provincia": "La Rioja", "sentido": "No"},
+            {"fecha": "11/02/2026", "hora": "11:58:00", "latitud": "-23.337", "longitud": "-66.863",
+             "profundidad": "237 Km", "magnitud": "3.9", "provincia": "Chile", "sentido": "No"},
+        ])
+
+    def test_page_without_table(self):
+        """Verifica que una página sin la tabla devuelva una lista vacía."""
+        self.assertEqual(actualizar_sismos.parse_ultimos_html(b"<html><body><p>Mantenimiento</p></body></html>"), [])
+
+    def test_http_mode_fetches_and_parses_quickly(self):
+        """Verifica el modo HTTP (sin navegador) con la respuesta simulada a partir del fixture."""
+        response = mock.Mock(content=_fixture("xultimos.html"))
+        with mock.patch.object(actualizar_sismos.requests, "get", return_value=response) as get:
+            start = time.perf_counter()
+            sismos = actualizar_sismos.parse_ultimos_html(actualizar_sismos.fetch_ultimos_http())
+            elapsed = time.perf_counter() - start
+        get.assert_called_once()
+        self.assertEqual(get.call_args.args[0], actualizar_sismos.ULTIMOS_URL)
+        response.raise_for_status.assert_called_once()
+        self.assertEqual(len(sismos), 4)
+        self.assertLess(elapsed, 1.0)
+
+    def test_selenium_is_not_imported_in_http_mode(self):
+        """Verifica que el modo HTTP no dependa de Selenium ni webdriver_manager."""
+        self.assertNotIn("webdriver", vars(actualizar_sismos))
+        self.assertNotIn("ChromeDriverManager", vars(actualizar_sismos))
+
+
+class TestBuscarSismoSpider(unittest.TestCase):
+
+    def _response(self, name, request):
+        return HtmlResponse(url=request.url, body=_fixture(name), encoding="utf-8", request=request)
+
+    def test_date_ranges_cover_the_period(self):
+        """Verifica que los rangos cubran el período completo sin solaparse."""
+        ranges = buscar_sismo.generate_date_ranges(date(2025, 9, 9), date(2025, 10, 20), 20)
+        self.assertEqual(ranges, [
+            (date(2025, 9, 9), date(2025, 9, 28)),
+            (date(2025, 9, 29), date(2025, 10, 18)),
+            (date(2025, 10, 19), date(2025, 10, 20)),
+        ])
+
+    def test_one_session_and_form_submission_per_range(self):
+        """Verifica que cada rango use su cookiejar y envíe el formulario con sus fechas."""
+        spider = buscar_sismo.BuscarSismoSpider(desde="2025-09-09", hasta="2025-10-20", dias="20")
+        requests = list(spider.start_requests())
+        self.assertEqual([r.meta["cookiejar"] for r in requests], [0, 1, 2])
+
+        form_request = next(spider.parse_form(self._response("buscar_sismo_form.html", requests[1])))
+        self.assertEqual(form_request.method, "POST")
+        self.assertEqual(form_request.url, "http://contenidos.inpres.gob.ar/buscar_sismo")
+        self.assertEqual(form_request.meta["cookiejar"], 1)
+        self.assertEqual(parse_qs(form_request.body.decode()), {
+            "buscar": ["1"],
+            "datepicker": ["2025-09-29"],
+            "datepicker2": ["2025-10-18"],
+            "tilde1": ["checkbox"],
+        })
+
+    def test_parse_results_like_selenium_parse_row(self):
+        """Verifica que las filas de #tableFiltro se transformen como en sismos_bulk_scrape.parse_row."""
+        spider = buscar_sismo.BuscarSismoSpider(desde="2025-09-09", hasta="2025-09-30")
+        request = Request(buscar_sismo.SEARCH_URL, meta={"rango": (date(2025, 9, 9), date(2025, 9, 28))})
+        items = list(spider.parse_results(self._response("buscar_sismo_resultados.html", request)))
+        self.assertEqual(items, [
+            {"fecha": "29/09/2025", "hora": "23:41:07", "latitud": "-31.675", "longitud": "-68.482",
+             "profundidad": "112 Km", "magnitud": "3.2", "provincia": "San Juan", "sentido": "No"},
+            {"fecha": "28/09/2025", "hora": "04:05:06", "latitud": "-24.2", "longitud": "-66.9",
+             "profundidad": "210 Km", "magnitud": "4.5", "provincia": "Salta", "sentido": "Si"},
+            {"fecha": "27/09/2025", "hora": "10:00:00", "latitud": "-33.0", "longitud": "-71.5",
+             "profundidad": "", "magnitud": "2.8", "provincia": "Chile", "sentido": "No"},
+            {"fecha": "sin dato", "hora": "", "latitud": "-30.1", "longitud": "-67.2",
+             "profundidad": "10 Km", "magnitud": "2.1", "provincia": "La Rioja", "sentido": "No"},
+        ])
+
+    def test_spider_has_its_own_feed_and_politeness_settings(self):
+        """Verifica la salida propia del spider y los límites de concurrencia."""
+        settings = buscar_sismo.BuscarSismoSpider.custom_settings
+        self.assertIsNone(settings["FEED_URI"])
+        self.assertEqual(list(settings["FEEDS"]), [buscar_sismo.OUTPUT_FILE])
+        self.assertTrue(settings["AUTOTHROTTLE_ENABLED"])
+        self.assertLessEqual(settings["CONCURRENT_REQUESTS_PER_DOMAIN"], 8)
+
+
+def _fila(fecha, hora, magnitud="3.0"):
+    return {"fecha": fecha, "hora": hora, "latitud": "-31.5", "longitud": "-68.5",
+            "profundidad": "10 Km", "magnitud": magnitud, "provincia": "San Juan", "sentido": "No"}
+
+
+class TestCheckpointJournal(unittest.TestCase):
+
+    RANGOS = [
+        (date(2025, 9, 9), date(2025, 9, 28)),
+        (date(2025, 9, 29), date(2025, 10, 18)),
+        (date(2025, 10, 19), date(2025, 11, 7)),
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sismos_nuevos.journal.jsonl")
+        self.csv_path = os.path.join(self.tmp.name, "sismos_nuevos.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_after_crash_at_first_incomplete_range(self):
+        """Verifica que tras un corte se retome en el primer rango no registrado."""
+        journal = Journal(self.path)
+        journal.registrar(*self.RANGOS[0], [_fila("10/09/2025", "01:00:00")])
+        size = os.path.getsize(self.path)
+        journal.registrar(*self.RANGOS[1], [_fila("30/09/2025", "02:00:00")])
+        # Cada rango solo agrega su propia línea
+        self.assertGreater(os.path.getsize(self.path), size)
+
+        # Corte a mitad de la escritura del tercer rango
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"version":1,"inicio":"2025-10-19","fin":"2025-11-07","fil')
+
+        inicio, fin = self.RANGOS[0][0], self.RANGOS[2][1]
+        reanudado = Journal(self.path)
+        self.assertEqual(reanudado.huecos(inicio, fin), [self.RANGOS[2]])
+        self.assertEqual(reanudado.filas, 2)
+
+        reanudado.registrar(*self.RANGOS[2], [_fila("20/10/2025", "03:00:00")])
+        self.assertEqual(Journal(self.path).huecos(inicio, fin), [])
+
+    def test_compaction_writes_csv_without_duplicates(self):
+        """Verifica que la compactación escriba cada sismo una sola vez (la última versión registrada)."""
+        journal = Journal(self.path)
+        journal.registrar(*self.RANGOS[0], [_fila("10/09/2025", "01:00:00"), _fila("11/09/2025", "01:00:00")])
+        journal.registrar(*self.RANGOS[0], [_fila("10/09/2025", "01:00:00", magnitud="3.1")])
+        self.assertEqual(journal.compactar(self.csv_path), 2)
+
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(r["fecha"], r["magnitud"]) for r in rows], [("11/09/2025", "3.0"), ("10/09/2025", "3.1")])
+
+    def test_compaction_orders_ranges_chronologically(self):
+        """Verifica que un rango completado en una ejecución posterior quede en su lugar en el CSV."""
+        journal = Journal(self.path)
+        journal.registrar(*self.RANGOS[0], [_fila("10/09/2025", "01:00:00")])
+        journal.registrar(*self.RANGOS[2], [_fila("20/10/2025", "03:00:00")])
+        # El rango del medio se había salteado y se completa al reanudar
+        journal.registrar(*self.RANGOS[1], [_fila("30/09/2025", "02:00:00")])
+        journal.compactar(self.csv_path)
+
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            fechas = [r["fecha"] for r in csv.DictReader(f)]
+        self.assertEqual(fechas, ["10/09/2025", "30/09/2025", "20/10/2025"])
+
+    def test_gaps_ignore_how_ranges_were_split(self):
+        """Verifica que los huecos del journal se calculen sobre los días, no sobre rangos exactos."""
+        journal = Journal(self.path)
+        journal.registrar(date(2025, 9, 9), date(2025, 9, 20), [])
+        journal.registrar(date(2025, 9, 15), date(2025, 9, 30), [])
+        journal.registrar(date(2025, 10, 10), date(2025, 10, 12), [])
+        self.assertEqual(journal.huecos(date(2025, 9, 1), date(2025, 10, 20)), [
+            (date(2025, 9, 1), date(2025, 9, 8)),
+            (date(2025, 10, 1), date(2025, 10, 9)),
+            (date(2025, 10, 13), date(2025, 10, 20)),
+        ])
+        self.assertEqual(journal.huecos(date(2025, 9, 10), date(2025, 9, 29)), [])
+
+
+def _catalogo(inicio, dias, tasa):
+    """Conteos diarios sintéticos: tasa(i) sismos el día inicio + i."""
+    return {inicio + timedelta(days=i): tasa(i) for i in range(dias) if tasa(i)}
+
+
+def _simular(plan, sismos_por_dia):
+    """Ejecuta un planificador contra un buscador simulado con límite de resultados."""
+    aceptados = []
+    while True:
+        rango = plan.siguiente()
+        if rango is None:
+            return aceptados
+        inicio, fin = rango
+        total = sum(sismos_por_dia.get(inicio + timedelta(days=i), 0) for i in range((fin - inicio).days + 1))
+        if plan.registrar(rango, min(total, planificador.LIMITE_RESULTADOS)):
+            aceptados.append(rango)
+
+
+class TestPlanificadorRangos(unittest.TestCase):
+
+    INICIO = date(2025, 1, 1)
+
+    def test_ranges_follow_catalog_activity(self):
+        """Verifica que los rangos sean largos en períodos tranquilos y cortos en los activos."""
+        conteos = _catalogo(self.INICIO, 120, lambda i: 50 if 60 <= i < 70 else 2)
+        rangos = planificador.planificar([(self.INICIO, self.INICIO + timedelta(days=119))],
+                                         planificador.EstimadorTasa(conteos))
+        # 60 días a 2 por día + 3 días a 50 por día = 270 esperados
+        self.assertEqual(rangos[0], (self.INICIO, self.INICIO + timedelta(days=62)))
+        largos = [(fin - inicio).days + 1 for inicio, fin in rangos]
+        self.assertLessEqual(min(largos), 7)
+        for inicio, fin in rangos:
+            self.assertLessEqual(planificador.EstimadorTasa(conteos).esperado((inicio, fin)),
+                                 planificador.OBJETIVO_RESULTADOS)
+
+    def test_capped_ranges_are_bisected_until_complete(self):
+        """Verifica que un rango en el límite se divida y que el período quede cubierto sin huecos."""
+        # El catálogo no anticipa un enjambre de 200 sismos por día
+        conteos = _catalogo(self.INICIO, 90, lambda i: 3)
+        reales = dict(conteos)
+        for i in range(40, 45):
+            reales[self.INICIO + timedelta(days=i)] = 200
+        fin = self.INICIO + timedelta(days=89)
+
+        plan = planificador.PlanificadorRangos([(self.INICIO, fin)], planificador.EstimadorTasa(conteos))
+        aceptados = _simular(plan, reales)
+
+        self.assertGreater(plan.divisiones, 0)
+        self.assertEqual(plan.truncados, [])
+        dias = [inicio + timedelta(days=i) for inicio, f in aceptados for i in range((f - inicio).days + 1)]
+        self.assertEqual(dias, [self.INICIO + timedelta(days=i) for i in range(90)])
+        for rango in aceptados:
+            total = sum(reales.get(d, 0) for d in dias if rango[0] <= d <= rango[1])
+            self.assertFalse(planificador.cerca_del_limite(total))
+
+    def test_fewer_searches_than_fixed_ranges(self):
+        """Verifica que el plan adaptativo use menos búsquedas que los rangos fijos de 20 días."""
+        fin = self.INICIO + timedelta(days=729)
+        conteos = _catalogo(self.INICIO, 730, lambda i: 12 if i % 30 < 5 else 4)
+        plan = planificador.PlanificadorRangos([(self.INICIO, fin)], planificador.EstimadorTasa(conteos))
+        _simular(plan, conteos)
+        fijos = buscar_sismo.generate_date_ranges(self.INICIO, fin, buscar_sismo.DIAS_POR_RANGO)
+        self.assertEqual(plan.divisiones, 0)
+        self.assertLess(plan.busquedas, len(fijos))
+
+    def test_single_day_at_cap_is_kept_and_reported(self):
+        """Verifica que un día que solo ya supera el límite se acepte y se informe como truncado."""
+        dia = self.INICIO
+        plan = planificador.PlanificadorRangos([(dia, dia)], planificador.EstimadorTasa({}))
+        self.assertTrue(plan.registrar(plan.siguiente(), planificador.LIMITE_RESULTADOS))
+        self.assertEqual(plan.truncados, [(dia, dia)])
+
+    def test_catalog_counts_per_day(self):
+        """Verifica el conteo de sismos por día a partir de sismos.csv."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sismos.csv")
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(_fila("", "")))
+                writer.writeheader()
+                writer.writerows([_fila("02/01/2025", "01:00:00"), _fila("02/01/2025", "02:00:00"),
+                                  _fila("05/01/2025", "01:00:00"), _fila("sin dato", "")])
+            conteos = planificador.eventos_por_dia(path)
+        self.assertEqual(conteos, {date(2025, 1, 2): 2, date(2025, 1, 5): 1})
+        estimador = planificador.EstimadorTasa(conteos)
+        self.assertEqual(estimador.tasa(date(2025, 1, 3)), 0)
+        self.assertEqual(estimador.esperado((date(2025, 1, 1), date(2025, 1, 5))),
+                         3 + estimador.tasa_desconocida)
+
+    def test_spider_splits_a_capped_range(self):
+        """Verifica que el spider descarte un resultado en el límite y pida las dos mitades."""
+        spider = buscar_sismo.BuscarSismoSpider(desde="2025-09-01", hasta="2025-09-30", dias="30")
+        list(spider.start_requests())
+        fila = ("<tr><td>1</td><td>2025-09-10 01:00:00</td><td>-31.5</td><td>-68.5</td>"
+                "<td>10</td><td>3.0</td><td></td><td>San Juan</td></tr>")
+        body = ("<table id='tableFiltro'><tbody>" + fila * planificador.LIMITE_RESULTADOS
+                + "</tbody></table>").encode()
+        request = Request(buscar_sismo.SEARCH_URL, meta={"rango": (date(2025, 9, 1), date(2025, 9, 30))})
+        response = HtmlResponse(url=request.url, body=body, encoding="utf-8", request=request)
+
+        salida = list(spider.parse_results(response))
+        self.assertEqual([r.meta["rango"] for r in salida], [
+            (date(2025, 9, 1), date(2025, 9, 15)),
+            (date(2025, 9, 16), date(2025, 9, 30)),
+        ])
+        self.assertEqual([r.meta["cookiejar"] for r in salida], [1, 2])
+        self.assertEqual(spider.divisiones, 1)
+
+    def test_spider_plans_from_catalog_by_default(self):
+        """Verifica que sin -a dias el spider arme los rangos con el planificador."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sismos.csv")
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(_fila("", "")))
+                writer.writeheader()
+                for i in range(60):
+                    dia = (date(2025, 1, 1) + timedelta(days=i)).strftime("%d/%m/%Y")
+                    writer.writerows([_fila(dia, f"0{h}:00:00") for h in range(5)])
+            spider = buscar_sismo.BuscarSismoSpider(desde="2025-01-01", hasta="2025-03-01", catalogo=path)
+        # 5 sismos por día -> 60 días por rango
+        self.assertEqual(spider.date_ranges, [
+            (date(2025, 1, 1), date(2025, 3, 1)),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
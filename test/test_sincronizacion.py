@@ -0,0 +1,147 @@
+"""
+test_sincronizacion.py
+
+Tests de la sincronización con Supabase (inpres_sismos/sincronizacion.py)
+contra un servidor PostgREST local (test/postgrest_local.py).
+
+Ejecutar con:
+    python -m unittest test/test_sincronizacion.py
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "inpres_sismos")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inpres_sismos import sincronizacion  # noqa: E402
+from inpres_sismos.sincronizacion import ClientePostgrest, sincronizar  # noqa: E402
+from postgrest_local import ServidorPostgrest  # noqa: E402
+
+# El CSV tiene los eventos más recientes primero
+CSV = (
+    "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+    "12/02/2026,01:02:03,-31.5,-68.5,15 Km,4.1,SAN JUAN,Sí\n"
+    "11/02/2026,19:04:25,-31.53,-66.45,125 Km,2.9,LA RIOJA,No\n"
+    "11/02/2026,19:04:25,-31.6,-68.6,,,,No\n"
+    "11/02/2026,11:58:04,-23.337,-66.863,237 Km,3.9,JUJUY,Si\n"
+    "sin dato,,-30.0,-67.0,10 Km,2.0,SAN JUAN,No\n"
+    "05/06/2019,10:00:00,-31.4,-68.4,8 Km,5.0,SAN JUAN,Si\n"
+)
+
+
+def _sismos(n, dia="01/03/2026"):
+    """n sismos del mismo día, uno por minuto, del más reciente al más antiguo."""
+    filas = [f"{dia},{i // 60:02d}:{i % 60:02d}:00,-31.{i:04d},-68.5,10 Km,3.0,SAN JUAN,No" for i in range(n)]
+    return pd.read_csv(io.StringIO(
+        "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n" + "\n".join(reversed(filas)) + "\n"
+    ))
+
+
+class TestSincronizacion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.estado = os.path.join(self.tmp.name, "supabase_sync.json")
+        self.servidor = ServidorPostgrest()
+        self.servidor.__enter__()
+        self.cliente = ClientePostgrest(self.servidor.url, "clave", dormir=lambda s: None)
+
+    def tearDown(self):
+        self.cliente.cerrar()
+        self.servidor.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _sincronizar(self, df, **kwargs):
+        return sincronizar(df, self.cliente, estado_path=self.estado, **kwargs)
+
+    def test_first_sync_uploads_everything_in_table_format(self):
+        """Verifica la conversión de columnas y que una tabla vacía reciba todas las filas válidas."""
+        resultado = self._sincronizar(pd.read_csv(io.StringIO(CSV)))
+        self.assertIsNone(resultado.watermark)
+        self.assertEqual(resultado.filas, 5)
+        self.assertEqual(resultado.nuevo_watermark, ("2026-02-12", "01:02:03"))
+        self.assertGreater(resultado.filas_por_segundo, 0)
+
+        filas = self.servidor.filas
+        self.assertEqual(len(filas), 5)
+        self.assertEqual(filas[("2026-02-12", "01:02:03", -31.5, -68.5)], {
+            "fecha": "2026-02-12", "hora": "01:02:03", "latitud": -31.5, "longitud": -68.5,
+            "profundidad": "15 Km", "magnitud": 4.1, "provincia": "SAN JUAN", "sentido": True,
+        })
+        vacia = filas[("2026-02-11", "19:04:25", -31.6, -68.6)]
+        self.assertEqual((vacia["profundidad"], vacia["magnitud"], vacia["provincia"]), (None, None, None))
+
+        with open(self.estado, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["watermark"], {"fecha": "2026-02-12", "hora": "01:02:03"})
+
+    def test_only_rows_from_the_watermark_are_pushed(self):
+        """Verifica que una segunda sincronización envíe solo las filas nuevas (y las del mismo segundo)."""
+        df = pd.read_csv(io.StringIO(CSV))
+        self._sincronizar(df)
+        self.assertEqual(self._sincronizar(df).filas, 1)
+
+        nuevas = pd.read_csv(io.StringIO(
+            "fecha,hora,latitud,longitud,profundidad,magnitud,provincia,sentido\n"
+            "13/02/2026,08:00:00,-32.0,-69.0,20 Km,3.0,MENDOZA,No\n"
+            "12/02/2026,01:02:03,-32.1,-69.2,15 Km,2.5,SAN JUAN,No\n"
+        ))
+        resultado = self._sincronizar(pd.concat([nuevas, df], ignore_index=True))
+        self.assertEqual(resultado.watermark, ("2026-02-12", "01:02:03"))
+        self.assertEqual(resultado.filas, 3)
+        self.assertEqual(len(self.servidor.filas), 7)
+
+    def test_concurrent_bounded_batches_reuse_connections(self):
+        """Verifica lotes acotados en filas y bytes, enviados en paralelo sobre conexiones reutilizadas."""
+        resultado = self._sincronizar(_sismos(300), max_filas=25, max_bytes=2048, hilos=3)
+        self.assertEqual(resultado.filas, 300)
+        self.assertEqual(len(self.servidor.filas), 300)
+        self.assertGreaterEqual(resultado.lotes, 300 // 25)
+        self.assertEqual(self.servidor.posts, resultado.lotes)
+        # Un GET del watermark más a lo sumo una conexión por hilo
+        self.assertLessEqual(len(self.servidor.conexiones), 1 + 3)
+
+        filas = sincronizacion.serializar(sincronizacion.preparar_registros(_sismos(300)))
+        for a, b in sincronizacion.agrupar_lotes(filas, 25, 2048):
+            self.assertLessEqual(b - a, 25)
+            self.assertLessEqual(2 + sum(len(f) for f in filas[a:b]) + (b - a - 1), 2048)
+
+    def test_transient_errors_are_retried_with_backoff(self):
+        """Verifica los reintentos con backoff exponencial ante 503 y 429."""
+        esperas = []
+        self.cliente.dormir = esperas.append
+        self.servidor.fallas = [503, 429, 503]
+        resultado = self._sincronizar(_sismos(10), hilos=1)
+        self.assertEqual(resultado.lotes_fallidos, 0)
+        self.assertEqual(resultado.reintentos, 3)
+        self.assertEqual(len(self.servidor.filas), 10)
+        base = sincronizacion.BACKOFF_BASE
+        for intento, espera in enumerate(esperas):
+            self.assertGreaterEqual(espera, base * 2 ** intento / 2)
+            self.assertLessEqual(espera, base * 2 ** intento)
+
+    def test_failed_batch_holds_back_the_watermark(self):
+        """Verifica que un lote rechazado no se pierda: el watermark local queda antes de él."""
+        df = _sismos(100)
+        self.servidor.rechazar = lambda filas: 400 if filas[0]["hora"] == "00:40:00" else None
+        resultado = self._sincronizar(df, max_filas=20, hilos=2)
+        self.assertEqual(resultado.lotes_fallidos, 1)
+        self.assertEqual(resultado.reintentos, 0)
+        self.assertEqual(len(self.servidor.filas), 80)
+        self.assertEqual(resultado.nuevo_watermark, ("2026-03-01", "00:39:00"))
+
+        # La tabla remota ya tiene filas posteriores, pero manda el estado local
+        self.servidor.rechazar = None
+        resultado = self._sincronizar(df, max_filas=20, hilos=2)
+        self.assertEqual(resultado.watermark, ("2026-03-01", "00:39:00"))
+        self.assertEqual(resultado.filas, 61)
+        self.assertEqual(len(self.servidor.filas), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()